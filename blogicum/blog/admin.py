@@ -1,7 +1,7 @@
 from django.contrib import admin  # type: ignore
 
 # Register your models here.
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, Location, OutboundEmail, Post
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -65,3 +65,23 @@ class LocationAdmin(admin.ModelAdmin):
     )
     list_display_links = ('name',)
     search_fields = ('name',)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipients',
+        'created_at',
+        'attempts',
+        'sent_at',
+        'next_attempt_at'
+    )
+    readonly_fields = (
+        'from_email',
+        'recipients',
+        'created_at',
+        'sent_at',
+        'last_error'
+    )
+    exclude = ('message',)
+    search_fields = ('recipients',)
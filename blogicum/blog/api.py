@@ -0,0 +1,242 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings  # type: ignore
+from django.db.models import Count, Q  # type: ignore
+from django.http import HttpResponse  # type: ignore
+from django.utils.cache import (  # type: ignore
+    get_conditional_response, patch_vary_headers
+)
+from django.views.decorators.http import require_safe  # type: ignore
+
+from .models import Category, Comment, Post, User
+from .views import POSTS_PER_PAGE, filter_published
+
+MAX_LIMIT = 100
+
+# API field -> lookup passed to values_list(); only the requested ones
+# are selected.
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'created_at': 'created_at',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+    'views': 'views',
+    'comments_count': 'comments_count',
+}
+# API field -> lookup that must be true for the field to be shown; hidden
+# locations read as null, as the HTML pages show no place for them.
+SHOWN_IF = {'location': 'location__is_published'}
+DEFAULT_POST_FIELDS = (
+    'id', 'title', 'pub_date', 'author', 'category', 'location', 'image',
+    'comments_count',
+)
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'author': 'author__username',
+    'created_at': 'created_at',
+}
+DEFAULT_COMMENT_FIELDS = tuple(COMMENT_FIELDS)
+
+
+class ApiError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def api_view(view):
+    """Wrap a view returning a dict into a JSON response with an ETag."""
+
+    @require_safe
+    def wrapper(request, *args, **kwargs):
+        try:
+            data = view(request, *args, **kwargs)
+        except ApiError as error:
+            data = {'error': error.message}
+            status = error.status
+        else:
+            status = 200
+        body = json.dumps(data, ensure_ascii=False,
+                          separators=(',', ':')).encode()
+        response = HttpResponse(
+            body, status=status, content_type='application/json')
+        if status != 200:
+            return response
+        response['ETag'] = '"%s"' % hashlib.md5(body).hexdigest()
+        # Authors see their unpublished posts, so the body depends on
+        # the session.
+        patch_vary_headers(response, ('Cookie',))
+        return get_conditional_response(
+            request, etag=response['ETag'], response=response)
+
+    wrapper.__name__ = view.__name__
+    return wrapper
+
+
+def get_or_404(queryset, **kwargs):
+    obj = queryset.filter(**kwargs).first()
+    if obj is None:
+        raise ApiError(404, 'Не найдено.')
+    return obj
+
+
+def parse_fields(request, available, default):
+    fields = request.GET.get('fields')
+    if not fields:
+        return default
+    fields = tuple(dict.fromkeys(
+        field.strip() for field in fields.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in available]
+    if unknown or not fields:
+        raise ApiError(400, 'Неизвестные поля: {}. Доступны: {}.'.format(
+            ', '.join(unknown), ', '.join(available)))
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', POSTS_PER_PAGE))
+    except ValueError:
+        raise ApiError(400, 'limit должен быть числом.')
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def encode_cursor(moment, pk):
+    return base64.urlsafe_b64encode(
+        f'{moment.isoformat()}|{pk}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        moment, pk = base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)).decode().split('|')
+        return datetime.fromisoformat(moment), int(pk)
+    except ValueError:
+        raise ApiError(400, 'Неверный курсор.')
+
+
+def serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def image_url(name):
+    return settings.MEDIA_URL + name if name else None
+
+
+def select(fields, lookups):
+    """The lookups to read for `fields`, with the ones gating them."""
+    return [lookups[field] for field in fields] + [
+        SHOWN_IF[field] for field in fields if field in SHOWN_IF]
+
+
+def present(fields, lookups, values):
+    """Build the API item for `fields` from a row read by lookup."""
+    item = {field: serialize(values[lookups[field]]) for field in fields}
+    for field, flag in SHOWN_IF.items():
+        if field in item and not values[flag]:
+            item[field] = None
+    if 'image' in item:
+        item['image'] = image_url(item['image'])
+    return item
+
+
+def page(request, queryset, fields, lookups, key, descending):
+    """Return one keyset page of `queryset` as a dict.
+
+    Rows are ordered by (`key`, id) and the cursor holds the last pair,
+    so every page is an index seek however deep the client reads.
+    """
+    limit = parse_limit(request)
+    if request.GET.get('cursor'):
+        moment, pk = decode_cursor(request.GET['cursor'])
+        after = '__lt' if descending else '__gt'
+        queryset = queryset.filter(
+            Q(**{key + after: moment})
+            | Q(**{key: moment, 'id' + after: pk}))
+    order = '-' if descending else ''
+    columns = list(dict.fromkeys(select(fields, lookups) + [key, 'id']))
+    rows = list(queryset.order_by(order + key, order + 'id').values_list(
+        *columns)[:limit + 1])
+    results = [present(fields, lookups, dict(zip(columns, row)))
+               for row in rows[:limit]]
+    next_url = None
+    if len(rows) > limit:
+        last = dict(zip(columns, rows[limit - 1]))
+        query = request.GET.copy()
+        query['cursor'] = encode_cursor(last[key], last['id'])
+        next_url = request.build_absolute_uri(
+            request.path + '?' + query.urlencode())
+    return {'results': results, 'next': next_url}
+
+
+def post_page(request, posts, filtrate=True):
+    fields = parse_fields(request, POST_FIELDS, DEFAULT_POST_FIELDS)
+    if filtrate:
+        posts = filter_published(posts)
+    if 'comments_count' in fields:
+        posts = posts.annotate(comments_count=Count('comments'))
+    return page(request, posts, fields, POST_FIELDS, 'pub_date',
+                descending=True)
+
+
+@api_view
+def posts(request):
+    return post_page(request, Post.objects.all())
+
+
+@api_view
+def category_posts(request, category_slug):
+    category = get_or_404(Category.objects, slug=category_slug,
+                          is_published=True)
+    return post_page(request, category.posts.all())
+
+
+@api_view
+def profile_posts(request, username):
+    author = get_or_404(User.objects, username=username)
+    return post_page(request, author.posts.all(), request.user != author)
+
+
+def visible_posts(request, post_id):
+    """The post, if the requester may see it, like blog.views.post_detail."""
+    posts = Post.objects.filter(id=post_id)
+    published = filter_published(posts)
+    if not request.user.is_authenticated:
+        return published
+    return posts.filter(
+        Q(author=request.user) | Q(pk__in=published.values('pk')))
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = parse_fields(request, POST_FIELDS, tuple(POST_FIELDS))
+    posts = visible_posts(request, post_id)
+    if 'comments_count' in fields:
+        posts = posts.annotate(comments_count=Count('comments'))
+    columns = list(dict.fromkeys(select(fields, POST_FIELDS)))
+    row = posts.values_list(*columns).first()
+    if row is None:
+        raise ApiError(404, 'Не найдено.')
+    return present(fields, POST_FIELDS, dict(zip(columns, row)))
+
+
+@api_view
+def post_comments(request, post_id):
+    fields = parse_fields(request, COMMENT_FIELDS, DEFAULT_COMMENT_FIELDS)
+    if not visible_posts(request, post_id).exists():
+        raise ApiError(404, 'Не найдено.')
+    return page(request, Comment.objects.filter(post_id=post_id), fields,
+                COMMENT_FIELDS, 'created_at', descending=False)
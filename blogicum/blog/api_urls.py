@@ -0,0 +1,23 @@
+from django.urls import path  # type: ignore
+
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/',
+         api.posts,
+         name='posts'),
+    path('posts/<int:post_id>/',
+         api.post_detail,
+         name='post_detail'),
+    path('posts/<int:post_id>/comments/',
+         api.post_comments,
+         name='post_comments'),
+    path('categories/<slug:category_slug>/posts/',
+         api.category_posts,
+         name='category_posts'),
+    path('users/<str:username>/posts/',
+         api.profile_posts,
+         name='profile_posts'),
+]
@@ -5,3 +5,9 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from . import (  # noqa: F401
+            auth, checks, feeds, locations, signals, sitemaps, stats,
+            trending
+        )
@@ -0,0 +1,117 @@
+from threading import Lock
+
+from django.conf import settings  # type: ignore
+from django.contrib import auth  # type: ignore
+from django.contrib.auth.backends import ModelBackend  # type: ignore
+from django.contrib.auth.middleware import (  # type: ignore
+    AuthenticationMiddleware
+)
+from django.contrib.auth.signals import user_logged_out  # type: ignore
+from django.core.cache import caches  # type: ignore
+from django.db.models.signals import post_delete, post_save  # type: ignore
+from django.dispatch import receiver  # type: ignore
+from django.utils.crypto import constant_time_compare  # type: ignore
+from django.utils.functional import SimpleLazyObject  # type: ignore
+from django.utils.module_loading import import_string  # type: ignore
+
+from .models import User
+
+_stats_lock = Lock()
+stats = {'hits': 0, 'misses': 0}
+
+
+def _count(outcome):
+    with _stats_lock:
+        stats[outcome] += 1
+
+
+def saved_queries():
+    """auth_user SELECTs avoided by this process."""
+    return stats['hits']
+
+
+def get_cache():
+    return caches[settings.AUTH_USER_CACHE]
+
+
+def generation_key(user_id):
+    return f'auth-user-generation:{user_id}'
+
+
+def user_key(user_id, generation, session_key, session_hash):
+    return f'auth-user:{user_id}:{generation}:{session_key}:{session_hash}'
+
+
+def invalidate_user(user_id):
+    cache = get_cache()
+    key = generation_key(user_id)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(): any new value works.
+        cache.set(key, 1, None)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose sessions CachedAuthenticationMiddleware caches."""
+
+
+def get_user(request):
+    session = request.session
+    user_id = session.get(auth.SESSION_KEY)
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    backend_path = session.get(auth.BACKEND_SESSION_KEY)
+    if (user_id is None or not session_hash or not session.session_key
+            or backend_path not in settings.AUTHENTICATION_BACKENDS
+            or not issubclass(import_string(backend_path),
+                              CachedModelBackend)):
+        return auth.get_user(request)
+
+    cache = get_cache()
+    generation = cache.get(generation_key(user_id), 0)
+    key = user_key(user_id, generation, session.session_key, session_hash)
+    user = cache.get(key)
+    if user is not None and constant_time_compare(
+            session_hash, user.get_session_auth_hash()):
+        _count('hits')
+        return user
+
+    _count('misses')
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware that skips the auth_user lookup on a hit.
+
+    The resolved user is cached per session and session auth hash (an
+    HMAC of the password hash), under a per-user generation that is
+    bumped whenever the user row is saved. With a per-process cache
+    other workers only notice after AUTH_USER_CACHE_TIMEOUT, so use a
+    shared cache in production.
+    """
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_saved_user(sender, instance, **kwargs):
+    # Covers edit_profile, password changes and resets, admin edits.
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_session(sender, request, user, **kwargs):
+    if user is None:
+        return
+    get_cache().delete(user_key(
+        user.pk,
+        get_cache().get(generation_key(user.pk), 0),
+        request.session.session_key,
+        request.session.get(auth.HASH_SESSION_KEY),
+    ))
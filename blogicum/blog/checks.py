@@ -0,0 +1,35 @@
+from django.conf import settings  # type: ignore
+from django.core.checks import Error, Tags, register  # type: ignore
+
+# Settings naming a cache alias that workers invalidate each other
+# through; a cache local to one process never sees the others' writes.
+SHARED_CACHE_SETTINGS = (
+    'AUTH_USER_CACHE', 'FEED_CACHE', 'SITEMAP_CACHE', 'LOCATION_CACHE',
+    'ARCHIVE_CACHE',
+)
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    # The development server runs a single process.
+    if settings.DEBUG:
+        return []
+    errors = []
+    for setting in SHARED_CACHE_SETTINGS:
+        alias = getattr(settings, setting)
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PROCESS_LOCAL_BACKENDS:
+            errors.append(Error(
+                f'{setting} = {alias!r} uses {backend}, which each worker '
+                f'process keeps to itself.',
+                hint='Point it at a cache shared by all workers: '
+                     'Memcached, Redis, a file or a database cache.',
+                obj=setting,
+                id='blog.E001',
+            ))
+    return errors
@@ -0,0 +1,111 @@
+import atexit
+import logging
+import time
+from threading import Lock
+
+from django.conf import settings  # type: ignore
+from django.db import DatabaseError, transaction  # type: ignore
+from django.db.models import Case, F, Value, When  # type: ignore
+from django.dispatch import Signal  # type: ignore
+
+from .models import Post
+
+logger = logging.getLogger('blog.counters')
+
+# Sent by a CounterBuffer after a flush with the {pk: increment} written.
+counters_flushed = Signal()
+
+# Three SQL parameters per row keep a batch under SQLite's 999 limit.
+BATCH_SIZE = 300
+
+
+class CounterBuffer:
+    """Increments of a counter column, added up in memory per row.
+
+    Pending increments are written with one UPDATE ... CASE per batch
+    of rows once there are `max_pending` of them or the oldest is
+    `interval` seconds old, and when the process exits. Readers then
+    never wait for SQLite's write lock; the column lags by at most one
+    flush, and a killed worker loses at most one flush.
+    """
+
+    def __init__(self, model, field, interval, max_pending):
+        self.model = model
+        self.field = field
+        self.interval = interval
+        self.max_pending = max_pending
+        self.lock = Lock()
+        self.pending = {}
+        self.count = 0
+        self.oldest = None
+
+    def add(self, pk, amount=1):
+        now = time.monotonic()
+        with self.lock:
+            self.pending[pk] = self.pending.get(pk, 0) + amount
+            self.count += amount
+            if self.oldest is None:
+                self.oldest = now
+            due = (self.count >= self.max_pending
+                   or now - self.oldest >= self.interval)
+        if due:
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception('Не удалось записать счётчики %s.%s',
+                                 self.model._meta.label, self.field)
+
+    def take(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+            self.count = 0
+            self.oldest = None
+        return pending
+
+    def clear(self):
+        self.take()
+
+    def flush(self):
+        """Write the pending increments; on a database error they stay."""
+        pending = self.take()
+        if not pending:
+            return
+        try:
+            with transaction.atomic():
+                self.write(pending)
+        except DatabaseError:
+            with self.lock:
+                for pk, amount in pending.items():
+                    self.pending[pk] = self.pending.get(pk, 0) + amount
+                    self.count += amount
+                if self.oldest is None:
+                    self.oldest = time.monotonic()
+            raise
+        counters_flushed.send(sender=self, counts=pending)
+
+    def write(self, pending):
+        rows = sorted(pending.items())
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            self.model.objects.filter(
+                pk__in=[pk for pk, _ in batch]
+            ).update(**{self.field: F(self.field) + Case(
+                *[When(pk=pk, then=Value(amount)) for pk, amount in batch],
+                default=Value(0),
+            )})
+
+
+post_views = CounterBuffer(
+    Post, 'views', settings.VIEW_COUNT_FLUSH_INTERVAL,
+    settings.VIEW_COUNT_FLUSH_SIZE)
+
+
+def flush_at_exit():
+    try:
+        post_views.flush()
+    except DatabaseError:
+        logger.exception('Не удалось записать просмотры при остановке')
+
+
+atexit.register(flush_at_exit)
@@ -0,0 +1,182 @@
+import csv
+import json
+import zlib
+from functools import reduce
+from operator import or_
+
+from django.contrib.admin.views.decorators import (  # type: ignore
+    staff_member_required
+)
+from django.db.models import Min, Q  # type: ignore
+from django.http import (  # type: ignore
+    Http404, HttpResponseBadRequest, StreamingHttpResponse
+)
+from django.utils import timezone  # type: ignore
+from django.utils.dateparse import parse_datetime  # type: ignore
+from django.views.decorators.http import require_safe  # type: ignore
+
+from .models import Comment, Post
+from .views import filter_published
+
+CHUNK_SIZE = 2000
+FORMATS = ('jsonl', 'csv')
+
+# Exported column -> lookup; rows are read with values_list().
+POST_COLUMNS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'created_at': 'created_at',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+}
+# Exported column -> lookup that must be true for the value to be written;
+# hidden locations are exported empty, as the pages show no place for them.
+SHOWN_IF = {'location': 'location__is_published'}
+COMMENT_COLUMNS = {
+    'id': 'id',
+    'post_id': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created_at': 'created_at',
+}
+
+
+def published_posts():
+    return filter_published(Post.objects)
+
+
+def published_comments():
+    return Comment.objects.filter(post__in=published_posts().values('id'))
+
+
+# kind -> (queryset factory, columns, moments). A row shows up at the
+# latest of its moments: creation, or publication for scheduled posts.
+EXPORTS = {
+    'posts': (published_posts, POST_COLUMNS, ('created_at', 'pub_date')),
+    'comments': (published_comments, COMMENT_COLUMNS,
+                 ('created_at', 'post__pub_date')),
+}
+
+
+def iter_rows(kind, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """Yield dicts for every exported row, walking the table by pk.
+
+    Each chunk is a separate `pk > last` query read with iterator(), so
+    neither the database nor Python holds more than one chunk.
+
+    Incremental runs window on the moment a row showed up: the latest of
+    its creation and its post's publication date, so a scheduled post
+    and its early comments are exported once the post is out. With
+    `since`, only rows that showed up at or after it are read, found
+    through the created_at and pub_date indexes; rows showing up at or
+    after `until` are left for the next run. Edited rows and posts
+    published again after being hidden keep their moment and are not
+    exported again: take a full export to pick those up.
+    """
+    queryset_factory, columns, moments = EXPORTS[kind]
+    queryset = queryset_factory()
+    if until is not None:
+        queryset = queryset.filter(
+            **{f'{moment}__lt': until for moment in moments})
+    flags = {column: flag for column, flag in SHOWN_IF.items()
+             if column in columns}
+    lookups = [*columns.values(), *flags.values()]
+    last_pk = 0
+    if since is not None:
+        queryset = queryset.filter(reduce(or_, (
+            Q(**{f'{moment}__gte': since}) for moment in moments)))
+        first = queryset.aggregate(first=Min('pk'))['first']
+        if first is None:
+            return
+        last_pk = first - 1
+    while True:
+        chunk = queryset.filter(pk__gt=last_pk).order_by('pk').values_list(
+            *lookups)[:chunk_size]
+        count = 0
+        for values in chunk.iterator(chunk_size=chunk_size):
+            count += 1
+            row = dict(zip(columns, values))
+            for column, shown in zip(flags, values[len(columns):]):
+                if not shown:
+                    row[column] = None
+            yield row
+        if count < chunk_size:
+            return
+        last_pk = values[0]
+
+
+class Echo:
+    """A file-like object csv.writer can write a single line to."""
+
+    def write(self, value):
+        return value
+
+
+def encode(rows, format, columns):
+    if format == 'jsonl':
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False, default=str) + '\n'
+    else:
+        writer = csv.writer(Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([row[column] for column in columns])
+
+
+def export(kind, format='jsonl', since=None, until=None, compress=False,
+           chunk_size=CHUNK_SIZE):
+    """Yield the export as bytes, gzip-compressed if asked to."""
+    lines = encode(iter_rows(kind, since, until, chunk_size), format,
+                   list(EXPORTS[kind][1]))
+    if not compress:
+        for line in lines:
+            yield line.encode()
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line.encode())
+        size += len(buffer[-1])
+        if size >= 64 * 1024:
+            yield compressor.compress(b''.join(buffer))
+            buffer, size = [], 0
+    yield compressor.compress(b''.join(buffer)) + compressor.flush()
+
+
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+@require_safe
+@staff_member_required
+def export_view(request, kind, format):
+    if kind not in EXPORTS or format not in FORMATS:
+        raise Http404
+    since = request.GET.get('since')
+    if since:
+        since = parse_datetime(since)
+        if since is None:
+            return HttpResponseBadRequest('Неверный формат since.')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+    until = timezone.now()
+    compress = bool(request.GET.get('gzip'))
+    filename = f'{kind}.{format}'
+    response = StreamingHttpResponse(
+        export(kind, format, since or None, until, compress),
+        content_type=('application/gzip' if compress
+                      else CONTENT_TYPES[format]),
+    )
+    if compress:
+        filename += '.gz'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # The next incremental export starts where this one stops.
+    response['X-Export-Until'] = until.isoformat()
+    return response
@@ -0,0 +1,253 @@
+import hashlib
+
+from django.conf import settings  # type: ignore
+from django.contrib.syndication.views import Feed  # type: ignore
+from django.core.cache import caches  # type: ignore
+from django.db.models import Min  # type: ignore
+from django.db.models.signals import post_delete, post_save  # type: ignore
+from django.dispatch import receiver  # type: ignore
+from django.http import HttpResponse  # type: ignore
+from django.shortcuts import get_object_or_404  # type: ignore
+from django.urls import reverse  # type: ignore
+from django.utils import timezone  # type: ignore
+from django.utils.cache import get_conditional_response  # type: ignore
+from django.utils.feedgenerator import Atom1Feed  # type: ignore
+from django.utils.http import http_date  # type: ignore
+from django.utils.text import Truncator  # type: ignore
+
+from .models import Category, Post, User
+from .visibility import filter_published, scheduled, visible_from
+
+FEED_LENGTH = 20
+
+
+def get_cache():
+    return caches[settings.FEED_CACHE]
+
+
+def version_key(scope):
+    return f'feed-version:{scope}'
+
+
+def invalidate(*scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = version_key(scope)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def next_publication_timeout(posts):
+    """Seconds until a scheduled post in `posts` becomes visible.
+
+    None if nothing is scheduled.
+    """
+    first = scheduled(posts).aggregate(first=Min('pub_date'))['first']
+    if first is None:
+        return None
+    return max(int(
+        (visible_from(first) - timezone.now()).total_seconds()) + 1, 1)
+
+
+class CachedFeed(Feed):
+    """A feed rendered once per change of the posts it lists.
+
+    The rendered document is cached under the versions of its scopes
+    (the whole site, a category, an author); the receivers below bump a
+    version whenever a post, category or author in it is saved. Entries
+    also expire when the next scheduled post becomes visible. Responses
+    carry an ETag and Last-Modified so pollers get 304s.
+    """
+
+    feed_name = None
+
+    def get_object(self, request, *args, **kwargs):
+        return None
+
+    def get_posts(self, obj):
+        return Post.objects.all()
+
+    def scopes(self, obj):
+        return ('index',)
+
+    def items(self, obj):
+        return filter_published(self.get_posts(obj).select_related(
+            'author', 'category')).order_by(
+                *Post._meta.ordering)[:FEED_LENGTH]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(60)
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return (item.category.title,) if item.category else ()
+
+    def cache_key(self, request, obj):
+        scopes = self.scopes(obj)
+        versions = get_cache().get_many(
+            [version_key(scope) for scope in scopes])
+        return 'feed:{}:{}:{}:{}'.format(
+            self.feed_name,
+            request.build_absolute_uri('/'),
+            ':'.join(scopes),
+            ':'.join(str(versions.get(version_key(scope), 0))
+                     for scope in scopes),
+        )
+
+    def render(self, request, obj):
+        feedgen = self.get_feed(obj, request)
+        content = feedgen.writeString('utf-8').encode()
+        entry = {
+            'content': content,
+            'content_type': feedgen.content_type,
+            'etag': '"%s"' % hashlib.md5(content).hexdigest(),
+            'last_modified': timezone.now().timestamp(),
+        }
+        timeout = next_publication_timeout(self.get_posts(obj))
+        if timeout is None or timeout > settings.FEED_CACHE_TIMEOUT:
+            timeout = settings.FEED_CACHE_TIMEOUT
+        return entry, timeout
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        key = self.cache_key(request, obj)
+        entry = get_cache().get(key)
+        if entry is None:
+            entry, timeout = self.render(request, obj)
+            get_cache().set(key, entry, timeout)
+        response = HttpResponse(
+            entry['content'], content_type=entry['content_type'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        return get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=int(entry['last_modified']),
+            response=response,
+        )
+
+
+class LatestPostsFeed(CachedFeed):
+    feed_name = 'index'
+    title = 'Блогикум — новые публикации'
+    description = 'Новые публикации всех авторов.'
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryFeed(CachedFeed):
+    feed_name = 'category'
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True)
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+    def scopes(self, obj):
+        return (f'category:{obj.pk}',)
+
+    def title(self, obj):
+        return f'Блогикум — {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=[obj.slug])
+
+
+class AuthorFeed(CachedFeed):
+    feed_name = 'author'
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+    def scopes(self, obj):
+        return (f'author:{obj.pk}',)
+
+    def title(self, obj):
+        return f'Блогикум — публикации {obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}.'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=[obj.username])
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_name = 'index-atom'
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryAtomFeed(CategoryFeed):
+    feed_name = 'category-atom'
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_name = 'author-atom'
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def post_scopes(category_id, author_id):
+    scopes = ['index', f'author:{author_id}']
+    if category_id is not None:
+        scopes.append(f'category:{category_id}')
+    return scopes
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    scopes = post_scopes(instance.category_id, instance.author_id)
+    # An edit may move the post out of its old category or author feed.
+    previous = getattr(instance, '_previous', None)
+    if previous:
+        scopes += post_scopes(previous['category_id'], previous['author_id'])
+    invalidate(*set(scopes))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, **kwargs):
+    # Publishing or hiding a category changes the site-wide feed too.
+    invalidate('index', f'category:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_feeds(sender, instance, update_fields=None,
+                            **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    # Author names appear in every feed.
+    invalidate('index', f'author:{instance.pk}', *(
+        f'category:{category_id}'
+        for category_id in instance.posts.values_list(
+            'category_id', flat=True).distinct()
+        if category_id is not None
+    ))
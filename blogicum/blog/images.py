@@ -0,0 +1,120 @@
+import os
+from io import BytesIO
+
+from django.core.cache import cache  # type: ignore
+from django.core.files.base import ContentFile  # type: ignore
+
+WEBP_QUALITY = 80
+WEBP_SUFFIX = '.webp'
+WEBP_SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+CARD_WIDTH = 640
+CARD_SUFFIX = '_card'
+
+
+def accepts_webp(request):
+    for media_range in request.META.get('HTTP_ACCEPT', '').split(','):
+        media_type, *params = media_range.strip().split(';')
+        if media_type.strip().lower() != 'image/webp':
+            continue
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def is_webp_source(name):
+    return os.path.splitext(name)[1].lower() in WEBP_SOURCE_EXTENSIONS
+
+
+def webp_name(name):
+    return name + WEBP_SUFFIX
+
+
+def card_name(name):
+    root, ext = os.path.splitext(name)
+    return f'{root}{CARD_SUFFIX}{ext}'
+
+
+def card_key(name):
+    return f'image-card:{name}'
+
+
+def has_card(field_file):
+    """Whether the upload has a card-size copy.
+
+    Recorded in the cache when the copy is built; uploads from before
+    that are looked up in storage once.
+    """
+    key = card_key(field_file.name)
+    exists = cache.get(key)
+    if exists is None:
+        exists = field_file.storage.exists(card_name(field_file.name))
+        cache.set(key, exists, None)
+    return exists
+
+
+def encode_webp(image, quality=WEBP_QUALITY, lossless=None):
+    # PNG sources are drawings and screenshots more often than photos:
+    # lossy WebP can end up larger than the original for them.
+    if lossless is None:
+        lossless = image.format == 'PNG'
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert(
+            'RGBA' if 'transparency' in image.info else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, format='WEBP', quality=quality, lossless=lossless,
+               method=4)
+    return buffer.getvalue()
+
+
+def encode_like(image, format):
+    buffer = BytesIO()
+    if format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    image.save(buffer, format=format, optimize=True)
+    return buffer.getvalue()
+
+
+def _replace(storage, name, content):
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def build_derivatives(field_file):
+    """Write the card-size copy and WebP siblings next to an upload.
+
+    Returns the storage names that were written.
+    """
+    if not field_file or not is_webp_source(field_file.name):
+        return []
+    # Pillow is only needed on upload: keep it out of worker startup.
+    from PIL import Image  # type: ignore
+
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as source:
+        image = Image.open(source)
+        image.load()
+    written = [webp_name(field_file.name)]
+    _replace(storage, written[0], encode_webp(image))
+    if image.width > CARD_WIDTH:
+        card = image.resize(
+            (CARD_WIDTH, round(image.height * CARD_WIDTH / image.width)),
+            Image.LANCZOS,
+        )
+        name = card_name(field_file.name)
+        _replace(storage, name, encode_like(card, image.format))
+        _replace(storage, webp_name(name),
+                 encode_webp(card, lossless=image.format == 'PNG'))
+        written += [name, webp_name(name)]
+    cache.set(card_key(field_file.name), image.width > CARD_WIDTH, None)
+    return written
+
+
+def has_derivatives(field_file):
+    return field_file.storage.exists(webp_name(field_file.name))
@@ -0,0 +1,69 @@
+import copy
+import time
+from threading import Lock
+
+from django.conf import settings  # type: ignore
+from django.core.cache import caches  # type: ignore
+from django.db.models.signals import post_delete, post_save  # type: ignore
+from django.dispatch import receiver  # type: ignore
+
+from .models import Location
+
+VERSION_KEY = 'locations-version'
+
+_lock = Lock()
+_table = {'locations': None, 'version': None, 'checked': 0.0, 'loaded': 0.0}
+
+
+def get_cache():
+    return caches[settings.LOCATION_CACHE]
+
+
+def all_locations():
+    """Every Location by id, loaded once per process.
+
+    Other workers announce their writes through a version number in
+    LOCATION_CACHE, looked at every LOCATION_CACHE_CHECK_INTERVAL
+    seconds, so cards read locations without a join or a query. The
+    table is reloaded after LOCATION_CACHE_MAX_AGE seconds whatever the
+    version says, in case an announcement was lost.
+    """
+    now = time.monotonic()
+    with _lock:
+        locations = _table['locations']
+        if locations is not None and (
+                now - _table['loaded'] >= settings.LOCATION_CACHE_MAX_AGE):
+            locations = None
+        if (locations is not None and now - _table['checked']
+                < settings.LOCATION_CACHE_CHECK_INTERVAL):
+            return locations
+        version = get_cache().get(VERSION_KEY, 0)
+        if locations is None or version != _table['version']:
+            locations = _table['locations'] = Location.objects.in_bulk()
+            _table['version'] = version
+            _table['loaded'] = now
+        _table['checked'] = now
+        return locations
+
+
+def get_location(location_id):
+    location = all_locations().get(location_id)
+    # Callers may change what they get; the shared one stays as loaded.
+    return copy.copy(location) if location is not None else None
+
+
+def clear():
+    with _lock:
+        _table['locations'] = None
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_locations(sender, **kwargs):
+    clear()
+    cache = get_cache()
+    cache.add(VERSION_KEY, 0, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.conf import settings  # type: ignore
+from django.core.mail import get_connection  # type: ignore
+from django.core.mail.backends.base import BaseEmailBackend  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .models import OutboundEmail
+
+# A claimed batch is hidden from other workers for this long; if the
+# worker dies, the messages become due again afterwards.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Store messages in OutboundEmail and return at once.
+
+    The send_queued_email command delivers them through
+    EMAIL_QUEUE_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        queued = [
+            OutboundEmail(
+                from_email=message.from_email,
+                recipients='\n'.join(message.recipients()),
+                message=message.message().as_bytes(),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        OutboundEmail.objects.bulk_create(queued)
+        return len(queued)
+
+
+class RawMessage:
+    """The part of SafeMIMEMessage the mail backends use."""
+
+    def __init__(self, data):
+        self.data = bytes(data)
+
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        return self.data.replace(b'\r\n', b'\n').replace(
+            b'\n', linesep.encode())
+
+    def as_string(self, unixfrom=False, linesep='\n'):
+        return self.as_bytes(linesep=linesep).decode('utf-8', 'replace')
+
+    def get_charset(self):
+        return None
+
+
+class StoredMessage:
+    """An OutboundEmail row as an EmailMessage for the mail backends."""
+
+    encoding = None
+
+    def __init__(self, outbound):
+        self.from_email = outbound.from_email
+        self._recipients = outbound.recipients.splitlines()
+        self._message = RawMessage(outbound.message)
+
+    def recipients(self):
+        return self._recipients
+
+    def message(self):
+        return self._message
+
+
+def claim(batch_size):
+    now = timezone.now()
+    due = OutboundEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+        next_attempt_at__lte=now,
+    )
+    ids = list(due.order_by('next_attempt_at', 'id').values_list(
+        'id', flat=True)[:batch_size])
+    lease = now + CLAIM_LEASE
+    due.filter(id__in=ids).update(next_attempt_at=lease)
+    return list(OutboundEmail.objects.filter(
+        id__in=ids, sent_at__isnull=True, next_attempt_at=lease))
+
+
+def send_queued(batch_size=100, connection=None):
+    """Send one batch over a single connection.
+
+    Returns (sent, failed) counts. A failed message is retried with
+    exponential backoff until EMAIL_QUEUE_MAX_ATTEMPTS.
+    """
+    batch = claim(batch_size)
+    if not batch:
+        return 0, 0
+    connection = connection or get_connection(
+        settings.EMAIL_QUEUE_BACKEND, fail_silently=False)
+    sent, failed = [], []
+    connection.open()
+    try:
+        for outbound in batch:
+            try:
+                connection.send_messages([StoredMessage(outbound)])
+            except Exception as error:
+                outbound.attempts += 1
+                outbound.last_error = f'{type(error).__name__}: {error}'
+                outbound.next_attempt_at = timezone.now() + timedelta(
+                    seconds=settings.EMAIL_QUEUE_RETRY_DELAY
+                    * 2 ** (outbound.attempts - 1))
+                failed.append(outbound)
+                # The server may have dropped the connection.
+                connection.close()
+                connection.open()
+            else:
+                outbound.attempts += 1
+                outbound.sent_at = timezone.now()
+                sent.append(outbound)
+    finally:
+        connection.close()
+        OutboundEmail.objects.bulk_update(
+            sent + failed,
+            ('attempts', 'sent_at', 'last_error', 'next_attempt_at'))
+    return len(sent), len(failed)
@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings  # type: ignore
+from django.core.management.base import (  # type: ignore
+    BaseCommand, CommandError
+)
+from django.db import connection  # type: ignore
+from django.test import Client  # type: ignore
+
+from blog.models import Post
+from blog.views import filter_published
+
+
+def url_pairs():
+    post = filter_published(Post.objects.select_related(
+        'author', 'category')).order_by('-pub_date').first()
+    if post is None:
+        raise CommandError('Нет опубликованных постов для замера.')
+    return (
+        ('лента', '/', '/api/v1/posts/'),
+        ('категория', f'/category/{post.category.slug}/',
+         f'/api/v1/categories/{post.category.slug}/posts/'),
+        ('профиль', f'/profile/{post.author.username}/',
+         f'/api/v1/users/{post.author.username}/posts/'),
+        ('пост', f'/posts/{post.id}/', f'/api/v1/posts/{post.id}/'),
+        ('комментарии', f'/posts/{post.id}/',
+         f'/api/v1/posts/{post.id}/comments/'),
+    )
+
+
+def measure(client, url, repeat):
+    # connection.queries is reset on every request, so count directly.
+    queries = []
+    with connection.execute_wrapper(
+            lambda execute, sql, *args: queries.append(sql)
+            or execute(sql, *args)):
+        response = client.get(url)
+    if response.status_code != 200:
+        raise CommandError(f'{url}: HTTP {response.status_code}')
+    started = time.perf_counter()
+    for _ in range(repeat):
+        client.get(url)
+    elapsed = time.perf_counter() - started
+    return repeat / elapsed, len(queries), len(response.content)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность JSON API и HTML-страниц '
+            'на тех же данных (запросы в процессе, без сети).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, repeat, **options):
+        host = next((host for host in settings.ALLOWED_HOSTS
+                     if host not in ('*',) and not host.startswith('.')),
+                    'localhost')
+        # An address outside INTERNAL_IPS keeps the debug toolbar off.
+        client = Client(HTTP_HOST=host, REMOTE_ADDR='192.0.2.1')
+        self.stdout.write(
+            f'{"страница":<12} {"HTML rps":>9} {"API rps":>9} {"x":>5} '
+            f'{"SQL":>7} {"байт":>13}')
+        for name, html_url, api_url in url_pairs():
+            html_rps, html_queries, html_size = measure(
+                client, html_url, repeat)
+            api_rps, api_queries, api_size = measure(client, api_url, repeat)
+            self.stdout.write(
+                f'{name:<12} {html_rps:>9.0f} {api_rps:>9.0f} '
+                f'{api_rps / html_rps:>5.1f} '
+                f'{html_queries:>3}/{api_queries:<3} '
+                f'{html_size:>6}/{api_size:<6}')
@@ -0,0 +1,203 @@
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings  # type: ignore
+from django.core.management.base import (  # type: ignore
+    BaseCommand, CommandError
+)
+from django.db import connection  # type: ignore
+from django.test import Client  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from blog.models import Category, Location, Post, User
+from blog.stats import archive_months
+from blog.views import filter_published
+
+SAMPLE_SIZE = 500
+
+# (group, weight, URL template): every page served on a GET, forms
+# aside. Templates are filled from sampled rows; a group with nothing to
+# fill it with (no uploaded images, no staff user) is left out and
+# reported.
+URL_MIX = (
+    ('index', 20, '/'),
+    ('index_page', 5, '/?page={page}'),
+    ('post_detail', 30, '/posts/{post_id}/'),
+    ('media', 6, '/media/{image}'),
+    ('category_posts', 8, '/category/{category_slug}/'),
+    ('categories', 1, '/category/'),
+    ('profile', 8, '/profile/{username}/'),
+    ('location_posts', 2, '/location/{location_id}/'),
+    ('trending', 3, '/trending/'),
+    ('discussed', 1, '/trending/discussed/'),
+    ('archive', 1, '/archive/'),
+    ('archive_year', 1, '/archive/{year}/'),
+    ('archive_month', 2, '/archive/{year_month}/'),
+    ('feed', 2, '/feed/'),
+    ('atom_feed', 1, '/feed/atom/'),
+    ('category_feed', 1, '/category/{category_slug}/feed/'),
+    ('category_atom_feed', 1, '/category/{category_slug}/feed/atom/'),
+    ('author_feed', 1, '/profile/{username}/feed/'),
+    ('author_atom_feed', 1, '/profile/{username}/feed/atom/'),
+    ('sitemap', 1, '/sitemap.xml'),
+    ('sitemap_shard', 1, '/sitemap-posts-0.xml'),
+    ('api_posts', 8, '/api/v1/posts/'),
+    ('api_post_detail', 5, '/api/v1/posts/{post_id}/'),
+    ('api_post_comments', 3, '/api/v1/posts/{post_id}/comments/'),
+    ('export', 1, '/export/posts.jsonl?since={since}'),
+    ('about', 2, '/pages/about/'),
+    ('rules', 1, '/pages/rules/'),
+)
+# Groups requested by a staff user whatever --logged-in-share says.
+STAFF_GROUPS = {'export'}
+
+
+def percentiles(values):
+    if len(values) < 2:
+        return {'p50': values[0], 'p95': values[0], 'p99': values[0]}
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет в процессе взвешенную смесь GET-запросов ко всем '
+            'страницам, кроме форм, и сообщает p50/p95/p99, число '
+            'SQL-запросов и пропускную способность; результат сохраняется '
+            'в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--warmup', type=int, default=50)
+        parser.add_argument('--logged-in-share', type=float, default=0.2,
+                            help='Доля запросов от вошедших пользователей.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('-o', '--output',
+                            help='Файл для результатов в JSON.')
+
+    def handle(self, *args, requests, warmup, logged_in_share, seed, output,
+               **options):
+        self.random = random.Random(seed)
+        self.values = self.sample_values()
+        host = next((host for host in settings.ALLOWED_HOSTS
+                     if host != '*' and not host.startswith('.')),
+                    'localhost')
+        # An address outside INTERNAL_IPS keeps the debug toolbar off.
+        anonymous = Client(HTTP_HOST=host, REMOTE_ADDR='192.0.2.1')
+        member = Client(HTTP_HOST=host, REMOTE_ADDR='192.0.2.1')
+        member.force_login(User.objects.get(
+            username=self.values['username'][0]))
+        staff = Client(HTTP_HOST=host, REMOTE_ADDR='192.0.2.1')
+        staff_user = User.objects.filter(is_staff=True).first()
+        if staff_user is not None:
+            staff.force_login(staff_user)
+
+        mix = [
+            (group, weight, template)
+            for group, weight, template in URL_MIX
+            if all(values or '{%s}' % key not in template
+                   for key, values in self.values.items())
+            and (staff_user is not None or group not in STAFF_GROUPS)
+        ]
+        skipped = sorted({group for group, _, _ in URL_MIX}
+                         - {group for group, _, _ in mix})
+        if skipped:
+            self.stdout.write(
+                f'Пропущены группы без данных: {", ".join(skipped)}')
+        groups = [group for group, _, _ in mix]
+        weights = [weight for _, weight, _ in mix]
+        templates = {group: template for group, _, template in mix}
+        queries = []
+        results = {group: {'latency': [], 'queries': []} for group in groups}
+        with connection.execute_wrapper(
+                lambda execute, *args: queries.append(1) or execute(*args)):
+            for number in range(warmup + requests):
+                group = self.random.choices(groups, weights)[0]
+                client = (member if self.random.random() < logged_in_share
+                          else anonymous)
+                if group in STAFF_GROUPS:
+                    client = staff
+                url = self.fill(templates[group])
+                del queries[:]
+                started = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+                if response.status_code >= 400:
+                    raise CommandError(f'{url}: HTTP {response.status_code}')
+                if number >= warmup:
+                    results[group]['latency'].append(elapsed)
+                    results[group]['queries'].append(len(queries))
+        self.report(results, output)
+
+    def sample_values(self):
+        posts = list(filter_published(Post.objects).order_by(
+            '?').values_list('id', 'author__username')[:SAMPLE_SIZE])
+        if not posts:
+            raise CommandError(
+                'Нет опубликованных постов: сначала запустите generate_data.')
+        pages = max(filter_published(Post.objects).count() // 10, 1)
+        months = [month for month, _ in archive_months()]
+        # An hourly incremental export.
+        since = timezone.localtime() - timedelta(hours=1)
+        return {
+            'post_id': [post_id for post_id, _ in posts],
+            'username': [username for _, username in posts],
+            'category_slug': list(Category.objects.filter(
+                is_published=True).values_list('slug', flat=True)),
+            'page': list(range(1, min(pages, 50) + 1)),
+            'image': list(filter_published(Post.objects).exclude(
+                image='').values_list('image', flat=True)[:SAMPLE_SIZE]),
+            'location_id': list(Location.objects.filter(
+                is_published=True).values_list('id', flat=True)),
+            'year': sorted({month.year for month in months}),
+            'year_month': [f'{month.year}/{month.month}'
+                           for month in months],
+            'since': [since.strftime('%Y-%m-%dT%H:%M:%S')],
+        }
+
+    def fill(self, template):
+        return template.format(**{
+            key: self.random.choice(values)
+            for key, values in self.values.items()
+            if '{%s}' % key in template
+        })
+
+    def report(self, results, output):
+        summary = {'time': timezone.now().isoformat(), 'groups': {}}
+        all_latency = []
+        all_queries = []
+        self.stdout.write(
+            f'{"группа":<18} {"n":>5} {"p50 мс":>8} {"p95 мс":>8} '
+            f'{"p99 мс":>8} {"SQL":>5} {"rps":>7}')
+        for group, data in results.items():
+            if not data['latency']:
+                continue
+            all_latency += data['latency']
+            all_queries += data['queries']
+            summary['groups'][group] = self.row(group, data)
+        summary['total'] = self.row(
+            'всего', {'latency': all_latency, 'queries': all_queries})
+        if output:
+            with open(output, 'w', encoding='utf-8') as file:
+                json.dump(summary, file, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Сохранено в {output}'))
+
+    def row(self, group, data):
+        latency = data['latency']
+        stats = {
+            'requests': len(latency),
+            **{key: value * 1000
+               for key, value in percentiles(latency).items()},
+            'queries_per_request': sum(data['queries']) / len(latency),
+            'throughput': len(latency) / sum(latency),
+        }
+        self.stdout.write(
+            f'{group:<18} {stats["requests"]:>5} {stats["p50"]:>8.1f} '
+            f'{stats["p95"]:>8.1f} {stats["p99"]:>8.1f} '
+            f'{stats["queries_per_request"]:>5.1f} '
+            f'{stats["throughput"]:>7.0f}')
+        return stats
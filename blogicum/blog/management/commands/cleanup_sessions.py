@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand  # type: ignore
+
+from blogicum.sessions import delete_expired, flush_pending
+
+
+class Command(BaseCommand):
+    help = ('Удаляет истёкшие сессии небольшими пакетами в отдельных '
+            'транзакциях, не дольше заданного времени.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--max-seconds', type=float, default=60,
+                            help='0 — без ограничения по времени.')
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Пауза между пакетами, с.')
+
+    def handle(self, *args, batch_size, max_seconds, pause, **options):
+        flush_pending()
+        deleted = delete_expired(batch_size, max_seconds or None, pause)
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено истёкших сессий: {deleted}'))
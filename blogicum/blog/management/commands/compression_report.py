@@ -0,0 +1,83 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser  # type: ignore
+from django.core.management.base import BaseCommand  # type: ignore
+from django.core.paginator import Paginator  # type: ignore
+from django.template.loader import render_to_string  # type: ignore
+from django.test import RequestFactory  # type: ignore
+from django.utils import timezone  # type: ignore
+from faker import Faker  # type: ignore
+
+from blog.models import Category, Location, Post, User
+from blog.views import POSTS_PER_PAGE
+from blogicum.compression import gzip_bytes, gzip_stream
+
+
+def sample_feed(posts):
+    fake = Faker('ru_RU')
+    Faker.seed(0)
+    authors = [User(username=fake.user_name()) for _ in range(5)]
+    categories = [
+        Category(title=fake.word(), slug=f'category-{number}')
+        for number in range(3)
+    ]
+    feed = []
+    for number in range(1, posts + 1):
+        post = Post(
+            id=number,
+            title=fake.sentence(nb_words=4),
+            text=fake.text(max_nb_chars=800),
+            pub_date=timezone.now(),
+            author=authors[number % len(authors)],
+            category=categories[number % len(categories)],
+            location=Location(name=fake.city()),
+        )
+        post.comments_count = number % 7
+        feed.append(post)
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    return render_to_string('blog/index.html', {
+        'page_obj': Paginator(feed, POSTS_PER_PAGE).get_page(1),
+    }, request=request).encode()
+
+
+def cpu_time(function, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        result = function()
+    return (time.process_time() - start) / repeat, result
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает затраты процессора и экономию трафика при сжатии '
+            'страницы ленты на разных уровнях gzip.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=POSTS_PER_PAGE)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, posts, repeat, **options):
+        page = sample_feed(posts)
+        # The same page cut into chunks, as a StreamingHttpResponse
+        # would produce it.
+        chunks = [page[start:start + 2048]
+                  for start in range(0, len(page), 2048)]
+        self.stdout.write(f'Страница ленты: {len(page)} байт\n')
+        self.stdout.write(
+            f'{"level":>5} {"mode":>9} {"bytes":>8} {"ratio":>6} '
+            f'{"ms":>7} {"MB/s":>7} {"saved KB/ms":>11}'
+        )
+        for level in (1, 3, 6, 9):
+            for mode, compress in (
+                ('buffered', lambda: gzip_bytes(page, level)),
+                ('streaming', lambda: b''.join(gzip_stream(chunks, level))),
+            ):
+                seconds, compressed = cpu_time(compress, repeat)
+                saved = len(page) - len(compressed)
+                self.stdout.write(
+                    f'{level:>5} {mode:>9} {len(compressed):>8} '
+                    f'{len(page) / len(compressed):>6.1f} '
+                    f'{seconds * 1000:>7.3f} '
+                    f'{len(page) / seconds / 2 ** 20:>7.1f} '
+                    f'{saved / 1024 / (seconds * 1000):>11.1f}'
+                )
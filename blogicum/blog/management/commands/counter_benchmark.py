@@ -0,0 +1,79 @@
+import random
+import threading
+import time
+
+from django.core.management.base import (  # type: ignore
+    BaseCommand, CommandError
+)
+from django.db import DatabaseError, connection  # type: ignore
+from django.db.models import F  # type: ignore
+
+from blog.counters import CounterBuffer
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает под конкуренцией потоков запись просмотров '
+            'отдельным UPDATE на каждый просмотр и через буфер счётчиков. '
+            'Прежние значения просмотров восстанавливаются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--views', type=int, default=500,
+                            help='Просмотров на поток.')
+        parser.add_argument('--posts', type=int, default=100,
+                            help='Сколько постов просматривать.')
+        parser.add_argument('--flush-size', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, threads, views, posts, flush_size, seed,
+               **options):
+        saved = dict(Post.objects.order_by('?').values_list(
+            'id', 'views')[:posts])
+        if not saved:
+            raise CommandError(
+                'Нет постов: сначала запустите generate_data.')
+        ids = list(saved)
+        random.Random(seed).shuffle(ids)
+        total = threads * views
+        for mode in ('direct', 'buffered'):
+            buffer = CounterBuffer(Post, 'views', 3600, flush_size)
+            errors = []
+            try:
+                started = time.perf_counter()
+                self.run_threads(threads, views, ids, mode, buffer, errors)
+                buffer.flush()
+                elapsed = time.perf_counter() - started
+                written = sum(Post.objects.filter(id__in=ids).values_list(
+                    'views', flat=True)) - sum(saved.values())
+            finally:
+                Post.objects.bulk_update(
+                    [Post(id=pk, views=value) for pk, value in saved.items()],
+                    ['views'])
+            self.stdout.write(
+                f'{mode:<9} {total / elapsed:>9.0f} просмотров/с  '
+                f'{elapsed:>6.2f} с  записано {written} из {total}, '
+                f'ошибок {len(errors)}')
+
+    def run_threads(self, threads, views, ids, mode, buffer, errors):
+        def reader(number):
+            try:
+                for step in range(views):
+                    pk = ids[(number * views + step) % len(ids)]
+                    try:
+                        if mode == 'direct':
+                            Post.objects.filter(id=pk).update(
+                                views=F('views') + 1)
+                        else:
+                            buffer.add(pk)
+                    except DatabaseError as error:
+                        errors.append(error)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=reader, args=(number,))
+                   for number in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,57 @@
+import sys
+import time
+
+from django.core.management.base import (  # type: ignore
+    BaseCommand, CommandError
+)
+from django.utils import timezone  # type: ignore
+from django.utils.dateparse import parse_datetime  # type: ignore
+
+from blog.export import CHUNK_SIZE, EXPORTS, FORMATS, export
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает опубликованные посты или комментарии '
+            'в JSONL или CSV, по частям и с постоянным расходом памяти.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument('--gzip', action='store_true',
+                            help='Сжимать вывод gzip.')
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только появившееся на сайте начиная с этого '
+                 'момента (ISO 8601), например значение «until» прошлого '
+                 'запуска. Правки и повторная публикация скрытых постов '
+                 'не попадают в такую выгрузку.')
+        parser.add_argument('-o', '--output',
+                            help='Файл для записи; по умолчанию stdout.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, kind, format, gzip, since, output, chunk_size,
+               **options):
+        if since:
+            parsed = parse_datetime(since)
+            if parsed is None:
+                raise CommandError(f'Неверная дата в --since: {since}')
+            since = (timezone.make_aware(parsed)
+                     if timezone.is_naive(parsed) else parsed)
+        until = timezone.now()
+        started = time.monotonic()
+        size = 0
+        file = open(output, 'wb') if output else sys.stdout.buffer
+        try:
+            for data in export(kind, format, since or None, until, gzip,
+                               chunk_size):
+                file.write(data)
+                size += len(data)
+        finally:
+            if output:
+                file.close()
+            else:
+                file.flush()
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено {size / 1024:.0f} КБ за {elapsed:.1f} с; '
+            f'until: {until.isoformat()}'))
@@ -0,0 +1,148 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password  # type: ignore
+from django.core.management.base import BaseCommand  # type: ignore
+from django.db import transaction  # type: ignore
+from django.db.models import Max  # type: ignore
+from django.utils import timezone  # type: ignore
+from faker import Faker  # type: ignore
+
+from blog.models import Category, Comment, Location, Post, User
+from blog.stats import reconcile
+from blog.trending import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными в масштабе продакшена: '
+            'пользователи, категории, места, посты (в том числе отложенные) '
+            'и комментарии с неравномерным распределением по постам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--future-share', type=float, default=0.05,
+                            help='Доля отложенных постов.')
+        parser.add_argument('--hidden-share', type=float, default=0.02,
+                            help='Доля снятых с публикации постов.')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Показатель закона Ципфа для числа '
+                                 'комментариев на пост.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.started = time.monotonic()
+        with transaction.atomic():
+            users = self.create_users()
+            categories = self.create_categories()
+            locations = self.create_locations()
+            posts = self.create_posts(users, categories, locations)
+            self.create_comments(users, posts)
+            # bulk_create() sends no signals to keep the scores and stats.
+            rebuild_scores()
+            reconcile()
+
+    def bulk_create(self, model, objects):
+        """Insert and return the ids of the new rows.
+
+        bulk_create() does not set pks on every backend, so the new ids
+        are read back as the range above the previous maximum.
+        """
+        start = model.objects.aggregate(last=Max('id'))['last'] or 0
+        model.objects.bulk_create(
+            objects, batch_size=self.options['batch_size'])
+        ids = list(model.objects.filter(id__gt=start).order_by(
+            'id').values_list('id', flat=True))
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {len(ids)} '
+            f'({time.monotonic() - self.started:.1f} с)')
+        return ids
+
+    def create_users(self):
+        # Hashing is slow on purpose; every generated user shares one
+        # password, 'password'.
+        password = make_password('password')
+        start = User.objects.aggregate(last=Max('id'))['last'] or 0
+        return self.bulk_create(User, [
+            User(
+                username=f'{self.fake.user_name()}{start + number}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                email=self.fake.email(),
+                password=password,
+            )
+            for number in range(self.options['users'])
+        ])
+
+    def create_categories(self):
+        start = Category.objects.aggregate(last=Max('id'))['last'] or 0
+        return self.bulk_create(Category, [
+            Category(
+                title=self.fake.word().capitalize(),
+                description=self.fake.sentence(),
+                slug=f'category-{start + number}',
+                # One category in ten is hidden with all its posts.
+                is_published=number % 10 != 9,
+            )
+            for number in range(self.options['categories'])
+        ])
+
+    def create_locations(self):
+        return self.bulk_create(Location, [
+            Location(name=self.fake.city())
+            for _ in range(self.options['locations'])
+        ])
+
+    def create_posts(self, users, categories, locations):
+        now = timezone.now()
+        pick = self.random.random
+        posts = []
+        for _ in range(self.options['posts']):
+            if pick() < self.options['future_share']:
+                pub_date = now + timedelta(
+                    minutes=self.random.randint(60, 60 * 24 * 30))
+            else:
+                pub_date = now - timedelta(
+                    minutes=self.random.randint(0, 60 * 24 * 730))
+            posts.append(Post(
+                title=self.fake.sentence(nb_words=4)[:256],
+                text=self.fake.text(max_nb_chars=1500),
+                pub_date=pub_date,
+                author_id=self.random.choice(users),
+                category_id=self.random.choice(categories),
+                location_id=(self.random.choice(locations)
+                             if locations and pick() < 0.7 else None),
+                is_published=pick() >= self.options['hidden_share'],
+            ))
+        return self.bulk_create(Post, posts)
+
+    def create_comments(self, users, posts):
+        if not posts:
+            return []
+        # Zipf-like weights over a shuffled order: a few posts collect
+        # most of the comments, as in production.
+        order = list(posts)
+        self.random.shuffle(order)
+        weights = list(accumulate(
+            1 / (rank + 1) ** self.options['skew']
+            for rank in range(len(order))))
+        phrases = [self.fake.sentence() for _ in range(200)]
+        return self.bulk_create(Comment, [
+            Comment(
+                text=self.random.choice(phrases),
+                post_id=post_id,
+                author_id=self.random.choice(users),
+            )
+            for post_id in self.random.choices(
+                order, cum_weights=weights, k=self.options['comments'])
+        ])
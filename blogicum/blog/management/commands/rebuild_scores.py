@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand  # type: ignore
+
+from blog.trending import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает оценки популярности и обсуждаемости постов '
+            'по комментариям и просмотрам: после загрузки данных в обход '
+            'сигналов или смены весов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, batch_size, **options):
+        scored = rebuild_scores(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Постов с оценкой: {scored}'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand  # type: ignore
+
+from blog.stats import reconcile
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает статистику авторов (публикации и комментарии), '
+            'категорий и месяцев архива пакетами: после загрузки данных '
+            'в обход сигналов или для исправления расхождений.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        counted = reconcile(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано пользователей, категорий и месяцев: {counted}'))
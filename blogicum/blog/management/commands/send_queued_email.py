@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand  # type: ignore
+
+from blog.mail import send_queued
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пакетами через одно соединение '
+            'с почтовым сервером.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true',
+                            help='Не завершаться, а ждать новые письма.')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Пауза между опросами очереди, с.')
+
+    def handle(self, *args, batch_size, loop, interval, **options):
+        total_sent = total_failed = 0
+        started = time.monotonic()
+        while True:
+            sent, failed = send_queued(batch_size)
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not loop:
+                break
+            time.sleep(interval)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено: {total_sent}, с ошибкой: {total_failed}, '
+            f'{total_sent / elapsed if elapsed else 0:.0f} писем/с'
+        ))
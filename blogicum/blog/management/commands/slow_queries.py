@@ -0,0 +1,70 @@
+import json
+from collections import Counter, defaultdict
+
+from django.conf import settings  # type: ignore
+from django.core.management.base import (  # type: ignore
+    BaseCommand, CommandError
+)
+
+
+def percentile(values, share):
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def aggregate(lines):
+    groups = defaultdict(lambda: {
+        'durations': [], 'views': Counter(), 'call_sites': Counter()})
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        group = groups[record['fingerprint']]
+        group['sql'] = record['sql']
+        group['durations'].append(record['duration_ms'])
+        group['views'][record.get('view')] += 1
+        group['call_sites'][record.get('call_site')] += 1
+    for group in groups.values():
+        durations = sorted(group['durations'])
+        group.update(
+            count=len(durations),
+            total=sum(durations),
+            p50=percentile(durations, 0.5),
+            p95=percentile(durations, 0.95),
+            max=durations[-1],
+        )
+    return groups
+
+
+class Command(BaseCommand):
+    help = ('Группирует журнал медленных запросов по отпечатку SQL: '
+            'число, суммарное и перцентили времени, представления и '
+            'места в коде.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=str(settings.SLOW_QUERY_LOG))
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--sort', choices=('total', 'count', 'max'),
+                            default='total')
+
+    def handle(self, *args, log, top, sort, **options):
+        try:
+            with open(log, encoding='utf-8') as file:
+                groups = aggregate(file)
+        except FileNotFoundError:
+            raise CommandError(f'Журнал не найден: {log}')
+        ranked = sorted(groups.items(), key=lambda item: item[1][sort],
+                        reverse=True)
+        for fingerprint, group in ranked[:top]:
+            self.stdout.write(self.style.SQL_KEYWORD(
+                f'{fingerprint}  {group["count"]} раз, '
+                f'всего {group["total"]:.0f} мс, p50 {group["p50"]:.1f}, '
+                f'p95 {group["p95"]:.1f}, max {group["max"]:.1f} мс'))
+            self.stdout.write(f'  {group["sql"][:300]}')
+            for name, counter in (('view', group['views']),
+                                  ('код', group['call_sites'])):
+                for value, count in counter.most_common(3):
+                    self.stdout.write(f'  {name}: {value} ({count})')
+        self.stdout.write(self.style.SUCCESS(
+            f'Отпечатков: {len(groups)}, записей: '
+            f'{sum(group["count"] for group in groups.values())}'))
@@ -0,0 +1,38 @@
+from django.conf import settings  # type: ignore
+from django.core.management.base import (  # type: ignore
+    BaseCommand, CommandError
+)
+
+from blogicum.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = ('Показывает время холодного запуска django.setup() с загрузкой '
+            'маршрутов и самые медленные импорты (python -X importtime).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument('--sort', choices=('self', 'cumulative'),
+                            default='cumulative')
+        parser.add_argument('--check', action='store_true',
+                            help='Завершиться с ошибкой, если превышен '
+                                 'STARTUP_TIME_BUDGET.')
+
+    def handle(self, *args, top, sort, check, **options):
+        milliseconds, imports = measure_startup(
+            settings.SETTINGS_MODULE, importtime=True)
+        imports.sort(key=lambda row: row[0 if sort == 'self' else 1],
+                     reverse=True)
+        self.stdout.write(f'{"self, ms":>9} {"total, ms":>9}  module')
+        for own, cumulative, name in imports[:top]:
+            self.stdout.write(
+                f'{own / 1000:>9.1f} {cumulative / 1000:>9.1f}  {name}')
+        budget = settings.STARTUP_TIME_BUDGET
+        summary = (f'Запуск {settings.SETTINGS_MODULE}: {milliseconds:.0f} мс '
+                   f'(бюджет {budget} мс, импортов: {len(imports)})')
+        if milliseconds <= budget:
+            self.stdout.write(self.style.SUCCESS(summary))
+        elif check:
+            raise CommandError(summary)
+        else:
+            self.stdout.write(self.style.WARNING(summary))
@@ -0,0 +1,211 @@
+import gzip
+import json
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+from django.apps import apps  # type: ignore
+from django.core.management.base import (  # type: ignore
+    BaseCommand, CommandError
+)
+from django.core.management.color import no_style  # type: ignore
+from django.core.serializers.python import (  # type: ignore
+    Deserializer as PythonDeserializer
+)
+from django.db import (  # type: ignore
+    DEFAULT_DB_ALIAS, connections, router, transaction
+)
+
+from blog.stats import reconcile
+from blog.trending import rebuild_scores
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(file, chunk_size=CHUNK_SIZE):
+    """Yield the items of a top-level JSON array without loading it all.
+
+    Memory use is bounded by the largest single item plus one chunk.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != '[':
+                raise CommandError('Фикстура должна быть JSON-массивом.')
+            started = True
+            position += 1
+            continue
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                if buffer[position:].strip():
+                    raise CommandError('Фикстура оборвана или повреждена.')
+                return
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+        position = end
+
+
+class Command(BaseCommand):
+    """loaddata for fixtures too large to hold in memory.
+
+    Each batch of a model's rows is committed in its own transaction,
+    so no transaction grows past one batch, and foreign keys are
+    checked once at the end: a broken fixture is reported, but the
+    batches before it stay loaded. With --atomic the
+    whole load is one transaction and a broken fixture leaves nothing
+    behind, at the cost of holding every inserted row in the
+    transaction (rollback journal or WAL, locks) until the end.
+    Checks are turned off during the load where the backend can
+    (SQLite); on PostgreSQL, where constraint_checks_disabled() does
+    nothing, Django's deferrable foreign keys are checked by
+    check_constraints() and at commit.
+
+    No signals fire, so the stats and trending scores are rebuilt at
+    the end, as generate_data does.
+
+    Rows go in through QuerySet._insert() with raw=True and replaced
+    rows are removed with _raw_delete(), as Model.save_base(raw=True)
+    and the deletion collector do: bulk_create() would overwrite
+    auto_now_add values and delete() would cascade. Both are private
+    ORM API; recheck them when upgrading Django.
+    """
+
+    help = ('Потоково загружает большую JSON-фикстуру в формате dumpdata: '
+            'пакетный bulk insert по моделям, проверка внешних ключей и '
+            'пересчёт статистики в конце.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Файл .json или .json.gz')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--insert-only', action='store_true',
+            help='Не удалять строки с теми же pk (быстрее на пустой базе).')
+        parser.add_argument(
+            '--atomic', action='store_true',
+            help='Загрузить всё одной транзакцией: при ошибке ничего не '
+                 'остаётся, но база держит все строки до конца загрузки.')
+
+    def handle(self, *args, fixture, database, batch_size, insert_only,
+               atomic, **options):
+        self.using = database
+        self.connection = connections[database]
+        self.replace = not insert_only
+        self.batch_size = batch_size
+        self.pending = defaultdict(list)
+        self.pending_m2m = defaultdict(list)
+        self.loaded = 0
+        self.models = set()
+        self.started = time.monotonic()
+        opener = gzip.open if fixture.endswith('.gz') else open
+        whole_load = (transaction.atomic(using=self.using) if atomic
+                      else nullcontext())
+        with whole_load:
+            with opener(fixture, 'rt', encoding='utf-8') as file, \
+                    self.connection.constraint_checks_disabled():
+                for item in iter_json_array(file):
+                    self.add(item)
+                for model in list(self.pending):
+                    self.flush(model)
+            self.finish()
+
+    def add(self, item):
+        try:
+            model = apps.get_model(item['model'])
+        except (KeyError, LookupError) as error:
+            raise CommandError(f'Неизвестная модель в фикстуре: {error}')
+        if not router.allow_migrate_model(self.using, model):
+            return
+        for deserialized in PythonDeserializer(
+                [item], using=self.using, ignorenonexistent=True):
+            self.pending[model].append(deserialized.object)
+            for field_name, values in (deserialized.m2m_data or {}).items():
+                self.pending_m2m[model].append(
+                    (deserialized.object.pk, field_name, values))
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        objects = self.pending.pop(model, [])
+        m2m = self.pending_m2m.pop(model, [])
+        if not objects:
+            return
+        manager = model._base_manager.using(self.using)
+        keyed = sorted((obj for obj in objects if obj.pk is not None),
+                       key=lambda obj: obj.pk)
+        with transaction.atomic(using=self.using):
+            if self.replace and keyed:
+                manager.filter(
+                    pk__in=[obj.pk for obj in keyed]
+                )._raw_delete(self.using)
+            self.insert(manager, keyed, model._meta.local_concrete_fields)
+            # Rows without a pk get one from the database.
+            self.insert(
+                manager, [obj for obj in objects if obj.pk is None],
+                [field for field in model._meta.local_concrete_fields
+                 if not field.primary_key])
+            self.save_m2m(model, m2m)
+        self.models.add(model)
+        self.loaded += len(objects)
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'{model._meta.label}: +{len(objects)}, всего {self.loaded} '
+            f'({self.loaded / elapsed:.0f} строк/с)')
+
+    def insert(self, manager, objects, fields):
+        if not objects:
+            return
+        step = self.connection.ops.bulk_batch_size(fields, objects) or len(
+            objects)
+        for start in range(0, len(objects), step):
+            # raw=True, like loaddata: keep stored values of
+            # auto_now/auto_now_add fields instead of "now".
+            manager._insert(objects[start:start + step], fields,
+                            using=self.using, raw=True)
+
+    def save_m2m(self, model, m2m):
+        for pk, field_name, values in m2m:
+            field = model._meta.get_field(field_name)
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            manager = through._base_manager.using(self.using)
+            if self.replace:
+                manager.filter(**{source: pk})._raw_delete(self.using)
+            manager.bulk_create([
+                through(**{f'{source}_id': pk, f'{target}_id': value})
+                for value in values
+            ])
+            self.models.add(through)
+
+    def finish(self):
+        # Foreign keys are checked once, for every loaded table.
+        self.connection.check_constraints(
+            table_names=[model._meta.db_table for model in self.models])
+        sequence_sql = self.connection.ops.sequence_reset_sql(
+            no_style(), list(self.models))
+        if sequence_sql:
+            with self.connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+        # Raw inserts send no signals to keep the scores and stats.
+        rebuild_scores()
+        reconcile()
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {self.loaded} объектов за {elapsed:.1f} с '
+            f'({self.loaded / elapsed if elapsed else 0:.0f} строк/с)'))
@@ -0,0 +1,77 @@
+from io import BytesIO
+from pathlib import Path
+
+from django.core.management.base import BaseCommand  # type: ignore
+from PIL import Image, ImageDraw  # type: ignore
+
+from blog.images import WEBP_QUALITY, encode_like, encode_webp
+from blog.models import Post
+
+
+def fixture_images():
+    # The same images the test fixtures upload.
+    for format in ('JPEG', 'PNG'):
+        image = Image.new('RGB', (100, 100), color=(73, 109, 137))
+        yield f'fixture.{format.lower()}', encode_like(image, format)
+
+
+def sample_corpus(size=(1280, 960)):
+    width, height = size
+    gradient = Image.linear_gradient('L').resize(size)
+    photo = Image.merge('RGB', (
+        gradient,
+        gradient.rotate(90).resize(size),
+        Image.effect_noise(size, 48),
+    ))
+    drawing = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(drawing)
+    for step in range(0, width, 40):
+        draw.line((step, 0, width - step, height), fill=(step % 255, 90, 160))
+    for name, image in (('photo', photo), ('drawing', drawing)):
+        for format in ('JPEG', 'PNG'):
+            yield f'{name}.{format.lower()}', encode_like(image, format)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает размер изображений в исходном формате и в WebP.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', type=Path,
+                            help='Каталог с дополнительными изображениями.')
+        parser.add_argument('--quality', type=int, default=WEBP_QUALITY)
+
+    def handle(self, *args, corpus=None, quality=WEBP_QUALITY, **options):
+        sources = [('fixtures', fixture_images()),
+                   ('sample', sample_corpus()),
+                   ('uploads', self.uploads())]
+        if corpus:
+            sources.append(('corpus', (
+                (path.name, path.read_bytes())
+                for path in sorted(corpus.iterdir())
+                if path.suffix.lower() in ('.jpg', '.jpeg', '.png')
+            )))
+        total_source = total_webp = 0
+        for group, images in sources:
+            for name, data in images:
+                webp = encode_webp(Image.open(BytesIO(data)), quality)
+                total_source += len(data)
+                total_webp += len(webp)
+                self.stdout.write(
+                    f'{group:10} {name:30} {len(data):>10} {len(webp):>10} '
+                    f'{self.saving(len(data), len(webp)):>7.1f}%'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Итого: {total_source} -> {total_webp} байт, экономия '
+            f'{self.saving(total_source, total_webp):.1f}%'
+        ))
+
+    @staticmethod
+    def saving(source, webp):
+        return 100 * (source - webp) / source if source else 0
+
+    @staticmethod
+    def uploads():
+        for post in Post.objects.exclude(image='').only('image'):
+            if post.image.storage.exists(post.image.name):
+                with post.image.open('rb') as image:
+                    yield Path(post.image.name).name, image.read()
@@ -0,0 +1,141 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings  # type: ignore
+from django.http import (  # type: ignore
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join  # type: ignore
+from django.utils.cache import (  # type: ignore
+    get_conditional_response, patch_vary_headers
+)
+from django.utils.http import http_date, parse_http_date_safe  # type: ignore
+from django.views.decorators.http import require_safe  # type: ignore
+
+from .images import accepts_webp, is_webp_source, webp_name
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """Return (start, end) of a single byte range, or None for the whole file.
+
+    Multiple ranges are answered with the whole file, which RFC 9110
+    allows. Raises ValueError if the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def offload(response, path, full_path):
+    if settings.MEDIA_ACCEL_REDIRECT:
+        response['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_REDIRECT + path)
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+@require_safe
+def serve_media(request, path, document_root=None):
+    if document_root is None:
+        document_root = settings.MEDIA_ROOT
+    negotiate = is_webp_source(path)
+    if negotiate and accepts_webp(request) and os.path.isfile(
+            safe_join(document_root, webp_name(path))):
+        path = webp_name(path)
+    full_path = safe_join(document_root, path)
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if settings.MEDIA_ACCEL_REDIRECT or settings.MEDIA_SENDFILE:
+            response = offload(
+                HttpResponse(content_type=content_type), path, full_path)
+        else:
+            response = file_response(
+                request, full_path, stat, content_type, etag, last_modified)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if negotiate:
+        patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def file_response(request, full_path, stat, content_type, etag,
+                  last_modified):
+    size = stat.st_size
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and range_matches(
+            request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    if byte_range is None:
+        # FileResponse hands a real file to wsgi.file_wrapper, so the
+        # server can sendfile() it without copying through Python.
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(open(full_path, 'rb'), start, end - start + 1),
+            status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        size = end - start + 1
+    response['Content-Length'] = size
+    response['Accept-Ranges'] = 'bytes'
+    return response
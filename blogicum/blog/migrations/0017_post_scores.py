@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('trending', models.FloatField(null=True, verbose_name='Популярность')),
+                ('discussed', models.FloatField(null=True, verbose_name='Обсуждаемость')),
+            ],
+            options={
+                'verbose_name': 'рейтинг публикации',
+                'verbose_name_plural': 'Рейтинги публикаций',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='postscore',
+            index=models.Index(fields=['trending', 'post'], name='blog_postsc_trendin_8970f9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postscore',
+            index=models.Index(fields=['discussed', 'post'], name='blog_postsc_discuss_eef528_idx'),
+        ),
+    ]
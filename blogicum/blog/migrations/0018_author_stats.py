@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0017_post_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='auth.user', verbose_name='Пользователь')),
+                ('posts', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('visible_posts', models.PositiveIntegerField(default=0, verbose_name='Публикаций на сайте')),
+                ('visible_until', models.DateTimeField(help_text='Когда станет виден первый отложенный пост.', null=True, verbose_name='Пересчитать после')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Комментариев к публикациям')),
+                ('comments_written', models.PositiveIntegerField(default=0, verbose_name='Комментариев написано')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+    ]
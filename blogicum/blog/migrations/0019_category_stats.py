@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_author_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='blog.category', verbose_name='Категория')),
+                ('visible_posts', models.PositiveIntegerField(default=0, verbose_name='Публикаций на сайте')),
+                ('latest_pub_date', models.DateTimeField(null=True, verbose_name='Последняя публикация')),
+                ('visible_until', models.DateTimeField(help_text='Когда станет виден первый отложенный пост.', null=True, verbose_name='Пересчитать после')),
+            ],
+            options={
+                'verbose_name': 'статистика категории',
+                'verbose_name_plural': 'Статистика категорий',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_category_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['location', 'pub_date', 'id'], name='blog_post_locatio_ed1304_idx'),
+        ),
+    ]
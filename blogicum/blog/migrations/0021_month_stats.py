@@ -0,0 +1,26 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_post_location_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthStats',
+            fields=[
+                ('month', models.DateField(help_text='Первое число месяца по местному времени.', primary_key=True, serialize=False, verbose_name='Месяц')),
+                ('visible_posts', models.PositiveIntegerField(default=0, verbose_name='Публикаций на сайте')),
+                ('visible_until', models.DateTimeField(help_text='Когда станет виден первый отложенный пост.', null=True, verbose_name='Пересчитать после')),
+            ],
+            options={
+                'verbose_name': 'статистика месяца',
+                'verbose_name_plural': 'Статистика месяцев',
+                'ordering': ('-month',),
+            },
+        ),
+    ]
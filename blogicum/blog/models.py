@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model  # type: ignore
 from django.db import models   # type: ignore
 from django.urls import reverse    # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .images import build_derivatives, has_derivatives
 
 
 User = get_user_model()
@@ -84,11 +87,17 @@ class Post(PublishedModel):
         verbose_name='Категория',
     )
     image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    views = models.PositiveIntegerField('Просмотры', default=0, editable=False)
 
     class Meta(PublishedModel.Meta, RelatedName.Meta):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('created_at',)),
+            models.Index(fields=('pub_date', 'id')),
+            models.Index(fields=('location', 'pub_date', 'id')),
+        )
 
     def __str__(self):
         return self.title[:10]
@@ -96,6 +105,11 @@ class Post(PublishedModel):
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.id})
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.image and not has_derivatives(self.image):
+            build_derivatives(self.image)
+
 
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
@@ -115,6 +129,144 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(fields=('created_at',)),
+            models.Index(fields=('post', 'created_at', 'id')),
+        )
 
     def __str__(self):
         return self.text[:15]
+
+
+class OutboundEmail(models.Model):
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipients = models.TextField('Получатели')
+    message = models.BinaryField('Письмо')
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(fields=('sent_at', 'next_attempt_at')),
+        )
+
+    def __str__(self):
+        return f'{self.recipients.splitlines()[0][:30]} ({self.created_at})'
+
+
+class PostScore(models.Model):
+    """Time-decayed activity of a post, kept up to date by blog.trending."""
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+        verbose_name='Публикация',
+    )
+    trending = models.FloatField('Популярность', null=True)
+    discussed = models.FloatField('Обсуждаемость', null=True)
+
+    class Meta:
+        verbose_name = 'рейтинг публикации'
+        verbose_name_plural = 'Рейтинги публикаций'
+        indexes = (
+            models.Index(fields=('trending', 'post')),
+            models.Index(fields=('discussed', 'post')),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.trending}'
+
+
+class AuthorStats(models.Model):
+    """Profile totals of a user, kept up to date by blog.stats."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    posts = models.PositiveIntegerField('Публикаций', default=0)
+    visible_posts = models.PositiveIntegerField(
+        'Публикаций на сайте', default=0)
+    visible_until = models.DateTimeField(
+        'Пересчитать после',
+        null=True,
+        help_text='Когда станет виден первый отложенный пост.',
+    )
+    comments_received = models.PositiveIntegerField(
+        'Комментариев к публикациям', default=0)
+    comments_written = models.PositiveIntegerField(
+        'Комментариев написано', default=0)
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts}'
+
+
+class CategoryStats(models.Model):
+    """Visible posts of a category, kept up to date by blog.stats."""
+
+    category = models.OneToOneField(
+        Category,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Категория',
+    )
+    visible_posts = models.PositiveIntegerField(
+        'Публикаций на сайте', default=0)
+    latest_pub_date = models.DateTimeField(
+        'Последняя публикация', null=True)
+    visible_until = models.DateTimeField(
+        'Пересчитать после',
+        null=True,
+        help_text='Когда станет виден первый отложенный пост.',
+    )
+
+    class Meta:
+        verbose_name = 'статистика категории'
+        verbose_name_plural = 'Статистика категорий'
+
+    def __str__(self):
+        return f'{self.category_id}: {self.visible_posts}'
+
+
+class MonthStats(models.Model):
+    """Visible posts of a calendar month, kept up to date by blog.stats."""
+
+    month = models.DateField(
+        'Месяц',
+        primary_key=True,
+        help_text='Первое число месяца по местному времени.',
+    )
+    visible_posts = models.PositiveIntegerField(
+        'Публикаций на сайте', default=0)
+    visible_until = models.DateTimeField(
+        'Пересчитать после',
+        null=True,
+        help_text='Когда станет виден первый отложенный пост.',
+    )
+
+    class Meta:
+        verbose_name = 'статистика месяца'
+        verbose_name_plural = 'Статистика месяцев'
+        ordering = ('-month',)
+
+    def __str__(self):
+        return f'{self.month:%Y-%m}: {self.visible_posts}'
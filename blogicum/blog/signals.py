@@ -0,0 +1,34 @@
+from django.db.models.signals import pre_save  # type: ignore
+from django.dispatch import receiver  # type: ignore
+
+from .models import Category, Post
+
+PREVIOUS_FIELDS = ('author_id', 'category_id', 'is_published', 'pub_date')
+PREVIOUS_CATEGORY_FIELDS = ('is_published',)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous(sender, instance, raw=False, **kwargs):
+    """Keep the stored state of an edited post as `_previous`.
+
+    An edit may move a post to another author, category or date, so the
+    post_save receivers keeping feeds and counters need both sides. One
+    query serves all of them; None for new posts.
+    """
+    instance._previous = None
+    if instance.pk is not None and not raw:
+        instance._previous = Post.objects.filter(
+            pk=instance.pk).values(*PREVIOUS_FIELDS).first()
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_category(sender, instance, raw=False, **kwargs):
+    """Keep the stored publication flag of an edited category.
+
+    Only publishing or hiding a category changes which posts are shown,
+    so the counters skip every other edit. None for new categories.
+    """
+    instance._previous = None
+    if instance.pk is not None and not raw:
+        instance._previous = Category.objects.filter(
+            pk=instance.pk).values(*PREVIOUS_CATEGORY_FIELDS).first()
@@ -0,0 +1,248 @@
+import zlib
+from xml.sax.saxutils import escape
+
+from django.conf import settings  # type: ignore
+from django.core.cache import caches  # type: ignore
+from django.db.models import Max  # type: ignore
+from django.db.models.signals import post_delete, post_save  # type: ignore
+from django.dispatch import receiver  # type: ignore
+from django.http import (  # type: ignore
+    Http404, HttpResponse, StreamingHttpResponse
+)
+from django.urls import reverse  # type: ignore
+from django.utils.cache import patch_vary_headers  # type: ignore
+from django.views.decorators.http import require_safe  # type: ignore
+
+from blogicum.compression import ACCEPTS_GZIP_RE
+from .feeds import next_publication_timeout
+from .models import Category, Post, User
+from .views import filter_published
+
+CHUNK_SIZE = 2000
+XML_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<{} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+
+def get_cache():
+    return caches[settings.SITEMAP_CACHE]
+
+
+def shard_of(pk):
+    """Shards are fixed id ranges, so a row never moves between them."""
+    return (pk - 1) // settings.SITEMAP_SHARD_SIZE
+
+
+def shard_range(shard):
+    size = settings.SITEMAP_SHARD_SIZE
+    return shard * size, (shard + 1) * size
+
+
+class Section:
+    """Rows of one sitemap; subclasses define location(row)."""
+
+    name = None
+    model = None
+    columns = ('id',)
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def lastmod(self, row):
+        return None
+
+    def timeout(self, shard):
+        return settings.SITEMAP_CACHE_TIMEOUT
+
+    def shards(self):
+        last = self.get_queryset().aggregate(last=Max('id'))['last']
+        return range(shard_of(last) + 1) if last else range(0)
+
+    def rows(self, shard):
+        """Rows of one shard, read in pk keyset chunks."""
+        last_pk, end = shard_range(shard)
+        queryset = self.get_queryset().filter(id__lte=end).order_by('id')
+        while True:
+            chunk = list(queryset.filter(id__gt=last_pk).values_list(
+                *self.columns)[:CHUNK_SIZE])
+            yield from chunk
+            if len(chunk) < CHUNK_SIZE:
+                return
+            last_pk = chunk[-1][0]
+
+
+class PostSection(Section):
+    name = 'posts'
+    model = Post
+    columns = ('id', 'pub_date')
+
+    def get_queryset(self):
+        return filter_published(Post.objects)
+
+    def location(self, row):
+        # reverse() for every one of 50k rows would dominate the shard.
+        if not hasattr(self, 'template'):
+            self.template = reverse(
+                'blog:post_detail', args=[0]).replace('/0/', '/{}/')
+        return self.template.format(row[0])
+
+    def lastmod(self, row):
+        return row[1].date().isoformat()
+
+    def timeout(self, shard):
+        start, end = shard_range(shard)
+        scheduled = next_publication_timeout(
+            Post.objects.filter(id__gt=start, id__lte=end))
+        if scheduled is None:
+            return super().timeout(shard)
+        return min(scheduled, super().timeout(shard))
+
+
+class CategorySection(Section):
+    name = 'categories'
+    model = Category
+    columns = ('id', 'slug')
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+    def location(self, row):
+        return reverse('blog:category_posts', args=[row[1]])
+
+
+class ProfileSection(Section):
+    name = 'profiles'
+    model = User
+    columns = ('id', 'username')
+
+    def get_queryset(self):
+        return User.objects.filter(is_active=True)
+
+    def location(self, row):
+        return reverse('blog:profile', args=[row[1]])
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def version_key(name, shard=None):
+    if shard is None:
+        return f'sitemap-version:{name}'
+    return f'sitemap-version:{name}:{shard}'
+
+
+def invalidate(name, shard=None):
+    cache = get_cache()
+    key = version_key(name, shard)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def shard_key(request, name, shard):
+    keys = (version_key(name), version_key(name, shard))
+    versions = get_cache().get_many(keys)
+    return 'sitemap:{}:{}:{}:{}:{}'.format(
+        request.build_absolute_uri('/'), name, shard,
+        versions.get(keys[0], 0), versions.get(keys[1], 0))
+
+
+def render_shard(request, section, shard):
+    base = request.build_absolute_uri('/')[:-1]
+    yield XML_HEADER.format('urlset').encode()
+    lines = []
+    for row in section.rows(shard):
+        lastmod = section.lastmod(row)
+        lines.append('<url><loc>{}</loc>{}</url>\n'.format(
+            escape(base + section.location(row)),
+            f'<lastmod>{lastmod}</lastmod>' if lastmod else ''))
+        if len(lines) == CHUNK_SIZE:
+            yield ''.join(lines).encode()
+            lines = []
+    lines.append('</urlset>\n')
+    yield ''.join(lines).encode()
+
+
+def cache_while_streaming(chunks, key, timeout):
+    """Pass chunks through and cache them, gzipped, once all are sent.
+
+    Only the compressed copy is kept in memory; a client that
+    disconnects early leaves nothing in the cache.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    compressed = []
+    for chunk in chunks:
+        compressed.append(compressor.compress(chunk))
+        yield chunk
+    compressed.append(compressor.flush())
+    get_cache().set(key, b''.join(compressed), timeout)
+
+
+def gunzip_stream(data, chunk_size=64 * 1024):
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for start in range(0, len(data), chunk_size):
+        yield decompressor.decompress(data[start:start + chunk_size])
+    yield decompressor.flush()
+
+
+@require_safe
+def sitemap_index(request):
+    base = request.build_absolute_uri('/')[:-1]
+    lines = [XML_HEADER.format('sitemapindex')]
+    for name, section in SECTIONS.items():
+        for shard in section.shards():
+            location = reverse('blog:sitemap_shard', args=[name, shard])
+            lines.append(
+                f'<sitemap><loc>{escape(base + location)}</loc></sitemap>\n')
+    lines.append('</sitemapindex>\n')
+    return HttpResponse(''.join(lines), content_type='application/xml')
+
+
+@require_safe
+def sitemap_shard(request, section, shard):
+    if section not in SECTIONS:
+        raise Http404
+    key = shard_key(request, section, shard)
+    cached = get_cache().get(key)
+    if cached is None:
+        section = SECTIONS[section]
+        return StreamingHttpResponse(
+            cache_while_streaming(
+                render_shard(request, section, shard), key,
+                section.timeout(shard)),
+            content_type='application/xml')
+    if ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        response = HttpResponse(cached, content_type='application/xml')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = StreamingHttpResponse(
+            gunzip_stream(cached), content_type='application/xml')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_shard(sender, instance, **kwargs):
+    invalidate('posts', shard_of(instance.pk))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_shards(sender, instance, **kwargs):
+    invalidate('categories', shard_of(instance.pk))
+    # Hiding a category hides its posts in every shard.
+    invalidate('posts')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_profile_shard(sender, instance, update_fields=None,
+                             **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate('profiles', shard_of(instance.pk))
@@ -0,0 +1,419 @@
+from datetime import datetime, time, timedelta
+from threading import local
+
+from django.conf import settings  # type: ignore
+from django.core.cache import caches  # type: ignore
+from django.db import transaction  # type: ignore
+from django.db.models import (  # type: ignore
+    Count, DateField, F, Max, Min, Q, Subquery
+)
+from django.db.models.functions import TruncMonth  # type: ignore
+from django.db.models.signals import (  # type: ignore
+    post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .models import (
+    AuthorStats, Category, CategoryStats, Comment, MonthStats, Post, User
+)
+from .visibility import filter_published, scheduled, visible_from
+
+POST_FIELDS = ('posts', 'visible_posts', 'visible_until')
+COMMENT_FIELDS = ('comments_received', 'comments_written')
+CATEGORY_FIELDS = ('visible_posts', 'latest_pub_date', 'visible_until')
+MONTH_FIELDS = ('visible_posts', 'visible_until')
+# Fields whose change can show or hide a post in its month.
+MONTH_POST_FIELDS = ('category_id', 'is_published', 'pub_date')
+
+MONTHS_VERSION_KEY = 'archive-months-version'
+# Two SQL parameters per month keep a batch under SQLite's 999.
+MONTH_BATCH_SIZE = 300
+
+
+def grouped(queryset, key, aggregate):
+    return dict(queryset.order_by().values(key).annotate(
+        value=aggregate).values_list(key, 'value'))
+
+
+def save_rows(model, rows, existing, fields):
+    with transaction.atomic():
+        model.objects.bulk_update(
+            [row for pk, row in rows.items() if pk in existing], fields)
+        model.objects.bulk_create(
+            [row for pk, row in rows.items() if pk not in existing],
+            ignore_conflicts=True)
+
+
+def outdated(stats):
+    """Missing, or a scheduled post has come out since it was counted."""
+    return stats is None or (stats.visible_until is not None
+                             and stats.visible_until <= timezone.now())
+
+
+def recount(user_ids, comments=False, create=False):
+    """Recount the stats of `user_ids` with a few grouped queries.
+
+    Post counts are always recounted, comment counts with `comments`.
+    Rows are only created with `create`: the write paths run inside
+    cascades that may be deleting the user.
+    """
+    user_ids = sorted(set(user_ids) - {None})
+    if not user_ids:
+        return
+    existing = set(AuthorStats.objects.filter(
+        user_id__in=user_ids).values_list('user_id', flat=True))
+    if not create:
+        user_ids = sorted(existing)
+        if not user_ids:
+            return
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    posts = Post.objects.filter(author_id__in=user_ids)
+    totals = grouped(posts, 'author_id', Count('id'))
+    visible = grouped(filter_published(posts), 'author_id', Count('id'))
+    first = grouped(scheduled(posts), 'author_id', Min('pub_date'))
+    counted = user_ids if comments else missing
+    received = grouped(
+        Comment.objects.filter(post__author_id__in=counted),
+        'post__author_id', Count('id')) if counted else {}
+    written = grouped(
+        Comment.objects.filter(author_id__in=counted),
+        'author_id', Count('id')) if counted else {}
+    save_rows(AuthorStats, {
+        user_id: AuthorStats(
+            user_id=user_id,
+            posts=totals.get(user_id, 0),
+            visible_posts=visible.get(user_id, 0),
+            visible_until=(visible_from(first[user_id])
+                           if user_id in first else None),
+            comments_received=received.get(user_id, 0),
+            comments_written=written.get(user_id, 0),
+        )
+        for user_id in user_ids
+    }, existing, POST_FIELDS + (COMMENT_FIELDS if comments else ()))
+
+
+def recount_categories(category_ids, create=False):
+    """Recount the visible posts of `category_ids`; see recount()."""
+    category_ids = sorted(set(category_ids) - {None})
+    if not category_ids:
+        return
+    existing = set(CategoryStats.objects.filter(
+        category_id__in=category_ids).values_list('category_id', flat=True))
+    if not create:
+        category_ids = sorted(existing)
+        if not category_ids:
+            return
+    posts = Post.objects.filter(category_id__in=category_ids)
+    visible = filter_published(posts).order_by().values(
+        'category_id').annotate(count=Count('id'), latest=Max('pub_date'))
+    visible = {row['category_id']: row for row in visible}
+    first = grouped(scheduled(posts), 'category_id', Min('pub_date'))
+    save_rows(CategoryStats, {
+        category_id: CategoryStats(
+            category_id=category_id,
+            visible_posts=visible.get(category_id, {}).get('count', 0),
+            latest_pub_date=visible.get(category_id, {}).get('latest'),
+            visible_until=(visible_from(first[category_id])
+                           if category_id in first else None),
+        )
+        for category_id in category_ids
+    }, existing, CATEGORY_FIELDS)
+
+
+def month_of(moment):
+    return timezone.localdate(moment).replace(day=1)
+
+
+def month_range(month):
+    """The first moment of `month` and of the month after it."""
+    following = (month + timedelta(days=31)).replace(day=1)
+    return tuple(timezone.make_aware(datetime.combine(day, time.min))
+                 for day in (month, following))
+
+
+def recount_months(months):
+    """Recount the visible posts of `months`, a grouped pass per batch.
+
+    Only the posts inside the given months are read, each month a range
+    of the pub_date index. Months left without visible or scheduled
+    posts lose their row, and the cached month list is invalidated.
+    """
+    months = sorted(set(months) - {None})
+    for start in range(0, len(months), MONTH_BATCH_SIZE):
+        recount_month_batch(months[start:start + MONTH_BATCH_SIZE])
+    if months:
+        invalidate_months()
+
+
+def recount_month_batch(months):
+    within = Q()
+    for month in months:
+        start, end = month_range(month)
+        within |= Q(pub_date__gte=start, pub_date__lt=end)
+    posts = Post.objects.filter(within).annotate(
+        month=TruncMonth('pub_date', output_field=DateField()))
+    visible = grouped(filter_published(posts), 'month', Count('id'))
+    first = grouped(scheduled(posts), 'month', Min('pub_date'))
+    existing = set(MonthStats.objects.filter(
+        month__in=months).values_list('month', flat=True))
+    rows = {
+        month: MonthStats(
+            month=month,
+            visible_posts=visible.get(month, 0),
+            visible_until=(visible_from(first[month])
+                           if month in first else None),
+        )
+        for month in months if month in visible or month in first
+    }
+    with transaction.atomic():
+        save_rows(MonthStats, rows, existing, MONTH_FIELDS)
+        MonthStats.objects.filter(month__in=[
+            month for month in existing if month not in rows]).delete()
+
+
+def invalidate_months():
+    cache = caches[settings.ARCHIVE_CACHE]
+    cache.add(MONTHS_VERSION_KEY, 0, None)
+    try:
+        cache.incr(MONTHS_VERSION_KEY)
+    except ValueError:
+        cache.set(MONTHS_VERSION_KEY, 1, None)
+
+
+def months_key(cache):
+    return f'archive-months:{cache.get(MONTHS_VERSION_KEY, 0)}'
+
+
+def archive_months():
+    """(month, visible posts) of every month with posts, newest first.
+
+    Cached until the next recount or until a scheduled post comes out;
+    the months it comes out in are recounted on the next miss.
+    """
+    cache = caches[settings.ARCHIVE_CACHE]
+    key = months_key(cache)
+    months = cache.get(key)
+    if months is not None:
+        return months
+    rows = list(MonthStats.objects.all())
+    due = [row.month for row in rows if outdated(row)]
+    if due:
+        recount_months(due)
+        key = months_key(cache)
+        rows = list(MonthStats.objects.all())
+    months = [(row.month, row.visible_posts)
+              for row in rows if row.visible_posts]
+    timeout = settings.ARCHIVE_CACHE_TIMEOUT
+    pending = [row.visible_until for row in rows if row.visible_until]
+    if pending:
+        timeout = min(timeout, max(int(
+            (min(pending) - timezone.now()).total_seconds()) + 1, 1))
+    cache.set(key, months, timeout)
+    return months
+
+
+def author_stats(user):
+    """The stats of `user`, counted now if missing or outdated.
+
+    The visible post count changes without a write when a scheduled post
+    comes out, so it is recounted after `visible_until`.
+    """
+    try:
+        stats = user.stats
+    except AuthorStats.DoesNotExist:
+        stats = None
+    if outdated(stats):
+        recount([user.pk], create=True)
+        stats = user.stats = AuthorStats.objects.get(user_id=user.pk)
+    return stats
+
+
+def category_stats(categories):
+    """Attach up-to-date `stats` to `categories`, fetched with them."""
+    stale = []
+    for category in categories:
+        try:
+            stats = category.stats
+        except CategoryStats.DoesNotExist:
+            stats = None
+        if outdated(stats):
+            stale.append(category)
+    if stale:
+        recount_categories([category.pk for category in stale], create=True)
+        fresh = CategoryStats.objects.in_bulk(
+            [category.pk for category in stale])
+        for category in stale:
+            category.stats = fresh[category.pk]
+    return categories
+
+
+def reconcile(batch_size=500):
+    """Recount every user's, category's and month's stats in batches.
+
+    Returns the number of users, categories and months counted.
+    """
+    counted = 0
+    for model, recount_batch in (
+            (User, lambda ids: recount(ids, comments=True, create=True)),
+            (Category, lambda ids: recount_categories(ids, create=True))):
+        last = 0
+        while True:
+            ids = list(model.objects.filter(pk__gt=last).order_by(
+                'pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            recount_batch(ids)
+            counted += len(ids)
+            last = ids[-1]
+    months = sorted({
+        month_of(moment)
+        for moment in Post.objects.datetimes('pub_date', 'month')
+    } | set(MonthStats.objects.values_list('month', flat=True)))
+    for start in range(0, len(months), batch_size):
+        recount_months(months[start:start + batch_size])
+    return counted + len(months)
+
+
+class Cascade(local):
+    """The posts and users a delete removes, and what it left to count.
+
+    Comments deleted with their post or author skip their own updates;
+    the post or user handler recounts the rows they touched once.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.posts, self.users = set(), set()
+        self.authors, self.commented = set(), set()
+        self.categories, self.months = set(), set()
+        self.counting = False
+
+    def deleting(self):
+        # A delete sends every pre_delete before its first post_delete,
+        # so a pre_delete after one starts a new delete; this also drops
+        # the marks of a delete that was rolled back midway.
+        if self.counting:
+            self.reset()
+        return self
+
+
+cascade = Cascade()
+
+
+@receiver(pre_delete, sender=Post)
+def mark_deleted_post(sender, instance, **kwargs):
+    cascade.deleting().posts.add(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def mark_deleted_user(sender, instance, **kwargs):
+    cascade.deleting().users.add(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None) or {}
+    moved = previous.get('author_id', instance.author_id) != (
+        instance.author_id)
+    recount([instance.author_id, previous.get('author_id')],
+            comments=moved)
+    recount_categories([instance.category_id, previous.get('category_id')])
+    if not previous or any(previous[field] != getattr(instance, field)
+                           for field in MONTH_POST_FIELDS):
+        recount_months([month_of(instance.pub_date)] + (
+            [month_of(previous['pub_date'])] if previous else []))
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    cascade.counting = True
+    cascade.posts.discard(instance.pk)
+    if instance.author_id in cascade.users:
+        # Deleted with its author: uncount_user recounts once for all.
+        cascade.categories.add(instance.category_id)
+        cascade.months.add(month_of(instance.pub_date))
+        return
+    # Its comments are gone: recount their authors' comments too.
+    recount([instance.author_id, *cascade.authors], comments=True)
+    cascade.authors.clear()
+    recount_categories([instance.category_id])
+    recount_months([month_of(instance.pub_date)])
+
+
+@receiver(post_delete, sender=User)
+def uncount_user(sender, instance, **kwargs):
+    cascade.counting = True
+    # Authors of the posts the user's deleted comments were left on.
+    authors = cascade.authors | set(Post.objects.filter(
+        pk__in=cascade.commented).values_list('author_id', flat=True))
+    recount(authors - cascade.users, comments=True)
+    recount_categories(cascade.categories)
+    recount_months(sorted(cascade.months))
+    cascade.reset()
+
+
+@receiver(post_save, sender=Category)
+def count_category(sender, instance, raw=False, **kwargs):
+    # Publishing or hiding a category shows or hides its posts; other
+    # edits change no count.
+    previous = getattr(instance, '_previous', None)
+    if raw or (previous
+               and previous['is_published'] == instance.is_published):
+        return
+    recount(instance.posts.values_list('author_id', flat=True).distinct())
+    recount_categories([instance.pk], create=True)
+    recount_months(category_months(instance))
+
+
+def category_months(category):
+    return [month_of(moment)
+            for moment in category.posts.datetimes('pub_date', 'month')]
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_authors(sender, instance, **kwargs):
+    # Its posts lose the category before post_delete can find them.
+    instance._author_ids = list(
+        instance.posts.values_list('author_id', flat=True).distinct())
+    instance._months = category_months(instance)
+
+
+@receiver(post_delete, sender=Category)
+def uncount_category(sender, instance, **kwargs):
+    recount(getattr(instance, '_author_ids', []))
+    recount_months(getattr(instance, '_months', []))
+
+
+def add_comment(comment, step):
+    received = AuthorStats.objects.filter(user_id=Subquery(
+        Post.objects.filter(pk=comment.post_id).values('author_id')[:1]))
+    written = AuthorStats.objects.filter(user_id=comment.author_id)
+    if step < 0:
+        received = received.filter(comments_received__gt=0)
+        written = written.filter(comments_written__gt=0)
+    received.update(comments_received=F('comments_received') + step)
+    written.update(comments_written=F('comments_written') + step)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add_comment(instance, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    cascade.counting = True
+    if (instance.post_id not in cascade.posts
+            and instance.author_id not in cascade.users):
+        add_comment(instance, -1)
+        return
+    # Deleted with its post or author: counted once after them.
+    cascade.authors.add(instance.author_id)
+    if instance.post_id not in cascade.posts:
+        cascade.commented.add(instance.post_id)
@@ -0,0 +1,12 @@
+from django import template  # type: ignore
+
+from ..images import card_name, has_card
+
+register = template.Library()
+
+
+@register.filter
+def card_url(image):
+    if has_card(image):
+        return image.storage.url(card_name(image.name))
+    return image.url
@@ -0,0 +1,13 @@
+from django import template  # type: ignore
+
+from ..locations import get_location
+
+register = template.Library()
+
+
+@register.filter
+def cached_location(post):
+    """The post's location from blog.locations, without a query."""
+    if post.location_id is None:
+        return None
+    return get_location(post.location_id)
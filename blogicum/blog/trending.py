@@ -0,0 +1,178 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings  # type: ignore
+from django.db import transaction  # type: ignore
+from django.db.models import (  # type: ignore
+    Case, F, FloatField, Value, When
+)
+from django.db.models.functions import (  # type: ignore
+    Abs, Greatest, Log, Power
+)
+from django.db.models.signals import post_delete, post_save  # type: ignore
+from django.dispatch import receiver  # type: ignore
+from django.http import HttpResponseBadRequest  # type: ignore
+from django.shortcuts import render  # type: ignore
+from django.utils import timezone  # type: ignore
+
+from .counters import counters_flushed, post_views
+from .models import Comment, Post, PostScore
+from .views import filter_published, keyset_page
+
+EPOCH = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+# Feed name -> (PostScore field, title).
+FEEDS = {
+    'trending': ('trending', 'Популярное'),
+    'discussed': ('discussed', 'Обсуждаемое'),
+}
+
+# A post takes about ten SQL parameters in a view update; a batch stays
+# well under SQLite's 999.
+BATCH_SIZE = 50
+
+# The score in log2 below which a post has no activity left.
+NO_ACTIVITY = 1e-9
+
+
+def log_weight(weight, moment):
+    """log2 of `weight` counted at `moment` in half-lives since EPOCH.
+
+    A score is log2 of the sum of such weights. Every score decays at the
+    same rate, so instead of lowering all of them over time each new
+    event weighs twice as much per half-life passed: the order stays
+    that of the decayed scores, and only the posts that change are
+    written. Working in log2 keeps the growing weights in a float.
+    """
+    return (math.log2(weight)
+            + (moment - EPOCH).total_seconds() / settings.TRENDING_HALF_LIFE)
+
+
+def log_sum(values):
+    top = max(values)
+    return top + math.log2(sum(2 ** (value - top) for value in values))
+
+
+def added(field, value):
+    """SQL for log2(2**field + 2**value); a NULL field means no activity."""
+    value = Value(value, output_field=FloatField())
+    return Case(
+        When(**{f'{field}__isnull': True}, then=value),
+        default=Greatest(F(field), value) + Log(
+            Value(2.0), Value(1.0) + Power(
+                Value(2.0), Value(0.0) - Abs(F(field) - value))),
+        output_field=FloatField(),
+    )
+
+
+def removed(field, value):
+    """SQL for log2(2**field - 2**value), NULL when nothing is left."""
+    return Case(
+        When(**{f'{field}__gt': value + NO_ACTIVITY}, then=F(field) + Log(
+            Value(2.0), Value(1.0) - Power(
+                Value(2.0), Value(value, output_field=FloatField())
+                - F(field)))),
+        default=Value(None),
+        output_field=FloatField(),
+    )
+
+
+def ensure_scores(post_ids):
+    PostScore.objects.bulk_create(
+        [PostScore(post_id=post_id) for post_id in post_ids],
+        ignore_conflicts=True)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    ensure_scores([instance.post_id])
+    PostScore.objects.filter(post_id=instance.post_id).update(
+        trending=added('trending', log_weight(
+            settings.TRENDING_COMMENT_WEIGHT, instance.created_at)),
+        discussed=added('discussed', log_weight(1, instance.created_at)),
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    PostScore.objects.filter(post_id=instance.post_id).update(
+        trending=removed('trending', log_weight(
+            settings.TRENDING_COMMENT_WEIGHT, instance.created_at)),
+        discussed=removed('discussed', log_weight(1, instance.created_at)),
+    )
+
+
+@receiver(counters_flushed, sender=post_views)
+def count_views(sender, counts, **kwargs):
+    now = timezone.now()
+    rows = sorted(counts.items())
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = dict(rows[start:start + BATCH_SIZE])
+        # Views of a post deleted since are dropped.
+        post_ids = list(Post.objects.filter(
+            id__in=batch).values_list('id', flat=True))
+        if not post_ids:
+            continue
+        ensure_scores(post_ids)
+        PostScore.objects.filter(post_id__in=post_ids).update(
+            trending=Case(*[
+                When(post_id=post_id, then=added('trending', log_weight(
+                    settings.TRENDING_VIEW_WEIGHT * batch[post_id], now)))
+                for post_id in post_ids
+            ], default=F('trending'), output_field=FloatField()))
+
+
+def rebuild_scores(batch_size=2000):
+    """Recompute every score from the comments and view counts.
+
+    For data written without signals (bulk_create, raw SQL) or after a
+    change of the weights. View times are not stored, so the views of a
+    post count at its publication date. Returns the number of posts with
+    any activity.
+    """
+    trending = defaultdict(list)
+    discussed = defaultdict(list)
+    comments = Comment.objects.values_list('post_id', 'created_at')
+    for post_id, created_at in comments.iterator(chunk_size=batch_size):
+        trending[post_id].append(log_weight(
+            settings.TRENDING_COMMENT_WEIGHT, created_at))
+        discussed[post_id].append(log_weight(1, created_at))
+    posts = Post.objects.filter(views__gt=0).values_list(
+        'id', 'pub_date', 'views')
+    for post_id, pub_date, views in posts.iterator(chunk_size=batch_size):
+        trending[post_id].append(log_weight(
+            settings.TRENDING_VIEW_WEIGHT * views, pub_date))
+    with transaction.atomic():
+        PostScore.objects.all().delete()
+        return len(PostScore.objects.bulk_create([
+            PostScore(
+                post_id=post_id,
+                trending=log_sum(values),
+                discussed=(log_sum(discussed[post_id])
+                           if discussed[post_id] else None),
+            )
+            for post_id, values in trending.items()
+        ], batch_size=batch_size))
+
+
+def trending_posts(request, feed='trending'):
+    """Posts by decayed score, the top first, a keyset page at a time."""
+    field, title = FEEDS[feed]
+    key = f'score__{field}'
+    try:
+        posts, next_cursor = keyset_page(
+            request,
+            filter_published(Post.objects.filter(**{f'{key}__isnull': False})),
+            key, float)
+    except ValueError:
+        return HttpResponseBadRequest('Неверный курсор.')
+    return render(request, 'blog/trending.html', {
+        'title': title,
+        'feed': feed,
+        'feeds': {name: feed_title for name, (_, feed_title) in FEEDS.items()},
+        'posts': posts,
+        'next_cursor': next_cursor,
+    })
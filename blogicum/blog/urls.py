@@ -1,6 +1,6 @@
 from django.urls import path  # type: ignore
 
-from . import views
+from . import export, feeds, sitemaps, trending, views
 
 app_name = 'blog'
 
@@ -26,14 +26,63 @@ urlpatterns = [
     path('posts/<int:post_id>/delete/',
          views.PostDeleteView.as_view(),
          name='delete_post'),
+    path('category/',
+         views.categories,
+         name='categories'),
     path('category/<slug:category_slug>/',
          views.category_posts,
          name='category_posts'),
+    path('category/<slug:category_slug>/feed/',
+         feeds.CategoryFeed(),
+         name='category_feed'),
+    path('category/<slug:category_slug>/feed/atom/',
+         feeds.CategoryAtomFeed(),
+         name='category_atom_feed'),
+    path('archive/',
+         views.archive,
+         name='archive'),
+    path('archive/<int:year>/',
+         views.archive,
+         name='archive_year'),
+    path('archive/<int:year>/<int:month>/',
+         views.archive_month,
+         name='archive_month'),
+    path('location/<int:location_id>/',
+         views.location_posts,
+         name='location_posts'),
     path('profile/<str:username>/',
          views.profile,
          name='profile'),
+    path('profile/<str:username>/feed/',
+         feeds.AuthorFeed(),
+         name='author_feed'),
+    path('profile/<str:username>/feed/atom/',
+         feeds.AuthorAtomFeed(),
+         name='author_atom_feed'),
     path('profile/<str:username>/edit/',
          views.edit_profile,
          name='edit_profile'),
+    path('export/<str:kind>.<str:format>',
+         export.export_view,
+         name='export'),
+    path('feed/',
+         feeds.LatestPostsFeed(),
+         name='feed'),
+    path('feed/atom/',
+         feeds.LatestPostsAtomFeed(),
+         name='atom_feed'),
+    path('sitemap.xml',
+         sitemaps.sitemap_index,
+         name='sitemap'),
+    path('sitemap-<str:section>-<int:shard>.xml',
+         sitemaps.sitemap_shard,
+         name='sitemap_shard'),
+    path('trending/',
+         trending.trending_posts,
+         name='trending'),
+    path('trending/discussed/',
+         trending.trending_posts,
+         {'feed': 'discussed'},
+         name='discussed'),
     path('', views.IndexListView.as_view(), name='index'),
 ]
@@ -1,11 +1,12 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from django.contrib.auth.mixins import (  # type: ignore
     LoginRequiredMixin, UserPassesTestMixin
 )
 from django.contrib.auth.decorators import login_required  # type: ignore
 from django.core.paginator import Paginator  # type: ignore
-from django.db.models import Count  # type: ignore
+from django.db.models import Count, Q  # type: ignore
+from django.http import Http404, HttpResponseBadRequest  # type: ignore
 from django.shortcuts import (  # type: ignore
     get_object_or_404, redirect, render
 )
@@ -14,49 +15,150 @@ from django.views.generic import (  # type: ignore
     CreateView, DeleteView, ListView, UpdateView
 )
 
+from .counters import post_views
 from .forms import CommentForm, PostForm, ProfileForm
+from .locations import get_location
 from .models import Comment, Post, Category, User
+from .stats import (
+    archive_months, author_stats, category_stats, month_range
+)
+from .visibility import filter_published
 
 POSTS_PER_PAGE = 10
 
 
-def paginate_posts(request, posts):
-    return Paginator(posts, POSTS_PER_PAGE).get_page(request.GET.get('page'))
+def paginate_posts(request, posts, count=None):
+    paginator = Paginator(posts, POSTS_PER_PAGE)
+    if count is not None:
+        # A total known in advance spares the paginator its COUNT.
+        paginator.count = count
+    return paginator.get_page(request.GET.get('page'))
 
 
 def make_feed(posts, filtrate=True):
+    # Locations come from blog.locations' copy of the table, not a join.
     feed = posts.select_related(
-        'author', 'category', 'location'
+        'author', 'category'
     ).annotate(
         comments_count=Count('comments')
     ).order_by(*Post._meta.ordering)
     if filtrate:
-        return feed.filter(
-            pub_date__date__lte=datetime.now(),
-            is_published=True,
-            category__is_published=True,
-        )
+        return filter_published(feed)
     return feed
 
 
+def keyset_page(request, ranked, key, parse):
+    """One page of `ranked` posts by `key`, highest first, and the cursor
+    of the next page.
+
+    The ids are read by an index seek on (key, id) from the ?after=
+    cursor; the cards are then fetched by id, so the joins and the
+    comment count run for one page only. ValueError for a bad cursor.
+    """
+    if request.GET.get('after'):
+        value, pk = request.GET['after'].rsplit('_', 1)
+        value, pk = parse(value), int(pk)
+        ranked = ranked.filter(
+            Q(**{f'{key}__lt': value}) | Q(**{key: value, 'id__lt': pk}))
+    keys = list(ranked.order_by(f'-{key}', '-id').values_list(
+        key, 'id')[:POSTS_PER_PAGE + 1])
+    position = {pk: index
+                for index, (_, pk) in enumerate(keys[:POSTS_PER_PAGE])}
+    posts = sorted(
+        make_feed(Post.objects.filter(id__in=position)),
+        key=lambda post: position[post.id])
+    if len(keys) <= POSTS_PER_PAGE:
+        return posts, None
+    value, pk = keys[POSTS_PER_PAGE - 1]
+    value = value.isoformat() if isinstance(value, datetime) else repr(value)
+    return posts, f'{value}_{pk}'
+
+
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    stats = author_stats(author)
+    own = request.user == author
     return render(request, 'blog/profile.html', {
         'profile': author,
-        'page_obj': paginate_posts(request, make_feed(
-            author.posts, request.user != author))
+        'stats': stats,
+        'page_obj': paginate_posts(
+            request, make_feed(author.posts, not own),
+            stats.posts if own else stats.visible_posts)
     })
 
 
 def category_posts(request, category_slug):
     category = get_object_or_404(
-        Category,
+        Category.objects.select_related('stats'),
         slug=category_slug,
         is_published=True)
+    category_stats([category])
     return render(request, 'blog/category.html', {
         'category': category,
         'page_obj': paginate_posts(
-            request, make_feed(category.posts)),
+            request, make_feed(category.posts),
+            category.stats.visible_posts),
+    })
+
+
+def location_posts(request, location_id):
+    location = get_location(location_id)
+    if location is None or not location.is_published:
+        raise Http404
+    try:
+        posts, next_cursor = keyset_page(
+            request,
+            filter_published(Post.objects.filter(location_id=location_id)),
+            'pub_date', datetime.fromisoformat)
+    except ValueError:
+        return HttpResponseBadRequest('Неверный курсор.')
+    return render(request, 'blog/location.html', {
+        'location': location,
+        'posts': posts,
+        'next_cursor': next_cursor,
+    })
+
+
+def categories(request):
+    return render(request, 'blog/categories.html', {
+        'categories': category_stats(list(Category.objects.filter(
+            is_published=True).select_related('stats').order_by('title'))),
+    })
+
+
+def archive(request, year=None):
+    months = archive_months()
+    if year is not None:
+        months = [(month, count)
+                  for month, count in months if month.year == year]
+        if not months:
+            raise Http404
+    years = {}
+    for month, count in months:
+        years.setdefault(month.year, []).append((month, count))
+    return render(request, 'blog/archive.html', {
+        'year': year,
+        'years': [
+            (number, sum(count for _, count in year_months), year_months)
+            for number, year_months in years.items()
+        ],
+    })
+
+
+def archive_month(request, year, month):
+    try:
+        first = date(year, month, 1)
+    except ValueError:
+        raise Http404
+    count = dict(archive_months()).get(first)
+    if not count:
+        raise Http404
+    start, end = month_range(first)
+    return render(request, 'blog/archive_month.html', {
+        'month': first,
+        'page_obj': paginate_posts(request, make_feed(Post.objects.filter(
+            pub_date__gte=start, pub_date__lt=end)), count),
     })
 
 
@@ -74,10 +176,12 @@ def edit_profile(request, username):
 
 class IndexListView(ListView):
     model = Post
-    queryset = make_feed(Post.objects)
     template_name = 'blog/index.html'
     paginate_by = POSTS_PER_PAGE
 
+    def get_queryset(self):
+        return make_feed(Post.objects)
+
 
 def post_detail(request, post_id):
     post = get_object_or_404(
@@ -87,6 +191,7 @@ def post_detail(request, post_id):
         post = get_object_or_404(
             make_feed(Post.objects, filtrate=True),
             id=post_id)
+    post_views.add(post.id)
     return render(request, 'blog/detail.html', {
         'post': post,
         'form': CommentForm(),
@@ -0,0 +1,30 @@
+from datetime import datetime, time
+
+from django.utils import timezone  # type: ignore
+
+
+def filter_published(posts):
+    return posts.filter(
+        pub_date__date__lte=datetime.now(),
+        is_published=True,
+        category__is_published=True,
+    )
+
+
+def scheduled(posts):
+    """The posts filter_published() will show once their date comes."""
+    return posts.filter(
+        pub_date__date__gt=timezone.localdate(),
+        is_published=True,
+        category__is_published=True,
+    )
+
+
+def visible_from(pub_date):
+    """When filter_published() starts to show a post of `pub_date`.
+
+    It compares dates, so a post scheduled for later today is already
+    visible and one for a later day shows up at that day's midnight.
+    """
+    return timezone.make_aware(
+        datetime.combine(timezone.localdate(pub_date), time.min))
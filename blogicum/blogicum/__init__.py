@@ -0,0 +1,8 @@
+import os
+
+
+def settings_module():
+    """Settings chosen by BLOGICUM_ENV: `production` or development."""
+    if os.environ.get('BLOGICUM_ENV') == 'production':
+        return 'blogicum.settings_production'
+    return 'blogicum.settings'
@@ -0,0 +1,111 @@
+import re
+import zlib
+from functools import wraps
+
+from django.conf import settings  # type: ignore
+from django.http import FileResponse  # type: ignore
+from django.utils.cache import patch_vary_headers  # type: ignore
+
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b(?!\s*;\s*q=0(\.0*)?\s*(,|$))')
+# Media types that are compressed already or not worth the CPU.
+INCOMPRESSIBLE_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff', 'application/zip',
+    'application/gzip', 'application/x-gzip', 'application/pdf',
+    'application/octet-stream',
+)
+INCOMPRESSIBLE_EXCEPTIONS = ('image/svg+xml',)
+
+
+def compression(enabled=True, level=None, min_size=None):
+    """Override CompressionMiddleware settings for a single view.
+
+    @compression(enabled=False) opts a view out, for example one that
+    streams events and must not wait for compressor buffers.
+    """
+    policy = {'enabled': enabled, 'level': level, 'min_size': min_size}
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+        wrapper.compression_policy = policy
+        return wrapper
+    return decorator
+
+
+def gzip_stream(chunks, level):
+    # Flush after every chunk so readers get content as it is produced.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def gzip_bytes(content, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(content) + compressor.flush()
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].lower()
+    return (
+        response.status_code == 200
+        and not response.has_header('Content-Encoding')
+        and not isinstance(response, FileResponse)
+        and (content_type in INCOMPRESSIBLE_EXCEPTIONS
+             or not content_type.startswith(INCOMPRESSIBLE_TYPES))
+    )
+
+
+class CompressionMiddleware:
+    """Gzip responses, including StreamingHttpResponse, chunk by chunk.
+
+    Views can change the level and threshold or opt out with the
+    @compression decorator. Streaming responses are compressed
+    regardless of COMPRESSION_MIN_SIZE: their size is only known once
+    the headers have been sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.compression_policy = getattr(
+            view_func, 'compression_policy', None)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        policy = getattr(request, 'compression_policy', None) or {}
+        if policy.get('enabled') is False or not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not ACCEPTS_GZIP_RE.search(
+                request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return response
+
+        level = policy.get('level')
+        if level is None:
+            level = settings.COMPRESSION_LEVEL
+        if response.streaming:
+            response.streaming_content = gzip_stream(
+                response.streaming_content, level)
+            del response['Content-Length']
+        else:
+            min_size = policy.get('min_size')
+            if min_size is None:
+                min_size = settings.COMPRESSION_MIN_SIZE
+            if len(response.content) < min_size:
+                return response
+            compressed = gzip_bytes(response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'gzip'
+        return response
@@ -0,0 +1,371 @@
+import atexit
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+from threading import Lock
+
+from django.conf import settings  # type: ignore
+from django.db import connections  # type: ignore
+from django.http import Http404, HttpResponse  # type: ignore
+from django.template.backends.django import (  # type: ignore
+    DjangoTemplates as BaseDjangoTemplates
+)
+from django.template.base import Template as BaseTemplate  # type: ignore
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+# name -> (type, help, buckets or None, label names)
+METRICS = {
+    'blogicum_request_duration_seconds': (
+        'histogram', 'Request latency by view.', LATENCY_BUCKETS, ('view',)),
+    'blogicum_request_queries': (
+        'histogram', 'SQL queries per request by view.', QUERY_BUCKETS,
+        ('view',)),
+    'blogicum_response_size_bytes': (
+        'histogram', 'Response body size by view.', SIZE_BUCKETS, ('view',)),
+    'blogicum_db_queries_total': (
+        'counter', 'SQL queries by view.', None, ('view',)),
+    'blogicum_db_query_seconds_total': (
+        'counter', 'Time spent in SQL by view.', None, ('view',)),
+    'blogicum_template_render_seconds_total': (
+        'counter', 'Time spent rendering templates by view.', None,
+        ('view',)),
+    'blogicum_template_seconds_total': (
+        'counter', 'Own render time of each template and include, '
+        'without the templates it includes or extends.', None,
+        ('view', 'template')),
+    'blogicum_template_renders_total': (
+        'counter', 'Renders of each template and include.', None,
+        ('view', 'template')),
+    'blogicum_template_tag_seconds_total': (
+        'counter', 'Render time of custom template tags, with the '
+        'templates they render.', None, ('view', 'tag')),
+    'blogicum_template_tag_calls_total': (
+        'counter', 'Renders of custom template tags.', None, ('view', 'tag')),
+}
+
+_lock = Lock()
+# (metric, labels) -> counter value, or [bucket counts..., sum, count]
+_values = {}
+_last_flush = time.monotonic()
+_started = int(time.time())
+_current = ContextVar('blogicum_metrics_request', default=None)
+
+
+def observe(name, labels, value):
+    """Add a value to a counter or histogram of this process."""
+    kind, _, buckets, _ = METRICS[name]
+    key = (name, labels)
+    with _lock:
+        if kind == 'counter':
+            _values[key] = _values.get(key, 0) + value
+            return
+        series = _values.get(key)
+        if series is None:
+            series = _values[key] = [0] * (len(buckets) + 3)
+        series[bisect_left(buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+def process_file():
+    return os.path.join(
+        settings.METRICS_DIR, f'{os.getpid()}-{_started}.json')
+
+
+def flush():
+    """Write this process's totals where the /metrics view reads them."""
+    global _last_flush
+    with _lock:
+        data = [[name, list(labels), value]
+                for (name, labels), value in _values.items()]
+        _last_flush = time.monotonic()
+    if not data:
+        return
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    path = process_file()
+    with open(path + '.tmp', 'w') as file:
+        json.dump(data, file)
+    os.replace(path + '.tmp', path)
+
+
+atexit.register(flush)
+
+
+def collect():
+    """Sum the totals every worker process has written."""
+    totals = {}
+    try:
+        names = os.listdir(settings.METRICS_DIR)
+    except FileNotFoundError:
+        return totals
+    for file_name in names:
+        if not file_name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(settings.METRICS_DIR, file_name)) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in data:
+            key = (name, tuple(labels))
+            if isinstance(value, list):
+                series = totals.setdefault(key, [0] * len(value))
+                for index, number in enumerate(value):
+                    series[index] += number
+            else:
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def format_labels(names, labels, **extra):
+    pairs = list(zip(names, labels)) + list(extra.items())
+    return '{%s}' % ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace(
+            '"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs)
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(totals):
+    lines = []
+    for name, (kind, help_text, buckets, names) in METRICS.items():
+        series = sorted(
+            (labels, value) for (metric, labels), value in totals.items()
+            if metric == name)
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in series:
+            if kind == 'counter':
+                lines.append('{}{} {}'.format(
+                    name, format_labels(names, labels), format_number(value)))
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), value):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(
+                    name, format_labels(names, labels, le=bound), cumulative))
+            lines.append('{}_sum{} {}'.format(
+                name, format_labels(names, labels), format_number(value[-2])))
+            lines.append('{}_count{} {}'.format(
+                name, format_labels(names, labels), value[-1]))
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    flush()
+    return HttpResponse(
+        render(collect()), content_type='text/plain; version=0.0.4')
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_seconds', 'template_seconds',
+                 'templates', 'tags', 'nested')
+
+    def __init__(self, detailed=False):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        # name -> [renders, seconds], only with TEMPLATE_METRICS on.
+        self.templates = {} if detailed else None
+        self.tags = {} if detailed else None
+        # Time of the templates rendered inside the one being timed.
+        self.nested = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - started
+
+
+def add_time(totals, name, seconds):
+    entry = totals.get(name)
+    if entry is None:
+        totals[name] = [1, seconds]
+    else:
+        entry[0] += 1
+        entry[1] += seconds
+
+
+_render = None
+
+
+def timed_render(self, context):
+    """Template._render that records the template's own time.
+
+    Extended parents and includes are rendered through _render as well,
+    so their time is taken out of the template that pulls them in.
+    """
+    stats = _current.get()
+    if stats is None or stats.templates is None:
+        return _render(self, context)
+    outer = stats.nested
+    stats.nested = 0.0
+    started = time.perf_counter()
+    try:
+        return _render(self, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        add_time(stats.templates, self.name or '<string>',
+                 elapsed - stats.nested)
+        stats.nested = outer + elapsed
+
+
+def timed_tag(name, compile_function):
+    def compile_timed(parser, token):
+        node = compile_function(parser, token)
+        render = node.render
+
+        def render_timed(context):
+            stats = _current.get()
+            if stats is None or stats.tags is None:
+                return render(context)
+            started = time.perf_counter()
+            try:
+                return render(context)
+            finally:
+                add_time(stats.tags, name, time.perf_counter() - started)
+
+        node.render = render_timed
+        return node
+
+    compile_timed.timed = True
+    return compile_timed
+
+
+def instrument_templates(engine):
+    """Time template renders and the tags of loadable libraries.
+
+    Tags are wrapped when a template is compiled, so this has to run
+    before the engine compiles anything: the backend calls it on start.
+    """
+    global _render
+    if BaseTemplate._render is not timed_render:
+        _render = BaseTemplate._render
+        BaseTemplate._render = timed_render
+    for library_name, library in engine.template_libraries.items():
+        for tag_name, compile_function in library.tags.items():
+            if not getattr(compile_function, 'timed', False):
+                library.tags[tag_name] = timed_tag(
+                    f'{library_name}.{tag_name}', compile_function)
+
+
+class TimedTemplate:
+    """Backend template that adds its render time to the request stats."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return self.template.render(context, request)
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            stats.template_seconds += time.perf_counter() - started
+
+
+class DjangoTemplates(BaseDjangoTemplates):
+    """The Django template backend, timed for MetricsMiddleware.
+
+    With TEMPLATE_METRICS on, every template, include and custom tag is
+    timed as well.
+    """
+
+    def __init__(self, params):
+        super().__init__(params)
+        if settings.TEMPLATE_METRICS:
+            instrument_templates(self.engine)
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class MetricsMiddleware:
+    """Record latency, SQL, template time and size for every view.
+
+    Totals live in this process and are written to METRICS_DIR every
+    METRICS_FLUSH_INTERVAL seconds; /metrics adds up the files of all
+    workers. Put it first in MIDDLEWARE to time the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats(settings.TEMPLATE_METRICS)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        elapsed = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        labels = (match.view_name if match else '<unresolved>',)
+        observe('blogicum_request_duration_seconds', labels, elapsed)
+        observe('blogicum_request_queries', labels, stats.queries)
+        observe('blogicum_db_queries_total', labels, stats.queries)
+        observe('blogicum_db_query_seconds_total', labels,
+                stats.query_seconds)
+        observe('blogicum_template_render_seconds_total', labels,
+                stats.template_seconds)
+        if stats.templates is not None:
+            self.observe_templates(stats, labels, response)
+        if response.streaming:
+            response.streaming_content = self.count_streamed(
+                response.streaming_content, labels)
+        else:
+            observe('blogicum_response_size_bytes', labels,
+                    len(response.content))
+        if time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            flush()
+        return response
+
+    def observe_templates(self, stats, labels, response):
+        for name, (renders, seconds) in stats.templates.items():
+            observe('blogicum_template_renders_total', labels + (name,),
+                    renders)
+            observe('blogicum_template_seconds_total', labels + (name,),
+                    seconds)
+        for name, (calls, seconds) in stats.tags.items():
+            observe('blogicum_template_tag_calls_total', labels + (name,),
+                    calls)
+            observe('blogicum_template_tag_seconds_total', labels + (name,),
+                    seconds)
+        response['Server-Timing'] = 'tpl;dur={:.1f}, tags;dur={:.1f}'.format(
+            stats.template_seconds * 1000,
+            sum(seconds for _, seconds in stats.tags.values()) * 1000)
+
+    def count_streamed(self, chunks, labels):
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+        observe('blogicum_response_size_bytes', labels, size)
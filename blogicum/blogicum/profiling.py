@@ -0,0 +1,215 @@
+import cProfile
+import os
+import pstats
+import re
+import time
+from collections import defaultdict
+
+from django.conf import settings  # type: ignore
+from django.contrib.admin.views.decorators import (  # type: ignore
+    staff_member_required
+)
+from django.core import signing  # type: ignore
+from django.http import FileResponse, Http404  # type: ignore
+from django.shortcuts import redirect, render  # type: ignore
+from django.views.decorators.http import require_POST  # type: ignore
+
+COOKIE = 'profile'
+SALT = 'blogicum.profiling'
+NAME_RE = re.compile(r'^[\w.-]+\.(prof|collapsed\.txt)$')
+MAX_DEPTH = 64
+
+
+def make_token(user):
+    return signing.dumps(user.pk, salt=SALT)
+
+
+def token_user_id(token):
+    try:
+        return signing.loads(
+            token, salt=SALT, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+
+def frame_name(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f'{os.path.basename(filename)}:{line}:{name}'
+
+
+def collapse(stats):
+    """Collapsed stacks ("a;b;c microseconds") from pstats data.
+
+    cProfile keeps caller/callee pairs, not whole stacks, so each
+    function's time is split between its callers in proportion to the
+    time spent under each of them. Good enough to read a flame graph.
+    """
+    callees = defaultdict(list)
+    roots = []
+    for func, (_, _, _, cumulative, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+    lines = defaultdict(float)
+
+    def walk(func, stack, share):
+        own, cumulative = stats.stats[func][2], stats.stats[func][3]
+        stack = stack + (frame_name(func),)
+        lines[';'.join(stack)] += own * share
+        # Branches under 10 µs are dropped: the call graph can have far
+        # more paths than a flame graph needs.
+        if len(stack) >= MAX_DEPTH or cumulative * share < 1e-5:
+            return
+        for callee, edge_cumulative in callees[func]:
+            if frame_name(callee) in stack:
+                continue
+            callee_cumulative = stats.stats[callee][3]
+            if callee_cumulative:
+                walk(callee, stack,
+                     share * edge_cumulative / callee_cumulative)
+
+    for root in roots:
+        walk(root, (), 1.0)
+    return ''.join(
+        f'{stack} {round(seconds * 1e6)}\n'
+        for stack, seconds in sorted(lines.items())
+        if round(seconds * 1e6)
+    )
+
+
+def save(profiler, request, elapsed):
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    match = getattr(request, 'resolver_match', None)
+    view = re.sub(r'[^\w-]', '_', match.view_name if match else 'unresolved')
+    microseconds = time.time_ns() // 1000 % 10**6
+    base = os.path.join(
+        settings.PROFILE_DIR,
+        f'{time.strftime("%Y%m%d-%H%M%S")}-{microseconds:06d}'
+        f'-{view}-{elapsed * 1000:.0f}ms')
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(base + '.prof')
+    with open(base + '.collapsed.txt', 'w') as file:
+        file.write(collapse(stats))
+    prune()
+
+
+def profiles():
+    """Stored profiles, newest first, as (name, collapsed name, size)."""
+    try:
+        names = os.listdir(settings.PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    return [
+        (name, name[:-len('.prof')] + '.collapsed.txt',
+         os.path.getsize(os.path.join(settings.PROFILE_DIR, name)))
+        for name in sorted(names, reverse=True)
+        if name.endswith('.prof')
+    ]
+
+
+def prune():
+    for name, collapsed, _ in profiles()[settings.PROFILE_KEEP:]:
+        for file_name in (name, collapsed):
+            try:
+                os.remove(os.path.join(settings.PROFILE_DIR, file_name))
+            except FileNotFoundError:
+                pass
+
+
+class ProfilerMiddleware:
+    """Profile requests of staff users who switched profiling on.
+
+    Profiling is on for a request carrying a token from the admin
+    profiles page, in the `profile` cookie or the X-Profile header. The
+    token is signed and bound to the staff user, so nobody else can turn
+    it on. Requests without one only pay for two dict lookups. Put it
+    after the authentication middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = (request.META.get('HTTP_X_PROFILE')
+                 or request.COOKIES.get(COOKIE))
+        if not token or not self.allowed(request, token):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        response = profiler.runcall(self.profiled_request, request)
+        elapsed = time.perf_counter() - started
+        if response.streaming:
+            response.streaming_content = self.profiled_stream(
+                profiler, response.streaming_content, request, elapsed)
+        else:
+            save(profiler, request, elapsed)
+        return response
+
+    def profiled_stream(self, profiler, chunks, request, elapsed):
+        """Yield `chunks`, profiling each as it is produced.
+
+        Only one chunk is held at a time, so a profiled export streams
+        like any other; the profile is saved once the stream ends or the
+        client goes away. Time spent waiting on the client is left out.
+        """
+        chunks = iter(chunks)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = profiler.runcall(next, chunks)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - started
+                yield chunk
+        finally:
+            save(profiler, request, elapsed)
+
+    def profiled_request(self, request):
+        # The root of every stack: the middleware chain below calls the
+        # same inner function recursively, so it cannot be one.
+        return self.get_response(request)
+
+    def allowed(self, request, token):
+        user = request.user
+        return (user.is_active and user.is_staff
+                and token_user_id(token) == user.pk)
+
+
+@staff_member_required
+def profiles_view(request):
+    return render(request, 'admin/profiles.html', {
+        'title': 'Профили запросов',
+        'profiles': profiles(),
+        'active': token_user_id(
+            request.COOKIES.get(COOKIE, '')) == request.user.pk,
+        'token': make_token(request.user),
+    })
+
+
+@require_POST
+@staff_member_required
+def toggle_profiling(request):
+    response = redirect('profiles')
+    if request.POST.get('enable'):
+        response.set_cookie(
+            COOKIE, make_token(request.user),
+            max_age=settings.PROFILE_TOKEN_MAX_AGE, httponly=True,
+            samesite='Lax', secure=request.is_secure())
+    else:
+        response.delete_cookie(COOKIE)
+    return response
+
+
+@staff_member_required
+def download_profile(request, name):
+    if not NAME_RE.match(name):
+        raise Http404
+    path = os.path.join(settings.PROFILE_DIR, name)
+    if not os.path.exists(path):
+        raise Http404
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
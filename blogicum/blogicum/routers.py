@@ -0,0 +1,33 @@
+from django.conf import settings  # type: ignore
+
+SESSIONS_DB_ALIAS = 'sessions'
+
+
+class SessionRouter:
+    """Keep sessions in their own database when one is configured.
+
+    Login and logout then do not wait for the SQLite write lock held by
+    post and comment writes.
+    """
+
+    @staticmethod
+    def _alias(model):
+        if (model._meta.app_label == 'sessions'
+                and SESSIONS_DB_ALIAS in settings.DATABASES):
+            return SESSIONS_DB_ALIAS
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._alias(model)
+
+    def db_for_write(self, model, **hints):
+        return self._alias(model)
+
+    def allow_migrate(self, db, app_label, **hints):
+        if SESSIONS_DB_ALIAS not in settings.DATABASES:
+            return None
+        if app_label == 'sessions':
+            return db == SESSIONS_DB_ALIAS
+        if db == SESSIONS_DB_ALIAS:
+            return False
+        return None
@@ -0,0 +1,111 @@
+import atexit
+import copy
+import time
+from datetime import timedelta
+from threading import Lock
+
+from django.conf import settings  # type: ignore
+from django.contrib.sessions.backends import cached_db  # type: ignore
+from django.contrib.sessions.models import Session  # type: ignore
+from django.db import router, transaction  # type: ignore
+from django.db.models import Case, DateTimeField, Value, When  # type: ignore
+from django.utils import timezone  # type: ignore
+
+_pending_lock = Lock()
+_pending = {}
+_last_flush = time.monotonic()
+
+
+def flush_pending():
+    """Write buffered expiry refreshes with a single UPDATE ... CASE."""
+    global _last_flush
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+    Session.objects.db_manager(router.db_for_write(Session)).filter(
+        session_key__in=pending
+    ).update(expire_date=Case(
+        *(When(session_key=key, then=Value(expire_date))
+          for key, expire_date in pending.items()),
+        output_field=DateTimeField(),
+    ))
+    return len(pending)
+
+
+atexit.register(flush_pending)
+
+
+def delete_expired(batch_size=500, max_seconds=None, pause=0):
+    """Delete expired sessions in short transactions, oldest first.
+
+    Stops after max_seconds so a cron run never holds the database for
+    long. Returns the number of deleted rows.
+
+    Other workers may still hold a newer expiry in their write-behind
+    buffer, so a row is only deleted once it has been expired for longer
+    than SESSION_WRITE_BEHIND_INTERVAL.
+    """
+    using = router.db_for_write(Session)
+    sessions = Session.objects.db_manager(using)
+    cutoff = timezone.now() - timedelta(
+        seconds=settings.SESSION_WRITE_BEHIND_INTERVAL)
+    deadline = max_seconds and time.monotonic() + max_seconds
+    deleted = 0
+    while not deadline or time.monotonic() < deadline:
+        with transaction.atomic(using=using):
+            keys = list(sessions.filter(
+                expire_date__lt=cutoff
+            ).order_by('expire_date').values_list(
+                'session_key', flat=True)[:batch_size])
+            if not keys:
+                break
+            deleted += sessions.filter(session_key__in=keys).delete()[0]
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+class SessionStore(cached_db.SessionStore):
+    """cached_db sessions with write-behind for expiry-only saves.
+
+    A save that changes nothing but the expiry (SESSION_SAVE_EVERY_REQUEST
+    on an unchanged session) only updates the cache; the new expiry
+    reaches the database in the next batched flush.
+    """
+
+    _loaded = None
+
+    def load(self):
+        data = super().load()
+        self._loaded = copy.deepcopy(data)
+        return data
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        if must_create or self.session_key is None or data != self._loaded:
+            super().save(must_create)
+            self._loaded = copy.deepcopy(self._session)
+            return
+        self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+        with _pending_lock:
+            _pending[self.session_key] = self.get_expiry_date()
+            due = (
+                len(_pending) >= settings.SESSION_WRITE_BEHIND_BATCH
+                or time.monotonic() - _last_flush
+                >= settings.SESSION_WRITE_BEHIND_INTERVAL
+            )
+        if due:
+            flush_pending()
+
+    def delete(self, session_key=None):
+        with _pending_lock:
+            _pending.pop(session_key or self.session_key, None)
+        super().delete(session_key)
+
+    @classmethod
+    def clear_expired(cls):
+        flush_pending()
+        delete_expired()
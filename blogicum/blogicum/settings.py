@@ -26,21 +26,37 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
     'django_bootstrap5',
 ]
 
+# Development-only apps and middleware, left out by settings_production.
+DEV_APPS = [
+    'debug_toolbar',
+]
+
+DEV_MIDDLEWARE = [
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+]
+
+INSTALLED_APPS += DEV_APPS
+
 MIDDLEWARE = [
+    'blogicum.metrics.MetricsMiddleware',
+    'blogicum.slowlog.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'blogicum.compression.CompressionMiddleware',
+    'blogicum.static.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.auth.CachedAuthenticationMiddleware',
+    'blogicum.profiling.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+MIDDLEWARE += DEV_MIDDLEWARE
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -55,7 +71,7 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blogicum.metrics.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -83,6 +99,31 @@ DATABASES = {
 }
 
 
+AUTHENTICATION_BACKENDS = [
+    'blog.auth.CachedModelBackend',
+]
+
+# Cache alias and lifetime for users resolved from sessions. Keep it on a
+# shared cache in production: invalidation goes through this cache.
+AUTH_USER_CACHE = 'default'
+
+AUTH_USER_CACHE_TIMEOUT = 300
+
+
+# Sessions go to DATABASES['sessions'] when it is configured (see
+# settings_production) and are cached in front of it.
+DATABASE_ROUTERS = [
+    'blogicum.routers.SessionRouter',
+]
+
+SESSION_ENGINE = 'blogicum.sessions'
+
+# Expiry-only session saves are flushed to the database in batches.
+SESSION_WRITE_BEHIND_BATCH = 100
+
+SESSION_WRITE_BEHIND_INTERVAL = 30
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -126,6 +167,10 @@ DATETIME_INPUT_FORMATS = [
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+STATICFILES_STORAGE = 'blogicum.static.CompressedManifestStaticFilesStorage'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -135,8 +180,141 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
+COMPRESSION_LEVEL = 6
+
+COMPRESSION_MIN_SIZE = 200
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+MEDIA_URL = '/media/'
+
+# Hand media files over to the front server instead of streaming them
+# from Python: a prefix of an internal nginx location for X-Accel-Redirect,
+# or MEDIA_SENDFILE = True for Apache/lighttpd X-Sendfile.
+MEDIA_ACCEL_REDIRECT = None
+
+MEDIA_SENDFILE = False
+
+# Requests only queue messages; `send_queued_email` delivers them through
+# EMAIL_QUEUE_BACKEND.
+EMAIL_BACKEND = 'blog.mail.QueuedEmailBackend'
+
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+
+# Seconds before the first retry, doubled after every failure.
+EMAIL_QUEUE_RETRY_DELAY = 60
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Cold start (django.setup() and URLconf loading) budget in milliseconds,
+# checked by tests/test_startup.py and reported by `startup_report`.
+STARTUP_TIME_BUDGET = 1500
+
+# Cache alias for rendered RSS/Atom feeds. Feeds are invalidated on writes
+# through this cache, so it must be shared between workers in production;
+# FEED_CACHE_TIMEOUT (seconds) caps how long an untouched feed is kept.
+FEED_CACHE = 'default'
+
+FEED_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Every worker keeps the Location table in memory for post cards and
+# re-reads it when another worker bumps the version kept in
+# LOCATION_CACHE, which it checks every LOCATION_CACHE_CHECK_INTERVAL
+# seconds, and at the latest every LOCATION_CACHE_MAX_AGE seconds.
+LOCATION_CACHE = 'default'
+
+LOCATION_CACHE_CHECK_INTERVAL = 5
+
+LOCATION_CACHE_MAX_AGE = 5 * 60
+
+# Cache alias for the archive's list of months, shared between workers
+# (blog.E001). It is invalidated on post and category writes and expires
+# when the next scheduled post comes out, or after ARCHIVE_CACHE_TIMEOUT
+# seconds.
+ARCHIVE_CACHE = 'default'
+
+ARCHIVE_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Sitemap shards cover fixed id ranges of this size (the protocol allows
+# at most 50,000 URLs per file) and are cached, gzipped, in SITEMAP_CACHE.
+SITEMAP_SHARD_SIZE = 50000
+
+SITEMAP_CACHE = 'default'
+
+SITEMAP_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Per-view metrics: every worker writes its totals to METRICS_DIR at most
+# every METRICS_FLUSH_INTERVAL seconds, /metrics adds them up and only
+# answers METRICS_ALLOWED_IPS. Empty the directory when redeploying.
+METRICS_DIR = BASE_DIR / 'metrics'
+
+METRICS_FLUSH_INTERVAL = 5
+
+METRICS_ALLOWED_IPS = [
+    '127.0.0.1',
+]
+
+# Also time every template, include and custom tag per view (and send a
+# Server-Timing header). Costs a few percent; read when the template
+# engine starts.
+TEMPLATE_METRICS = False
+
+# Queries slower than SLOW_QUERY_THRESHOLD ms (None turns the log off) are
+# written to SLOW_QUERY_LOG with the view and the first frame in one of
+# SLOW_QUERY_APPS; summarize them with `slow_queries`.
+SLOW_QUERY_THRESHOLD = 100
+
+SLOW_QUERY_REDACT_PARAMS = False
+
+SLOW_QUERY_APPS = ['blog', 'pages']
+
+SLOW_QUERY_LOG = BASE_DIR / 'logs' / 'slow_queries.log'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'blogicum.slowlog.QueuedFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'blogicum.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Post views are added up in memory and written at most every
+# VIEW_COUNT_FLUSH_INTERVAL seconds or VIEW_COUNT_FLUSH_SIZE views.
+VIEW_COUNT_FLUSH_INTERVAL = 10
+
+VIEW_COUNT_FLUSH_SIZE = 100
+
+# Trending and most discussed posts: a comment weighs
+# TRENDING_COMMENT_WEIGHT views, and every event counts half as much
+# after TRENDING_HALF_LIFE seconds. Run `rebuild_scores` after changing
+# them.
+TRENDING_HALF_LIFE = 24 * 60 * 60
+
+TRENDING_COMMENT_WEIGHT = 10
+
+TRENDING_VIEW_WEIGHT = 1
+
+# Staff request profiles (admin/profiles/): the newest PROFILE_KEEP are
+# kept in PROFILE_DIR; a profiling token is valid for
+# PROFILE_TOKEN_MAX_AGE seconds.
+PROFILE_DIR = BASE_DIR / 'profiles'
+
+PROFILE_KEEP = 50
+
+PROFILE_TOKEN_MAX_AGE = 60 * 60
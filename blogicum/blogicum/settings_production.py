@@ -0,0 +1,114 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured  # type: ignore
+
+from .settings import *  # noqa: F401,F403
+from .settings import (
+    BASE_DIR, DEV_APPS, DEV_MIDDLEWARE, INSTALLED_APPS, LOGGING, MIDDLEWARE,
+    TEMPLATES
+)
+
+
+def env(name, default=None):
+    value = os.environ.get(name, default)
+    if value is None:
+        raise ImproperlyConfigured(
+            f'Set the {name} environment variable.')
+    return value
+
+
+DEBUG = False
+
+SECRET_KEY = env('DJANGO_SECRET_KEY')
+
+ALLOWED_HOSTS = env('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEV_APPS]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in DEV_MIDDLEWARE
+]
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor
+            for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.template.context_processors.debug'
+        ],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+DATABASES = {
+    'default': {
+        'ENGINE': env('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': env('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+        'USER': env('DB_USER', ''),
+        'PASSWORD': env('DB_PASSWORD', ''),
+        'HOST': env('DB_HOST', ''),
+        'PORT': env('DB_PORT', ''),
+        'CONN_MAX_AGE': int(env('DB_CONN_MAX_AGE', '60')),
+    },
+    'sessions': {
+        'ENGINE': env('SESSIONS_DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': env('SESSIONS_DB_NAME', str(BASE_DIR / 'sessions.sqlite3')),
+        'USER': env('SESSIONS_DB_USER', ''),
+        'PASSWORD': env('SESSIONS_DB_PASSWORD', ''),
+        'HOST': env('SESSIONS_DB_HOST', ''),
+        'PORT': env('SESSIONS_DB_PORT', ''),
+        'CONN_MAX_AGE': int(env('DB_CONN_MAX_AGE', '60')),
+    },
+}
+
+# Workers invalidate each other's feeds, sitemaps, locations and archive
+# through this cache, so it has to be shared by all of them (blog.E001).
+CACHES = {
+    'default': {
+        'BACKEND': env(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': env('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    }
+}
+
+METRICS_DIR = env('METRICS_DIR', str(BASE_DIR / 'metrics'))
+
+METRICS_ALLOWED_IPS = env('METRICS_ALLOWED_IPS', '127.0.0.1').split(',')
+
+TEMPLATE_METRICS = env('TEMPLATE_METRICS', '0') == '1'
+
+SLOW_QUERY_REDACT_PARAMS = env('SLOW_QUERY_REDACT_PARAMS', '1') == '1'
+
+SLOW_QUERY_LOG = env(
+    'SLOW_QUERY_LOG', str(BASE_DIR / 'logs' / 'slow_queries.log'))
+
+LOGGING['handlers']['slow_queries']['filename'] = SLOW_QUERY_LOG
+
+PROFILE_DIR = env('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT') or None
+
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE') == '1'
+
+EMAIL_QUEUE_BACKEND = env(
+    'EMAIL_QUEUE_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+
+EMAIL_HOST = env('EMAIL_HOST', 'localhost')
+
+EMAIL_PORT = int(env('EMAIL_PORT', '25'))
+
+EMAIL_HOST_USER = env('EMAIL_HOST_USER', '')
+
+EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', '')
+
+EMAIL_USE_TLS = env('EMAIL_USE_TLS', '') == '1'
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import time
+from contextlib import ExitStack
+
+from django.apps import apps  # type: ignore
+from django.conf import settings  # type: ignore
+from django.core.exceptions import MiddlewareNotUsed  # type: ignore
+from django.db import connections  # type: ignore
+
+logger = logging.getLogger('blogicum.slow_queries')
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists folded, so similar queries group."""
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = IN_LIST_RE.sub('(...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint_id(fingerprint):
+    return hashlib.md5(fingerprint.encode()).hexdigest()[:12]
+
+
+def redact(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: f'<{type(value).__name__}>'
+                for key, value in params.items()}
+    return [f'<{type(value).__name__}>' for value in params]
+
+
+def app_paths():
+    return tuple(
+        apps.get_app_config(label).path + os.sep
+        for label in settings.SLOW_QUERY_APPS
+    )
+
+
+def call_site(paths):
+    """file:line of the first frame in our apps, skipping migrations."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(paths) and 'migrations' not in filename:
+            return '{}:{} in {}'.format(
+                os.path.relpath(filename, settings.BASE_DIR),
+                frame.f_lineno, frame.f_code.co_name)
+        frame = frame.f_back
+    return None
+
+
+class QueuedFileHandler(logging.handlers.QueueHandler):
+    """Hand records to a thread that appends them to `filename`.
+
+    The request thread only puts the record on an in-memory queue, so a
+    slow disk never adds to request latency.
+    """
+
+    def __init__(self, filename):
+        super().__init__(queue.SimpleQueue())
+        os.makedirs(os.path.dirname(os.path.abspath(filename)),
+                    exist_ok=True)
+        target = logging.handlers.WatchedFileHandler(
+            filename, encoding='utf-8', delay=True)
+        self.listener = logging.handlers.QueueListener(self.queue, target)
+        self.listener.start()
+
+    def close(self):
+        # logging.shutdown() calls this at exit: drain the queue first.
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
+
+
+class SlowQueryLogger:
+    __slots__ = ('request', 'threshold', 'paths')
+
+    def __init__(self, request, threshold, paths):
+        self.request = request
+        self.threshold = threshold
+        self.paths = paths
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                self.log(sql, params, duration, context)
+
+    def log(self, sql, params, duration, context):
+        match = getattr(self.request, 'resolver_match', None)
+        shape = fingerprint(sql)
+        if settings.SLOW_QUERY_REDACT_PARAMS:
+            params = redact(params)
+        logger.warning(json.dumps({
+            'time': time.time(),
+            'duration_ms': round(duration * 1000, 3),
+            'fingerprint': fingerprint_id(shape),
+            'sql': shape,
+            'params': params,
+            'database': context['connection'].alias,
+            'view': match.view_name if match else None,
+            'path': self.request.path,
+            'call_site': call_site(self.paths),
+        }, ensure_ascii=False, default=str))
+
+
+class SlowQueryMiddleware:
+    """Log queries slower than SLOW_QUERY_THRESHOLD ms with their origin.
+
+    Records go to the 'blogicum.slow_queries' logger; the
+    slow_queries command groups the resulting log by fingerprint.
+    """
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.paths = app_paths()
+
+    def __call__(self, request):
+        wrapper = SlowQueryLogger(
+            request, settings.SLOW_QUERY_THRESHOLD / 1000, self.paths)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            return self.get_response(request)
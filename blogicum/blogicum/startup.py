@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+STARTUP_SCRIPT = '''
+import time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print((time.perf_counter() - start) * 1000)
+'''
+
+
+def parse_importtime(output):
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(own), int(cumulative), name.strip()))
+    return imports
+
+
+def measure_startup(settings_module=None, importtime=False):
+    """Time django.setup() plus URLconf loading in a fresh interpreter.
+
+    Returns milliseconds and, with importtime, a list of
+    (self_us, cumulative_us, module) rows from `python -X importtime`.
+    """
+    env = dict(os.environ)
+    if settings_module:
+        env['DJANGO_SETTINGS_MODULE'] = settings_module
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    result = subprocess.run(
+        command + ['-c', STARTUP_SCRIPT],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    milliseconds = float(result.stdout.split()[-1])
+    return milliseconds, parse_importtime(result.stderr) if importtime else []
@@ -0,0 +1,166 @@
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from django.conf import settings  # type: ignore
+from django.contrib.staticfiles.storage import (  # type: ignore
+    ManifestStaticFilesStorage
+)
+from django.core.exceptions import MiddlewareNotUsed  # type: ignore
+from django.http import FileResponse  # type: ignore
+from django.utils.cache import (  # type: ignore
+    get_conditional_response, patch_vary_headers
+)
+from django.utils.http import http_date  # type: ignore
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.json', '.svg', '.ico', '.txt', '.html', '.xml',
+)
+# Keep a compressed copy only if it saves at least this share of bytes.
+MIN_COMPRESSION_GAIN = 0.05
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MUTABLE_MAX_AGE = 60
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def compress(data):
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data)
+    limit = len(data) * (1 - MIN_COMPRESSION_GAIN)
+    return {
+        suffix: content for suffix, content in variants.items()
+        if len(content) < limit
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Hashed file names plus .gz/.br copies written by collectstatic."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(paths) | set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                for suffix, content in compress(
+                        Path(self.path(name)).read_bytes()).items():
+                    Path(self.path(name + suffix)).write_bytes(content)
+
+    def stored_name(self, name):
+        # Without a collected manifest (development, tests) fall back to
+        # the plain name instead of failing every {% static %} tag.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, param = coding.partition(';')
+        key, _, value = param.strip().partition('=')
+        try:
+            if key == 'q' and float(value) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class StaticFile:
+
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.last_modified = int(stat.st_mtime)
+        self.variants = [
+            (encoding, path + suffix) for encoding, suffix in ENCODINGS
+            if os.path.isfile(path + suffix)
+        ]
+
+    def pick(self, request):
+        accepted = accepted_encodings(request)
+        for encoding, path in self.variants:
+            if encoding in accepted:
+                return encoding, path
+        return None, self.path
+
+
+class StaticFilesMiddleware:
+    """Serve collected static files from STATIC_ROOT without the views.
+
+    Files are indexed once at startup. Hashed names get far-future
+    immutable caching, and a precompressed copy is picked from
+    Accept-Encoding when collectstatic produced one.
+    """
+
+    def __init__(self, get_response):
+        root = settings.STATIC_ROOT
+        if settings.DEBUG or not root or not os.path.isdir(root):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.files = self.scan(str(root))
+
+    @staticmethod
+    def scan(root):
+        compressed = tuple(suffix for _, suffix in ENCODINGS)
+        hashed = set()
+        storage = ManifestStaticFilesStorage(location=root)
+        if storage.exists(storage.manifest_name):
+            hashed = set(storage.load_manifest().values())
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                url = os.path.relpath(path, root).replace(os.sep, '/')
+                if not name.endswith(compressed):
+                    files[url] = StaticFile(path, url in hashed)
+        return files
+
+    def __call__(self, request):
+        path = request.path_info
+        if request.method in ('GET', 'HEAD') and path.startswith(self.prefix):
+            static_file = self.files.get(path[len(self.prefix):])
+            if static_file is not None:
+                return self.serve(request, static_file)
+        return self.get_response(request)
+
+    @staticmethod
+    def serve(request, static_file):
+        encoding, path = static_file.pick(request)
+        # Each encoding is a separate representation with its own ETag.
+        etag = static_file.etag
+        if encoding:
+            etag = f'{etag[:-1]}-{encoding}"'
+        response = get_conditional_response(
+            request, etag=etag, last_modified=static_file.last_modified)
+        if response is None:
+            response = FileResponse(
+                open(path, 'rb'), content_type=static_file.content_type)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(static_file.last_modified)
+        response['Cache-Control'] = (
+            f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+            if static_file.immutable
+            else f'public, max-age={MUTABLE_MAX_AGE}'
+        )
+        if static_file.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
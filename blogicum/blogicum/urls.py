@@ -1,11 +1,21 @@
+import re
+
 from django.conf import settings  # type: ignore
-from django.conf.urls.static import static  # type: ignore
 from django.contrib import admin  # type: ignore
 from django.contrib.auth.forms import UserCreationForm  # type: ignore
-from django.urls import include, path, reverse_lazy  # type: ignore
+from django.urls import include, path, re_path, reverse_lazy  # type: ignore
 from django.views.generic.edit import CreateView  # type: ignore
 
+from blog.media import serve_media
+from blogicum import profiling
+from blogicum.metrics import metrics_view
+
 urlpatterns = [
+    path('admin/profiles/', profiling.profiles_view, name='profiles'),
+    path('admin/profiles/toggle/', profiling.toggle_profiling,
+         name='profiles_toggle'),
+    path('admin/profiles/<str:name>', profiling.download_profile,
+         name='profiles_download'),
     path('admin/', admin.site.urls),
     path('auth/registration/',
          CreateView.as_view(
@@ -15,10 +25,14 @@ urlpatterns = [
          ), name='registration'),
     path('auth/', include('django.contrib.auth.urls')),
     path('pages/', include('pages.urls')),
+    path('api/v1/', include('blog.api_urls')),
+    path('metrics', metrics_view, name='metrics'),
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+            serve_media, name='media'),
     path('', include('blog.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
 
-if settings.DEBUG:
+if settings.DEBUG and 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar  # type: ignore
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
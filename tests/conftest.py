@@ -41,6 +41,24 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def discard_pending_views():
+    # Buffered views must not be flushed into another test's posts, or at
+    # exit, when the database is gone.
+    yield
+    from blog.counters import post_views
+    post_views.clear()
+
+
+@pytest.fixture(autouse=True)
+def forget_locations():
+    # Each test database has its own locations under the same ids.
+    from blog import locations
+    locations.clear()
+    yield
+    locations.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -92,6 +110,7 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.smtp",
     "adapters.comment",
 ]
 
@@ -282,6 +301,23 @@ def get_create_a_post_get_response_safely(user_client: Client) -> HttpResponse:
     )
 
 
+def check_keyset_cursor(
+        client: Client, url: str, expected: List[int], monkeypatch
+) -> None:
+    """Page through a keyset feed two posts at a time with `after`."""
+    monkeypatch.setattr("blog.views.POSTS_PER_PAGE", 2)
+    response = client.get(url)
+    assert [post.id for post in response.context["posts"]] == expected[:2]
+    cursor = response.context["next_cursor"]
+    assert cursor
+    second = client.get(url, {"after": cursor})
+    assert [post.id for post in second.context["posts"]] == expected[2:], (
+        "Убедитесь, что курсор продолжает ленту с места остановки."
+    )
+    assert second.context["next_cursor"] is None
+    assert client.get(url, {"after": "bad_1"}).status_code == 400
+
+
 def _testget_context_item_by_class(
         context, cls: type, err_msg: str, inside_iter: bool = False
 ) -> KeyVal:
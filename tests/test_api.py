@@ -0,0 +1,118 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(25).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=(now - timedelta(days=day % 5) for day in range(1, 26)),
+        is_published=True,
+    )
+
+
+def read_all(client, url):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        ids += [item["id"] for item in data["results"]]
+        url = data["next"]
+    return ids
+
+
+def test_feed_pages_with_cursor(client, api_posts, future_posts,
+                                posts_with_unpublished_category):
+    ids = read_all(client, "/api/v1/posts/?limit=7")
+    assert len(ids) == len(set(ids)) == len(api_posts), (
+        "Убедитесь, что курсорная пагинация проходит по всем опубликованным"
+        " постам без повторов и пропусков."
+    )
+    assert set(ids) == {post.id for post in api_posts}
+
+
+def test_sparse_fields_select_only_columns(client, api_posts):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/v1/posts/?fields=id,title")
+    assert set(response.json()["results"][0]) == {"id", "title"}
+    sql = queries[-1]["sql"]
+    assert '"text"' not in sql and "COUNT" not in sql, (
+        "Убедитесь, что запрос выбирает только запрошенные поля."
+    )
+    response = client.get("/api/v1/posts/?fields=id,password")
+    assert response.status_code == 400
+
+
+def test_profile_shows_unpublished_to_author(user_client, client, user,
+                                             api_posts):
+    hidden = api_posts[0]
+    hidden.is_published = False
+    hidden.save()
+    url = f"/api/v1/users/{user.username}/posts/?limit=100"
+    assert hidden.id in read_all(user_client, url)
+    assert hidden.id not in read_all(client, url)
+    assert client.get(f"/api/v1/posts/{hidden.id}/").status_code == 404
+    response = user_client.get(f"/api/v1/posts/{hidden.id}/")
+    assert response.json()["title"] == hidden.title
+
+
+def test_category_and_comments(client, mixer, user, api_posts):
+    post = api_posts[0]
+    mixer.cycle(15).blend("blog.Comment", post=post, author=user)
+    ids = read_all(client, f"/api/v1/posts/{post.id}/comments/?limit=4")
+    assert len(set(ids)) == 15
+    response = client.get(
+        f"/api/v1/categories/{post.category.slug}/posts/?fields=id"
+    )
+    assert response.status_code == 200
+    assert client.get(
+        "/api/v1/categories/missing/posts/"
+    ).status_code == 404
+
+
+def test_unpublished_location_hidden(client, mixer, api_posts,
+                                     published_location):
+    hidden = mixer.blend("blog.Location", is_published=False)
+    api_posts[0].location = hidden
+    api_posts[0].save()
+    api_posts[1].location = published_location
+    api_posts[1].save()
+    results = client.get("/api/v1/posts/?limit=100").json()["results"]
+    locations = {item["id"]: item["location"] for item in results}
+    assert locations[api_posts[0].id] is None, (
+        "Убедитесь, что API не показывает название неопубликованной"
+        " локации."
+    )
+    assert locations[api_posts[1].id] == published_location.name
+    detail = client.get(f"/api/v1/posts/{api_posts[0].id}/").json()
+    assert detail["location"] is None
+    detail = client.get(
+        f"/api/v1/posts/{api_posts[1].id}/?fields=location"
+    ).json()
+    assert detail == {"location": published_location.name}
+
+
+def test_etag(client, api_posts):
+    response = client.get("/api/v1/posts/")
+    response = client.get(
+        "/api/v1/posts/", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert response.status_code == 304
+
+
+def test_benchmark_command(api_posts):
+    output = io.StringIO()
+    call_command("api_benchmark", "--repeat", "2", stdout=output)
+    assert "лента" in output.getvalue()
@@ -0,0 +1,142 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import MonthStats, Post
+from blog.stats import archive_months, month_of
+
+pytestmark = [pytest.mark.django_db]
+
+MARCH = date(2024, 3, 1)
+JANUARY = date(2024, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def at(year, month, day):
+    return timezone.make_aware(datetime(year, month, day, 12))
+
+
+def blend_post(mixer, user, category, pub_date, **kwargs):
+    return mixer.blend(
+        Post,
+        author=user,
+        category=category,
+        is_published=kwargs.pop("is_published", True),
+        pub_date=pub_date,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return [
+        blend_post(mixer, user, published_category, at(2024, 3, 20)),
+        blend_post(mixer, user, published_category, at(2024, 3, 10)),
+        blend_post(mixer, user, published_category, at(2024, 1, 5)),
+    ]
+
+
+def counts():
+    return dict(MonthStats.objects.values_list("month", "visible_posts"))
+
+
+def test_rollup_follows_post_writes(mixer, user, published_category, posts):
+    blend_post(
+        mixer, user, published_category, at(2024, 3, 1), is_published=False
+    )
+    assert counts() == {MARCH: 2, JANUARY: 1}
+    posts[1].pub_date = at(2024, 1, 31)
+    posts[1].save()
+    assert counts() == {MARCH: 1, JANUARY: 2}, (
+        "Убедитесь, что перенос поста в другой месяц обновляет оба месяца."
+    )
+    posts[2].is_published = False
+    posts[2].save()
+    posts[0].delete()
+    assert counts() == {JANUARY: 1}, (
+        "Убедитесь, что месяцы без постов удаляются из сводки."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert counts() == {}
+
+
+def test_move_reads_only_both_months(posts):
+    with CaptureQueriesContext(connection) as queries:
+        posts[2].pub_date = at(2019, 6, 1)
+        posts[2].save()
+    grouped = [
+        query["sql"] for query in queries
+        if "GROUP BY" in query["sql"] and "trunc('month'" in query["sql"]
+    ]
+    assert grouped and all(
+        query.count('"blog_post"."pub_date" >=') == 2 for query in grouped
+    ), "Убедитесь, что пересчёт читает только посты затронутых месяцев."
+    assert counts() == {MARCH: 2, date(2019, 6, 1): 1}
+
+
+def test_month_list_cached_until_write(posts):
+    assert archive_months() == [(MARCH, 2), (JANUARY, 1)]
+    Post.objects.filter(pk=posts[0].pk).update(is_published=False)
+    assert archive_months() == [(MARCH, 2), (JANUARY, 1)]
+    posts[1].is_published = False
+    posts[1].save()
+    assert archive_months() == [(JANUARY, 1)], (
+        "Убедитесь, что список месяцев сбрасывается при записи поста."
+    )
+
+
+def test_scheduled_post_counted_once_published(
+    mixer, user, published_category
+):
+    tomorrow = timezone.now() + timedelta(days=1)
+    post = blend_post(mixer, user, published_category, tomorrow)
+    month = month_of(tomorrow)
+    assert MonthStats.objects.get(month=month).visible_posts == 0
+    assert archive_months() == []
+    # The day comes: the row falls due and the cached list expires.
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    MonthStats.objects.update(visible_until=timezone.now())
+    cache.clear()
+    month = month_of(timezone.now() - timedelta(minutes=1))
+    assert archive_months() == [(month, 1)], (
+        "Убедитесь, что отложенный пост попадает в архив после публикации."
+    )
+
+
+def test_reconcile_rebuilds_rollup(posts):
+    MonthStats.objects.all().delete()
+    MonthStats.objects.create(month=date(2020, 5, 1), visible_posts=7)
+    call_command("reconcile_stats", stdout=None)
+    assert counts() == {MARCH: 2, JANUARY: 1}
+
+
+def test_archive_pages(client, mixer, user, published_category, posts):
+    response = client.get("/archive/")
+    assert response.status_code == 200
+    assert response.context["years"] == [
+        (2024, 3, [(MARCH, 2), (JANUARY, 1)])
+    ]
+    assert client.get("/archive/2024/").status_code == 200
+    assert client.get("/archive/2023/").status_code == 404
+    response = client.get("/archive/2024/3/")
+    assert response.status_code == 200
+    assert [post.id for post in response.context["page_obj"]] == [
+        posts[0].id, posts[1].id
+    ], "Убедитесь, что страница месяца показывает только его посты."
+    assert response.context["page_obj"].paginator.count == 2
+    for url in ("/archive/2024/2/", "/archive/2024/13/"):
+        assert client.get(url).status_code == 404
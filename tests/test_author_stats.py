@@ -0,0 +1,146 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import AuthorStats, CategoryStats, Comment, Post
+from blog.stats import author_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        Post,
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def stats(user):
+    return AuthorStats.objects.get(user=user)
+
+
+def test_write_paths_keep_counts(mixer, user, another_user, posts):
+    author_stats(user)
+    author_stats(another_user)
+    comment = mixer.blend(Comment, post=posts[0], author=another_user)
+    mixer.blend(Comment, post=posts[1], author=user)
+    assert (stats(user).comments_received, stats(user).comments_written) == (
+        2, 1
+    )
+    assert stats(another_user).comments_written == 1
+    comment.delete()
+    assert stats(user).comments_received == 1
+    assert stats(another_user).comments_written == 0
+    mixer.blend(
+        Post, author=user, category=posts[0].category, is_published=False
+    )
+    assert (stats(user).posts, stats(user).visible_posts) == (4, 3)
+    posts[2].delete()
+    assert (stats(user).posts, stats(user).visible_posts) == (3, 2), (
+        "Убедитесь, что статистика обновляется при удалении поста."
+    )
+
+
+def stats_updates(queries):
+    return [
+        query["sql"] for query in queries
+        if query["sql"].startswith('UPDATE "blog_authorstats"')
+    ]
+
+
+def test_cascades_recount_once(mixer, user, another_user, posts):
+    third = mixer.blend("auth.User")
+    for author in (user, another_user, third):
+        author_stats(author)
+    mixer.cycle(5).blend(Comment, post=posts[0], author=another_user)
+    mixer.blend(Comment, post=posts[1], author=another_user)
+    mixer.blend(Comment, post=posts[1], author=third)
+    own = mixer.blend(Post, author=another_user, category=posts[0].category)
+    mixer.cycle(3).blend(Comment, post=own, author=user)
+    with CaptureQueriesContext(connection) as queries:
+        posts[0].delete()
+    assert len(stats_updates(queries)) <= 2, (
+        "Убедитесь, что при каскадном удалении комментариев статистика"
+        " пересчитывается один раз, а не по запросу на комментарий."
+    )
+    assert stats(user).comments_received == 2
+    assert (stats(user).comments_written, stats(user).posts) == (3, 2)
+    assert stats(another_user).comments_written == 1
+
+    with CaptureQueriesContext(connection) as queries:
+        another_user.delete()
+    assert len(stats_updates(queries)) <= 2
+    assert (stats(user).comments_received, stats(user).comments_written) == (
+        1, 0
+    ), "Убедитесь, что удаление пользователя пересчитывает другим авторам."
+    assert stats(third).comments_written == 1
+    assert CategoryStats.objects.get(
+        category=posts[1].category
+    ).visible_posts == 2
+
+
+def test_category_unpublished(user, posts, published_category):
+    author_stats(user)
+    published_category.is_published = False
+    published_category.save()
+    assert stats(user).visible_posts == 0
+    published_category.delete()
+    assert (stats(user).posts, stats(user).visible_posts) == (3, 0)
+
+
+def test_scheduled_post_counted_when_it_comes_out(
+    client, mixer, user, posts
+):
+    future = mixer.blend(
+        Post,
+        author=user,
+        category=posts[0].category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=2),
+    )
+    counted = author_stats(user)
+    assert counted.visible_posts == 3 and counted.visible_until
+    Post.objects.filter(pk=future.pk).update(
+        pub_date=timezone.now() - timedelta(hours=1)
+    )
+    AuthorStats.objects.filter(user=user).update(
+        visible_until=timezone.now() - timedelta(seconds=1)
+    )
+    response = client.get(f"/profile/{user.username}/")
+    assert response.context["page_obj"].paginator.count == 4
+
+
+def test_profile_reads_totals_without_count(
+    client, user_client, mixer, user, another_user, posts
+):
+    mixer.blend(Comment, post=posts[0], author=another_user)
+    mixer.blend(
+        Post, author=user, category=posts[0].category, is_published=False
+    )
+    author_stats(user)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/profile/{user.username}/")
+    assert not any("COUNT(" in query["sql"] and "blog_post" in query["sql"]
+                   and "GROUP BY" not in query["sql"] for query in queries), (
+        "Убедитесь, что пагинатор профиля берёт число постов из статистики."
+    )
+    assert response.context["page_obj"].paginator.count == 3
+    assert "Комментариев к публикациям: 1" in response.content.decode()
+    own = user_client.get(f"/profile/{user.username}/")
+    assert own.context["page_obj"].paginator.count == 4
+
+
+def test_reconcile_fixes_drift(user, another_user, posts):
+    AuthorStats.objects.create(user=user, posts=99, comments_written=5)
+    call_command("reconcile_stats", stdout=io.StringIO())
+    assert (stats(user).posts, stats(user).comments_written) == (3, 0)
+    assert stats(another_user).posts == 0
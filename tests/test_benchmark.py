@@ -0,0 +1,54 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def generated():
+    call_command(
+        "generate_data", "--users", "20", "--categories", "5",
+        "--locations", "5", "--posts", "300", "--comments", "2000",
+        "--future-share", "0.1", stdout=io.StringIO(),
+    )
+
+
+def test_generate_data(generated):
+    assert User.objects.count() == 20
+    assert Category.objects.count() == 5
+    assert Location.objects.count() == 5
+    assert Post.objects.count() == 300
+    assert Comment.objects.count() == 2000
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        "Убедитесь, что генератор создаёт отложенные посты."
+    )
+    counts = sorted(
+        Post.objects.annotate(n=Count("comments")).values_list(
+            "n", flat=True
+        ),
+        reverse=True,
+    )
+    assert counts[0] > 10 * (sum(counts) / len(counts)), (
+        "Убедитесь, что комментарии распределены по постам неравномерно."
+    )
+
+
+def test_benchmark_saves_json(generated, tmp_path):
+    output = tmp_path / "results.json"
+    call_command(
+        "benchmark", "--requests", "40", "--warmup", "5",
+        "-o", str(output), stdout=io.StringIO(),
+    )
+    results = json.loads(output.read_text())
+    assert results["total"]["requests"] == 40
+    for stats in results["groups"].values():
+        assert stats["p50"] <= stats["p95"] <= stats["p99"]
+        assert stats["throughput"] > 0
+        assert "queries_per_request" in stats
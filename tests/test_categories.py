@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Category, CategoryStats, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def categories(mixer):
+    return mixer.cycle(2).blend(Category, is_published=True)
+
+
+def blend_post(mixer, user, category, days_ago=1, **kwargs):
+    return mixer.blend(
+        Post,
+        author=user,
+        category=category,
+        is_published=kwargs.pop("is_published", True),
+        pub_date=timezone.now() - timedelta(days=days_ago),
+        **kwargs,
+    )
+
+
+def stats(category):
+    return CategoryStats.objects.get(category=category)
+
+
+def test_counts_follow_post_writes(mixer, user, categories):
+    first, second = categories
+    post = blend_post(mixer, user, first, days_ago=3)
+    newest = blend_post(mixer, user, first, days_ago=1)
+    blend_post(mixer, user, first, is_published=False)
+    assert stats(first).visible_posts == 2
+    assert stats(first).latest_pub_date == newest.pub_date
+    post.category = second
+    post.save()
+    assert (stats(first).visible_posts, stats(second).visible_posts) == (
+        1, 1
+    ), "Убедитесь, что счётчики обновляются при смене категории поста."
+    newest.delete()
+    assert stats(first).visible_posts == 0
+    assert stats(first).latest_pub_date is None
+
+
+def test_unpublished_category_counts_nothing(client, mixer, user, categories):
+    first, second = categories
+    blend_post(mixer, user, first)
+    blend_post(mixer, user, second)
+    first.is_published = False
+    first.save()
+    assert stats(first).visible_posts == 0
+    response = client.get("/category/")
+    assert response.status_code == 200
+    assert [category.pk for category in response.context["categories"]] == [
+        second.pk
+    ], "Убедитесь, что скрытые категории не показываются в списке."
+    assert response.context["categories"][0].stats.visible_posts == 1
+
+
+def test_only_publication_changes_recount(mixer, user, categories):
+    category = categories[0]
+    blend_post(mixer, user, category)
+    category.title = "Новое название"
+    with CaptureQueriesContext(connection) as queries:
+        category.save()
+    assert not any("COUNT(" in query["sql"] for query in queries), (
+        "Убедитесь, что правка категории без смены публикации не"
+        " пересчитывает счётчики."
+    )
+    category.is_published = False
+    category.save()
+    assert stats(category).visible_posts == 0
+
+
+def test_index_page_reads_counts_table(client, mixer, user, categories):
+    for category in categories:
+        for _ in range(3):
+            blend_post(mixer, user, category)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/category/")
+    assert len(queries) == 1, (
+        "Убедитесь, что список категорий читает готовые счётчики."
+    )
+    content = response.content.decode()
+    for category in categories:
+        assert category.title in content
+
+
+def test_category_page_paginates_from_counts(
+    client, mixer, user, categories
+):
+    category = categories[0]
+    for _ in range(12):
+        blend_post(mixer, user, category)
+    future = blend_post(mixer, user, category, days_ago=-2)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/category/{category.slug}/")
+    page = response.context["page_obj"]
+    assert page.paginator.count == 12 and page.paginator.num_pages == 2
+    assert not any(
+        "COUNT(" in query["sql"] and "GROUP BY" not in query["sql"]
+        for query in queries
+    )
+    Post.objects.filter(pk=future.pk).update(
+        pub_date=timezone.now() - timedelta(hours=1)
+    )
+    CategoryStats.objects.filter(category=category).update(
+        visible_until=timezone.now() - timedelta(seconds=1)
+    )
+    response = client.get(f"/category/{category.slug}/")
+    assert response.context["page_obj"].paginator.count == 13, (
+        "Убедитесь, что отложенный пост учитывается, когда он выходит."
+    )
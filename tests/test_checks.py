@@ -0,0 +1,42 @@
+import pytest
+
+from blog.checks import SHARED_CACHE_SETTINGS, check_shared_caches
+
+
+@pytest.fixture
+def shared_caches(settings):
+    settings.DEBUG = False
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/blogicum-test-cache",
+        },
+    }
+    for setting in SHARED_CACHE_SETTINGS:
+        setattr(settings, setting, "shared")
+    return settings
+
+
+@pytest.mark.parametrize("setting", [
+    "AUTH_USER_CACHE", "FEED_CACHE", "SITEMAP_CACHE", "LOCATION_CACHE",
+    "ARCHIVE_CACHE",
+])
+def test_process_local_cache_rejected(shared_caches, setting):
+    assert check_shared_caches(None) == []
+    setattr(shared_caches, setting, "default")
+    errors = check_shared_caches(None)
+    assert [(error.id, error.obj) for error in errors] == [
+        ("blog.E001", setting)
+    ], (
+        f"Убедитесь, что проверка запуска отвергает локальный для процесса"
+        f" кэш в {setting}."
+    )
+
+
+def test_debug_allows_process_local_cache(shared_caches):
+    shared_caches.AUTH_USER_CACHE = "default"
+    shared_caches.DEBUG = True
+    assert check_shared_caches(None) == []
@@ -0,0 +1,94 @@
+import gzip
+
+import pytest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from blogicum.compression import CompressionMiddleware, compression
+
+pytestmark = [pytest.mark.django_db]
+
+HTML = b"<article>" + b"post card " * 100 + b"</article>"
+
+
+def run(response, view=None, accept_encoding="gzip, deflate, br"):
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+    middleware = CompressionMiddleware(lambda request: response)
+    if view is not None:
+        middleware.process_view(request, view, (), {})
+    return middleware(request)
+
+
+def test_feed_is_compressed(
+        client, many_posts_with_published_locations
+):
+    response = client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что HTML-страницы сжимаются, если клиент поддерживает"
+        " gzip."
+    )
+    assert "Accept-Encoding" in response["Vary"]
+    html = gzip.decompress(response.content).decode()
+    assert "Читать полный текст" in html
+
+
+def test_streaming_response_compressed_incrementally():
+    chunks = [HTML] * 5
+    response = run(StreamingHttpResponse(iter(chunks)))
+    parts = list(response.streaming_content)
+    assert len(parts) > 1, (
+        "Убедитесь, что потоковый ответ сжимается по частям, а не целиком."
+    )
+    assert gzip.decompress(b"".join(parts)) == b"".join(chunks)
+
+
+def test_small_and_binary_responses_skipped():
+    assert not run(HttpResponse(b"short")).has_header("Content-Encoding")
+    image = HttpResponse(HTML, content_type="image/png")
+    assert not run(image).has_header("Content-Encoding")
+    encoded = HttpResponse(HTML)
+    encoded["Content-Encoding"] = "br"
+    assert run(encoded)["Content-Encoding"] == "br"
+
+
+def test_file_response_skipped(tmp_path):
+    path = tmp_path / "feed.html"
+    path.write_bytes(HTML)
+    response = run(FileResponse(open(path, "rb")))
+    assert not response.has_header("Content-Encoding")
+    response.close()
+
+
+def test_client_without_gzip():
+    response = run(HttpResponse(HTML), accept_encoding="gzip;q=0, br")
+    assert not response.has_header("Content-Encoding")
+    assert "Accept-Encoding" in response["Vary"]
+
+
+def test_view_policy():
+    @compression(enabled=False)
+    def opted_out(request):
+        pass
+
+    @compression(min_size=len(HTML) + 1)
+    def large_threshold(request):
+        pass
+
+    @compression(level=1)
+    def fast(request):
+        pass
+
+    for view in (opted_out, large_threshold):
+        response = run(HttpResponse(HTML), view=view)
+        assert not response.has_header("Content-Encoding"), (
+            "Убедитесь, что декоратор `compression` позволяет отключить"
+            " сжатие для отдельного view."
+        )
+    response = run(HttpResponse(HTML), view=fast)
+    assert gzip.decompress(response.content) == HTML
+
+
+def test_strong_etag_weakened():
+    response = HttpResponse(HTML)
+    response["ETag"] = '"abc"'
+    assert run(response)["ETag"] == 'W/"abc"'
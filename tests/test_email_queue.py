@@ -0,0 +1,69 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.mail import EmailMessage, send_mail
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.mail import send_queued
+from blog.models import OutboundEmail
+
+pytestmark = [pytest.mark.django_db]
+
+QUEUED_BACKEND = "blog.mail.QueuedEmailBackend"
+
+
+@override_settings(EMAIL_BACKEND=QUEUED_BACKEND)
+def test_send_mail_only_queues(smtp_server):
+    sent = send_mail(
+        "Сброс пароля", "Ссылка", "noreply@blogicum.ru", ["user@example.com"]
+    )
+    assert sent == 1
+    assert OutboundEmail.objects.filter(sent_at__isnull=True).count() == 1
+    assert smtp_server.connections == 0, (
+        "Убедитесь, что при отправке письма запрос только ставит его в"
+        " очередь и не обращается к почтовому серверу."
+    )
+
+
+@override_settings(EMAIL_BACKEND=QUEUED_BACKEND)
+def test_worker_sends_batch_over_one_connection(smtp_server):
+    n_messages = 200
+    for number in range(n_messages):
+        EmailMessage(
+            f"Письмо {number}", "Текст", "noreply@blogicum.ru",
+            [f"user{number}@example.com"],
+        ).send()
+    started = time.monotonic()
+    sent, failed = send_queued(batch_size=n_messages)
+    elapsed = time.monotonic() - started
+    assert (sent, failed) == (n_messages, 0)
+    assert len(smtp_server.messages) == n_messages
+    assert smtp_server.connections == 1, (
+        "Убедитесь, что воркер отправляет пакет писем через одно"
+        " соединение с SMTP-сервером."
+    )
+    assert b"Subject:" in smtp_server.messages[0]
+    assert n_messages / elapsed > 50, (
+        f"Пропускная способность очереди {n_messages / elapsed:.0f} писем/с"
+    )
+    assert not OutboundEmail.objects.filter(sent_at__isnull=True).exists()
+    assert send_queued() == (0, 0)
+
+
+@override_settings(EMAIL_BACKEND=QUEUED_BACKEND, EMAIL_QUEUE_RETRY_DELAY=60)
+def test_failed_message_retried_with_backoff(smtp_server):
+    for number in range(3):
+        send_mail("Тема", "Текст", "noreply@blogicum.ru", [f"{number}@x.ru"])
+    smtp_server.fail_next = 1
+    assert send_queued() == (2, 1)
+    failed = OutboundEmail.objects.get(sent_at__isnull=True)
+    assert failed.attempts == 1
+    assert "451" in failed.last_error
+    assert failed.next_attempt_at > timezone.now() + timedelta(seconds=30)
+    assert send_queued() == (0, 0), (
+        "Письмо с ошибкой должно повторно отправляться только после паузы."
+    )
+    OutboundEmail.objects.update(next_attempt_at=timezone.now())
+    assert send_queued() == (1, 0)
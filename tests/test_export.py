@@ -0,0 +1,129 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.export import iter_rows
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def exported_posts(mixer, user, published_category):
+    posts = mixer.cycle(25).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+        is_published=True,
+    )
+    for post in posts[:5]:
+        mixer.blend("blog.Comment", post=post, author=user)
+    return posts
+
+
+@pytest.fixture
+def staff_client(user):
+    user.is_staff = True
+    user.save()
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def test_rows_read_in_keyset_chunks(exported_posts, future_posts):
+    with CaptureQueriesContext(connection) as queries:
+        rows = list(iter_rows("posts", chunk_size=10))
+    assert sorted(row["id"] for row in rows) == sorted(
+        post.id for post in exported_posts
+    ), "Убедитесь, что выгружаются только опубликованные посты."
+    assert len(queries) == 3, (
+        "Убедитесь, что выгрузка читает таблицу частями по chunk_size строк."
+    )
+    assert all("OFFSET" not in query["sql"] for query in queries)
+    assert rows[0]["author"] == exported_posts[0].author.username
+    assert rows[0]["category"] == exported_posts[0].category.slug
+
+
+def test_since_exports_only_new_rows(exported_posts):
+    since = timezone.now() - timedelta(minutes=30)
+    Post.objects.filter(
+        id__in=[post.id for post in exported_posts[:20]]
+    ).update(created_at=since - timedelta(hours=1))
+    rows = list(iter_rows("posts", since=since, chunk_size=3))
+    assert sorted(row["id"] for row in rows) == sorted(
+        post.id for post in exported_posts[20:]
+    )
+
+
+def test_since_exports_posts_published_later(exported_posts):
+    since = timezone.now() - timedelta(minutes=30)
+    Post.objects.update(created_at=since - timedelta(days=2))
+    Comment.objects.update(created_at=since - timedelta(days=1))
+    scheduled = exported_posts[0]
+    Post.objects.filter(id=scheduled.id).update(
+        pub_date=since + timedelta(minutes=10)
+    )
+    rows = list(iter_rows("posts", since=since, until=timezone.now()))
+    assert [row["id"] for row in rows] == [scheduled.id], (
+        "Убедитесь, что отложенный пост попадает в выгрузку за период,"
+        " когда он был опубликован."
+    )
+    comments = list(iter_rows("comments", since=since))
+    assert [row["post_id"] for row in comments] == [scheduled.id]
+
+
+def test_unpublished_location_not_exported(mixer, exported_posts,
+                                           published_location):
+    hidden = mixer.blend("blog.Location", is_published=False)
+    Post.objects.filter(id=exported_posts[0].id).update(location=hidden)
+    Post.objects.filter(id=exported_posts[1].id).update(
+        location=published_location
+    )
+    rows = {row["id"]: row for row in iter_rows("posts", chunk_size=10)}
+    assert rows[exported_posts[0].id]["location"] is None, (
+        "Убедитесь, что выгрузка не раскрывает название неопубликованной"
+        " локации."
+    )
+    assert rows[exported_posts[1].id]["location"] == published_location.name
+    assert "location__is_published" not in rows[exported_posts[0].id]
+
+
+def test_command_writes_gzipped_jsonl(exported_posts, tmp_path):
+    output = tmp_path / "comments.jsonl.gz"
+    call_command(
+        "export_content", "comments", "--gzip", "-o", str(output),
+        stderr=io.StringIO(),
+    )
+    with gzip.open(output, "rt", encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+    assert len(rows) == Comment.objects.count() == 5
+    assert set(rows[0]) == {"id", "post_id", "author", "text", "created_at"}
+
+
+def test_export_view_streams_csv(staff_client, exported_posts):
+    response = staff_client.get("/export/posts.csv")
+    assert response.status_code == 200
+    assert response.streaming
+    content = b"".join(response.streaming_content).decode()
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert len(rows) == len(exported_posts)
+    assert "attachment" in response["Content-Disposition"]
+    assert response["X-Export-Until"]
+
+
+def test_export_view_staff_only(user_client, client):
+    for tested_client in (user_client, client):
+        response = tested_client.get("/export/posts.jsonl")
+        assert response.status_code == 302, (
+            "Убедитесь, что выгрузка доступна только сотрудникам."
+        )
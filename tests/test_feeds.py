@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.feeds import next_publication_timeout
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+        is_published=True,
+    )
+
+
+@pytest.mark.parametrize("url", ["/feed/", "/feed/atom/"])
+def test_feed_lists_visible_posts(
+    client, url, feed_posts, future_posts, posts_with_unpublished_category
+):
+    response = client.get(url)
+    assert response.status_code == 200
+    content = response.content.decode()
+    for post in feed_posts:
+        assert post.get_absolute_url() in content
+    for post in future_posts + posts_with_unpublished_category:
+        assert f"/posts/{post.id}/<" not in content, (
+            "Убедитесь, что в ленту попадают только опубликованные посты,"
+            " как на главной странице."
+        )
+
+
+def test_category_and_author_feeds(client, user, feed_posts,
+                                   post_of_another_author):
+    category = feed_posts[0].category
+    response = client.get(f"/category/{category.slug}/feed/")
+    assert response.status_code == 200
+    response = client.get(f"/profile/{user.username}/feed/atom/")
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert feed_posts[0].get_absolute_url() in content
+    assert post_of_another_author.get_absolute_url() not in content
+    category.is_published = False
+    category.save()
+    response = client.get(f"/category/{category.slug}/feed/")
+    assert response.status_code == 404
+
+
+def test_feed_cached_until_write(client, user, feed_posts):
+    client.get("/feed/")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/feed/")
+    assert response.status_code == 200
+    assert len(queries) == 0, (
+        "Убедитесь, что повторный запрос ленты отдаётся из кэша."
+    )
+    post = feed_posts[0]
+    post.title = "Новый заголовок"
+    post.save()
+    response = client.get("/feed/")
+    assert "Новый заголовок" in response.content.decode(), (
+        "Убедитесь, что лента обновляется после изменения поста."
+    )
+
+
+def test_conditional_requests(client, feed_posts):
+    response = client.get("/feed/")
+    etag = response["ETag"]
+    assert response["Last-Modified"]
+    response = client.get("/feed/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    response = client.get(
+        "/feed/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert response.status_code == 304
+    Post.objects.get(pk=feed_posts[0].pk).delete()
+    response = client.get("/feed/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+def test_cache_expires_at_next_publication(user, published_category,
+                                           mixer):
+    assert next_publication_timeout(Post.objects.all()) is None
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(days=2),
+    )
+    timeout = next_publication_timeout(Post.objects.all())
+    assert timedelta(days=1) < timedelta(seconds=timeout) <= timedelta(
+        days=2
+    )
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import locations
+from blog.checks import check_shared_caches
+from blog.models import Location, Post
+from conftest import check_keyset_cursor
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    return [
+        mixer.blend(
+            Post,
+            author=user,
+            category=published_category,
+            location=published_location,
+            is_published=True,
+            pub_date=now - timedelta(hours=hours),
+        )
+        for hours in (1, 2, 3)
+    ]
+
+
+def test_cards_read_locations_without_join(client, posts):
+    locations.all_locations()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert posts[0].location.name in response.content.decode()
+    assert not any(
+        "blog_location" in query["sql"] for query in queries
+    ), "Убедитесь, что лента не присоединяет таблицу местоположений."
+
+
+def test_location_change_reaches_cards(client, posts, published_location):
+    client.get("/")
+    published_location.name = "Новое место"
+    published_location.save()
+    assert "Новое место" in client.get("/").content.decode()
+
+
+def test_other_workers_reload_on_version_change(
+    posts, published_location, settings
+):
+    settings.LOCATION_CACHE_CHECK_INTERVAL = 0
+    assert locations.get_location(published_location.id).name == (
+        published_location.name
+    )
+    Location.objects.filter(pk=published_location.pk).update(name="Другое")
+    assert locations.get_location(published_location.id).name != "Другое"
+    locations.get_cache().set(locations.VERSION_KEY, 99, None)
+    assert locations.get_location(published_location.id).name == "Другое"
+
+
+def test_table_reloaded_after_max_age(
+    posts, published_location, settings
+):
+    settings.LOCATION_CACHE_CHECK_INTERVAL = 3600
+    locations.all_locations()
+    Location.objects.filter(pk=published_location.pk).update(name="Другое")
+    assert locations.get_location(published_location.id).name != "Другое"
+    settings.LOCATION_CACHE_MAX_AGE = 0
+    assert locations.get_location(published_location.id).name == "Другое", (
+        "Убедитесь, что таблица местоположений перечитывается не реже"
+        " LOCATION_CACHE_MAX_AGE секунд, даже если версия не изменилась."
+    )
+
+
+def test_process_local_cache_rejected(settings):
+    settings.DEBUG = False
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/blogicum-test-cache",
+        },
+    }
+    settings.FEED_CACHE = settings.SITEMAP_CACHE = "shared"
+    settings.ARCHIVE_CACHE = settings.AUTH_USER_CACHE = "shared"
+    settings.LOCATION_CACHE = "default"
+    errors = check_shared_caches(None)
+    assert [error.obj for error in errors] == ["LOCATION_CACHE"], (
+        "Убедитесь, что проверка запуска отвергает кэш, локальный для"
+        " процесса."
+    )
+    settings.LOCATION_CACHE = "shared"
+    assert check_shared_caches(None) == []
+
+
+def test_location_page_order_visibility_and_cursor(
+    client, mixer, posts, published_location, monkeypatch
+):
+    url = f"/location/{published_location.id}/"
+    mixer.blend(
+        Post,
+        author=posts[0].author,
+        category=posts[0].category,
+        location=published_location,
+        is_published=False,
+        pub_date=timezone.now(),
+    )
+    expected = [post.id for post in posts]
+    response = client.get(url)
+    assert response.status_code == 200
+    assert [post.id for post in response.context["posts"]] == expected, (
+        "Убедитесь, что видны только опубликованные посты, новые первыми."
+    )
+    check_keyset_cursor(client, url, expected, monkeypatch)
+
+
+def test_unpublished_location_not_found(client, posts, published_location):
+    published_location.is_published = False
+    published_location.save()
+    response = client.get(f"/location/{published_location.id}/")
+    assert response.status_code == 404
+    assert client.get("/location/0/").status_code == 404
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def image_url(post_with_published_location):
+    return post_with_published_location.image.url
+
+
+@pytest.fixture
+def image_size(post_with_published_location):
+    return post_with_published_location.image.size
+
+
+@override_settings(DEBUG=False)
+def test_media_served_without_debug(client, image_url, image_size):
+    response = client.get(image_url)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что изображения постов отдаются при `DEBUG = False`."
+    )
+    assert int(response["Content-Length"]) == image_size
+    assert response["ETag"].startswith('"'), (
+        "Убедитесь, что для медиафайлов вычисляется сильный ETag."
+    )
+    assert response["Accept-Ranges"] == "bytes"
+
+
+def test_media_not_modified(client, image_url):
+    response = client.get(image_url)
+    etag = response["ETag"]
+    last_modified = response["Last-Modified"]
+    for headers in (
+        {"HTTP_IF_NONE_MATCH": etag},
+        {"HTTP_IF_MODIFIED_SINCE": last_modified},
+    ):
+        response = client.get(image_url, **headers)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            "Убедитесь, что на условный запрос к неизменённому медиафайлу"
+            " возвращается статус 304."
+        )
+
+
+def test_media_byte_range(client, image_url, image_size):
+    response = client.get(image_url, HTTP_RANGE="bytes=10-19")
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response["Content-Range"] == f"bytes 10-19/{image_size}"
+    assert len(b"".join(response.streaming_content)) == 10
+
+    response = client.get(image_url, HTTP_RANGE="bytes=-5")
+    assert response["Content-Range"] == (
+        f"bytes {image_size - 5}-{image_size - 1}/{image_size}"
+    )
+
+    response = client.get(image_url, HTTP_RANGE=f"bytes={image_size}-")
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+
+
+def test_media_if_range_mismatch(client, image_url):
+    response = client.get(
+        image_url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что при несовпадении `If-Range` отдаётся весь файл."
+    )
+
+
+@override_settings(MEDIA_ACCEL_REDIRECT="/protected-media/")
+def test_media_x_accel_redirect(client, post_with_published_location):
+    image = post_with_published_location.image
+    response = client.get(image.url)
+    assert response["X-Accel-Redirect"] == f"/protected-media/{image.name}"
+    assert not response.content
+
+
+@override_settings(MEDIA_SENDFILE=True)
+def test_media_x_sendfile(client, post_with_published_location):
+    image = post_with_published_location.image
+    response = client.get(image.url)
+    assert response["X-Sendfile"] == image.path
+
+
+def test_media_missing_file(client):
+    response = client.get("/media/posts_images/missing.jpg")
+    assert response.status_code == HTTPStatus.NOT_FOUND
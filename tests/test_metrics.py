@@ -0,0 +1,63 @@
+import json
+import re
+
+import pytest
+
+from blogicum import metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    metrics._values.clear()
+    yield tmp_path
+    metrics._values.clear()
+
+
+def sample(text, name, view):
+    match = re.search(
+        rf'^{name}\{{view="{re.escape(view)}"[^}}]*\}} (\S+)$', text, re.M
+    )
+    return float(match.group(1)) if match else None
+
+
+def test_request_recorded_per_view(client, post_with_published_location):
+    for _ in range(3):
+        assert client.get("/").status_code == 200
+    client.get(f"/posts/{post_with_published_location.id}/")
+    text = client.get("/metrics").content.decode()
+    assert sample(
+        text, "blogicum_request_duration_seconds_count", "blog:index"
+    ) == 3
+    assert sample(text, "blogicum_db_queries_total", "blog:index") >= 3, (
+        "Убедитесь, что запросы к БД считаются для каждого представления."
+    )
+    assert sample(
+        text, "blogicum_template_render_seconds_total", "blog:post_detail"
+    ) > 0
+    assert sample(
+        text, "blogicum_response_size_bytes_sum", "blog:index"
+    ) > 0
+    assert 'le="+Inf"' in text
+
+
+def test_totals_of_all_workers_are_added(client, metrics_dir):
+    client.get("/")
+    (metrics_dir / "1-1.json").write_text(json.dumps([
+        ["blogicum_db_queries_total", ["blog:index"], 40],
+        ["blogicum_request_queries", ["blog:index"],
+         [0, 0, 0, 0, 0, 1, 0, 0, 0, 7, 1]],
+    ]))
+    text = client.get("/metrics").content.decode()
+    own = metrics._values[("blogicum_db_queries_total", ("blog:index",))]
+    assert sample(text, "blogicum_db_queries_total", "blog:index") == (
+        own + 40
+    )
+    assert sample(text, "blogicum_request_queries_count", "blog:index") == 2
+
+
+def test_metrics_only_local(client):
+    response = client.get("/metrics", REMOTE_ADDR="203.0.113.5")
+    assert response.status_code == 404
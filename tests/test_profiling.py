@@ -0,0 +1,101 @@
+import pytest
+from django.test import Client
+
+from blogicum.profiling import COOKIE, make_token, profiles
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def staff(user):
+    user.is_staff = True
+    user.save()
+    return user
+
+
+@pytest.fixture
+def staff_client(staff):
+    client = Client()
+    client.force_login(staff)
+    return client
+
+
+def test_header_profiles_request(staff_client, staff, profile_dir):
+    staff_client.get("/", HTTP_X_PROFILE=make_token(staff))
+    stored = profiles()
+    assert len(stored) == 1, "Убедитесь, что профиль запроса сохраняется."
+    name, collapsed, size = stored[0]
+    assert "blog_index" in name and size > 0
+    lines = (profile_dir / collapsed).read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("views.py" in line for line in lines)
+
+
+def test_streaming_response_profiled_chunk_by_chunk(
+    staff_client, staff, mixer, published_category
+):
+    mixer.cycle(5).blend(
+        "blog.Post", author=staff, category=published_category,
+        is_published=True,
+    )
+    response = staff_client.get(
+        "/export/posts.jsonl", HTTP_X_PROFILE=make_token(staff)
+    )
+    chunks = iter(response.streaming_content)
+    assert next(chunks)
+    assert profiles() == [], (
+        "Убедитесь, что потоковый ответ не читается целиком до отправки."
+    )
+    assert len(list(chunks)) == 4
+    stored = profiles()
+    assert len(stored) == 1 and "blog_export" in stored[0][0]
+
+
+def test_not_profiled_without_valid_token(staff_client, user_client,
+                                          another_user, staff):
+    staff_client.get("/")
+    staff_client.get("/", HTTP_X_PROFILE="forged")
+    user_client.cookies[COOKIE] = make_token(another_user)
+    user_client.get("/")
+    assert profiles() == [], (
+        "Убедитесь, что профилирование включается только подписанным"
+        " токеном сотрудника."
+    )
+
+
+def test_ring_is_bounded(staff_client, staff, settings):
+    settings.PROFILE_KEEP = 2
+    for _ in range(4):
+        staff_client.get("/", HTTP_X_PROFILE=make_token(staff))
+    assert len(profiles()) == 2
+
+
+def test_admin_page_toggle_and_download(staff_client, another_user_client):
+    assert another_user_client.get("/admin/profiles/").status_code == 302
+    response = staff_client.post(
+        "/admin/profiles/toggle/", {"enable": "1"}
+    )
+    assert response.status_code == 302
+    assert staff_client.cookies[COOKIE].value
+    staff_client.get("/pages/about/")
+    response = staff_client.get("/admin/profiles/")
+    assert response.status_code == 200
+    name, collapsed, _ = next(
+        stored for stored in profiles() if "pages_about" in stored[0]
+    )
+    assert name in response.content.decode()
+    response = staff_client.get(f"/admin/profiles/{collapsed}")
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content)
+    response = staff_client.get("/admin/profiles/..%2Fsettings.py")
+    assert response.status_code == 404
+    staff_client.post("/admin/profiles/toggle/")
+    stored = len(profiles())
+    staff_client.get("/pages/rules/")
+    assert len(profiles()) == stored
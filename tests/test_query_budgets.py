@@ -0,0 +1,185 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import api_urls
+from blog import urls as blog_urls
+from blog.counters import post_views
+from blog.locations import all_locations
+from blog.models import Category, Comment, Location, Post
+from blog.stats import reconcile
+from blog.trending import rebuild_scores
+from pages import urls as pages_urls
+
+pytestmark = [pytest.mark.django_db]
+
+# Maximum SQL queries per GET, whoever asks and however much data there
+# is. A new URL must be given a budget here before its tests pass.
+BUDGETS = {
+    "blog:post_detail": 5,
+    "blog:add_comment": 3,
+    "blog:edit_comment": 4,
+    "blog:delete_comment": 4,
+    "blog:edit_post": 7,
+    "blog:create_post": 4,
+    "blog:delete_post": 6,
+    "blog:categories": 3,
+    "blog:category_posts": 4,
+    "blog:category_feed": 3,
+    "blog:category_atom_feed": 3,
+    "blog:archive": 3,
+    "blog:archive_year": 3,
+    "blog:archive_month": 4,
+    "blog:location_posts": 4,
+    "blog:profile": 4,
+    "blog:author_feed": 3,
+    "blog:author_atom_feed": 3,
+    "blog:edit_profile": 3,
+    "blog:export": 2,
+    "blog:feed": 2,
+    "blog:atom_feed": 2,
+    "blog:sitemap": 3,
+    "blog:sitemap_shard": 2,
+    "blog:trending": 4,
+    "blog:discussed": 4,
+    "blog:index": 4,
+    "api:posts": 1,
+    "api:post_detail": 3,
+    "api:post_comments": 4,
+    "api:category_posts": 2,
+    "api:profile_posts": 4,
+    "pages:about": 2,
+    "pages:rules": 2,
+}
+SIZES = (1, 10, 100)
+ROLES = ("anonymous", "author", "other")
+
+
+def url_names():
+    return [
+        f"{module.app_name}:{pattern.name}"
+        for module in (blog_urls, api_urls, pages_urls)
+        for pattern in module.urlpatterns
+    ]
+
+
+class Dataset:
+    """Posts and comments of one author, grown in place to each size."""
+
+    def __init__(self, author, reader):
+        self.author = author
+        self.reader = reader
+        self.category = Category.objects.create(
+            title="Категория", description="Описание", slug="budget"
+        )
+        self.location = Location.objects.create(name="Место")
+        self.posts = []
+        self.comments = []
+
+    def grow(self, size):
+        now = timezone.now()
+        Post.objects.bulk_create([
+            Post(
+                title=f"Пост {number}",
+                text="Текст",
+                pub_date=now - timedelta(hours=number),
+                author=self.author,
+                category=self.category,
+                location=self.location,
+            )
+            for number in range(len(self.posts), size)
+        ])
+        self.posts = list(Post.objects.order_by("id"))
+        Comment.objects.bulk_create([
+            Comment(
+                text=f"Комментарий {number}",
+                post=self.posts[number % len(self.posts)],
+                author=(self.author, self.reader)[number % 2],
+            )
+            for number in range(len(self.comments), size)
+        ] + [
+            Comment(text="Ещё", post=self.posts[0], author=self.reader)
+            for _ in range(len(self.comments), size)
+        ])
+        self.comments = list(Comment.objects.order_by("id"))
+        # bulk_create() skips the signals that keep these up to date.
+        rebuild_scores()
+        reconcile()
+
+    def kwargs(self, name):
+        post = self.posts[0]
+        month = timezone.localdate(post.pub_date)
+        return {
+            "post_id": post.id,
+            "comment_id": post.comments.filter(author=self.author)[0].id,
+            "category_slug": self.category.slug,
+            "location_id": self.location.id,
+            "year": month.year,
+            "month": month.month,
+            "username": self.author.username,
+            "kind": "posts",
+            "format": "jsonl",
+            "section": "posts",
+            "shard": 0,
+        }
+
+
+def url_for(name, dataset):
+    pattern = next(
+        pattern
+        for module in (blog_urls, api_urls, pages_urls)
+        for pattern in module.urlpatterns
+        if f"{module.app_name}:{pattern.name}" == name
+    )
+    values = dataset.kwargs(name)
+    return reverse(name, kwargs={
+        key: values[key] for key in pattern.pattern.converters
+    })
+
+
+def count_queries(client, url):
+    cache.clear()
+    # A view-count flush would land on whichever request crosses the limit.
+    post_views.clear()
+    # Workers load the locations once; count the requests after that.
+    all_locations()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+        if response.streaming:
+            b"".join(response.streaming_content)
+    assert response.status_code < 500, f"{url}: {response.status_code}"
+    return len(queries)
+
+
+def test_every_url_has_a_budget():
+    missing = set(url_names()) - set(BUDGETS)
+    assert not missing, (
+        f"Укажите в BUDGETS допустимое число запросов для: {sorted(missing)}"
+    )
+
+
+@pytest.mark.parametrize("role", ROLES)
+@pytest.mark.parametrize("name", url_names())
+def test_query_budget(name, role, user, another_user):
+    dataset = Dataset(user, another_user)
+    client = Client()
+    if role != "anonymous":
+        client.force_login(user if role == "author" else another_user)
+    counts = {}
+    for size in SIZES:
+        dataset.grow(size)
+        counts[size] = count_queries(client, url_for(name, dataset))
+    assert max(counts.values()) <= BUDGETS[name], (
+        f"{name} ({role}) выполняет {counts} SQL-запросов при бюджете"
+        f" {BUDGETS[name]}."
+    )
+    assert len(set(counts.values())) == 1, (
+        f"{name} ({role}): число SQL-запросов растёт с объёмом данных"
+        f" {counts} — проверьте, нет ли N+1."
+    )
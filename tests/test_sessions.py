@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blogicum import sessions
+from blogicum.routers import SessionRouter
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def fresh_write_behind():
+    # Flushes also fall due by time since the last one: start each test
+    # right after one, however long the suite has been running.
+    sessions.flush_pending()
+    yield
+    with sessions._pending_lock:
+        sessions._pending.clear()
+
+
+def test_router_uses_sessions_database():
+    router = SessionRouter()
+    with override_settings(DATABASES={"default": {}, "sessions": {}}):
+        assert router.db_for_write(Session) == "sessions"
+        assert router.allow_migrate("sessions", "sessions") is True
+        assert router.allow_migrate("default", "sessions") is False
+        assert router.allow_migrate("sessions", "blog") is False
+    assert router.db_for_write(Session) is None, (
+        "Без отдельной базы `sessions` сессии должны оставаться в основной"
+        " базе данных."
+    )
+
+
+def test_expiry_refresh_is_written_behind():
+    store = sessions.SessionStore()
+    store["cart"] = [1]
+    store.save(must_create=True)
+    key = store.session_key
+    stored_expiry = Session.objects.get(session_key=key).expire_date
+
+    Session.objects.filter(session_key=key).update(
+        expire_date=stored_expiry - timedelta(days=1)
+    )
+    store = sessions.SessionStore(key)
+    assert store["cart"] == [1]
+    store.save()
+    assert Session.objects.get(session_key=key).expire_date < stored_expiry, (
+        "Убедитесь, что сохранение сессии без изменения данных не пишет"
+        " в базу данных сразу."
+    )
+    sessions.flush_pending()
+    assert Session.objects.get(session_key=key).expire_date >= stored_expiry
+
+    store = sessions.SessionStore(key)
+    store["cart"].append(2)
+    store.save()
+    assert Session.objects.get(session_key=key).get_decoded()["cart"] == [
+        1, 2
+    ], "Изменённые данные сессии должны сразу сохраняться в базу данных."
+
+
+def test_cleanup_deletes_in_batches():
+    now = timezone.now()
+    for number in range(5):
+        Session.objects.create(
+            session_key=f"expired{number}",
+            session_data="",
+            expire_date=now - timedelta(days=number + 1),
+        )
+    Session.objects.create(
+        session_key="alive", session_data="", expire_date=now + timedelta(1)
+    )
+    out = StringIO()
+    call_command("cleanup_sessions", batch_size=2, pause=0, stdout=out)
+    assert "5" in out.getvalue()
+    assert list(Session.objects.values_list("session_key", flat=True)) == [
+        "alive"
+    ]
+
+
+def test_cleanup_spares_sessions_refreshed_elsewhere(settings):
+    settings.SESSION_WRITE_BEHIND_INTERVAL = 30
+    now = timezone.now()
+    # Another worker refreshed this one but has not flushed it yet.
+    Session.objects.create(
+        session_key="buffered",
+        session_data="",
+        expire_date=now - timedelta(seconds=10),
+    )
+    Session.objects.create(
+        session_key="expired", session_data="", expire_date=now - timedelta(1)
+    )
+    assert sessions.delete_expired() == 1
+    assert list(Session.objects.values_list("session_key", flat=True)) == [
+        "buffered"
+    ], (
+        "Убедитесь, что сессии, истёкшие позже чем"
+        " SESSION_WRITE_BEHIND_INTERVAL назад, не удаляются."
+    )
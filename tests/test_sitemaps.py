@@ -0,0 +1,91 @@
+import gzip
+import re
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def small_shards(settings):
+    settings.SITEMAP_SHARD_SIZE = 10
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def sitemap_posts(mixer, user, published_category):
+    return mixer.cycle(25).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+        is_published=True,
+    )
+
+
+def read(response):
+    if response.streaming:
+        return b"".join(response.streaming_content).decode()
+    if response.get("Content-Encoding") == "gzip":
+        return gzip.decompress(response.content).decode()
+    return response.content.decode()
+
+
+def shard_urls(client, url, **headers):
+    return re.findall(r"<loc>(.*?)</loc>", read(client.get(url, **headers)))
+
+
+def test_index_lists_shards(client, sitemap_posts):
+    locations = shard_urls(client, "/sitemap.xml")
+    post_shards = [url for url in locations if "sitemap-posts-" in url]
+    assert len(post_shards) == 3, (
+        "Убедитесь, что карта сайта делится на части по диапазонам id."
+    )
+    assert any("sitemap-categories-0" in url for url in locations)
+    assert any("sitemap-profiles-0" in url for url in locations)
+
+
+def test_shards_cover_visible_posts(client, sitemap_posts, future_posts,
+                                    posts_with_unpublished_category):
+    urls = []
+    for shard in range(6):
+        urls += shard_urls(client, f"/sitemap-posts-{shard}.xml")
+    assert len(urls) == len(set(urls)) == len(sitemap_posts), (
+        "Убедитесь, что в карту сайта попадают только опубликованные посты."
+    )
+
+
+def test_shard_served_from_cache(client, sitemap_posts):
+    first = shard_urls(client, "/sitemap-posts-0.xml")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(
+            "/sitemap-posts-0.xml", HTTP_ACCEPT_ENCODING="gzip"
+        )
+    assert len(queries) == 0
+    assert response["Content-Encoding"] == "gzip"
+    assert re.findall(r"<loc>(.*?)</loc>", read(response)) == first
+    assert shard_urls(client, "/sitemap-posts-0.xml") == first
+
+
+def test_post_write_invalidates_its_shard_only(client, sitemap_posts):
+    shard_urls(client, "/sitemap-posts-0.xml")
+    shard_urls(client, "/sitemap-posts-1.xml")
+    hidden = sitemap_posts[12]
+    hidden.is_published = False
+    hidden.save()
+    with CaptureQueriesContext(connection) as queries:
+        urls = shard_urls(client, "/sitemap-posts-0.xml")
+    assert len(queries) == 0, (
+        "Убедитесь, что изменение поста сбрасывает только его часть карты."
+    )
+    assert len(urls) == 10
+    urls = shard_urls(client, "/sitemap-posts-1.xml")
+    assert len(urls) == 9
+    assert not any(f"/posts/{hidden.id}/" in url for url in urls)
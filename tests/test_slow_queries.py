@@ -0,0 +1,82 @@
+import io
+import json
+import logging
+
+import pytest
+from django.core.management import call_command
+
+from blogicum.slowlog import QueuedFileHandler, fingerprint
+
+pytestmark = [pytest.mark.django_db]
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def slow_records(settings):
+    settings.SLOW_QUERY_THRESHOLD = 0
+    handler = ListHandler()
+    logger = logging.getLogger("blogicum.slow_queries")
+    logger.addHandler(handler)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+def test_fingerprint_folds_literals():
+    assert fingerprint(
+        "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'  LIMIT 10"
+    ) == fingerprint("SELECT * FROM t WHERE id IN (%s) AND name = 'yy' LIMIT 3")
+
+
+def test_query_attributed_to_view_and_line(client, slow_records,
+                                           post_with_published_location):
+    client.get(f"/posts/{post_with_published_location.id}/")
+    assert slow_records, "Убедитесь, что медленные запросы записываются."
+    record = slow_records[0]
+    assert record["view"] == "blog:post_detail"
+    assert record["call_site"].startswith("blog/views.py:"), (
+        "Убедитесь, что в записи указано место вызова в коде приложения."
+    )
+    assert record["duration_ms"] >= 0
+    assert record["fingerprint"] and "%s" not in record["sql"]
+
+
+def test_params_redacted(client, settings, slow_records, user):
+    settings.SLOW_QUERY_REDACT_PARAMS = True
+    client.get(f"/profile/{user.username}/")
+    params = [record["params"] for record in slow_records]
+    assert ["<str>"] in params
+    assert not any(user.username in str(value) for value in params)
+
+
+def test_queue_handler_writes_file(tmp_path):
+    path = tmp_path / "logs" / "slow.log"
+    handler = QueuedFileHandler(str(path))
+    handler.handle(logging.makeLogRecord({"msg": '{"a": 1}'}))
+    handler.close()
+    assert path.read_text() == '{"a": 1}\n'
+
+
+def test_command_aggregates_by_fingerprint(tmp_path):
+    log = tmp_path / "slow.log"
+    records = [
+        {"fingerprint": "a1", "sql": "SELECT 1", "duration_ms": duration,
+         "view": "blog:index", "call_site": "blog/views.py:1 in f"}
+        for duration in (120, 300, 150)
+    ] + [{"fingerprint": "b2", "sql": "SELECT 2", "duration_ms": 101,
+          "view": None, "call_site": None}]
+    log.write_text("\n".join(json.dumps(record) for record in records))
+    output = io.StringIO()
+    call_command("slow_queries", "--log", str(log), stdout=output)
+    text = output.getvalue()
+    assert "a1  3 раз, всего 570 мс" in text
+    assert text.index("a1") < text.index("b2")
+    assert "Отпечатков: 2, записей: 4" in text
@@ -0,0 +1,74 @@
+import importlib
+import os
+
+import pytest
+from django.conf import settings
+
+from blogicum.startup import measure_startup
+
+
+@pytest.fixture
+def production_settings(monkeypatch):
+    monkeypatch.setenv("DJANGO_SECRET_KEY", "test-secret")
+    monkeypatch.setenv("DJANGO_ALLOWED_HOSTS", "blogicum.example")
+    monkeypatch.setenv(
+        "CACHE_BACKEND", "django.core.cache.backends.dummy.DummyCache"
+    )
+    from blogicum import settings_production
+    return importlib.reload(settings_production)
+
+
+def test_production_drops_dev_apps(production_settings):
+    assert not production_settings.DEBUG
+    assert "debug_toolbar" not in production_settings.INSTALLED_APPS, (
+        "Убедитесь, что в production-настройках не подключается"
+        " `debug_toolbar`."
+    )
+    assert not any(
+        "debug_toolbar" in middleware
+        for middleware in production_settings.MIDDLEWARE
+    )
+    loaders = production_settings.TEMPLATES[0]["OPTIONS"]["loaders"]
+    assert loaders[0][0] == "django.template.loaders.cached.Loader"
+
+
+def test_production_reads_environment(production_settings):
+    assert production_settings.SECRET_KEY == "test-secret"
+    assert production_settings.ALLOWED_HOSTS == ["blogicum.example"]
+    assert production_settings.CACHES["default"]["BACKEND"].endswith(
+        "DummyCache"
+    )
+
+
+def test_production_requires_secret_key(monkeypatch):
+    from django.core.exceptions import ImproperlyConfigured
+
+    from blogicum import settings_production
+    monkeypatch.delenv("DJANGO_SECRET_KEY", raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        importlib.reload(settings_production)
+
+
+def test_settings_selected_by_environment(monkeypatch):
+    from blogicum import settings_module
+    monkeypatch.setenv("BLOGICUM_ENV", "production")
+    assert settings_module() == "blogicum.settings_production"
+    monkeypatch.delenv("BLOGICUM_ENV")
+    assert settings_module() == "blogicum.settings"
+
+
+@pytest.mark.parametrize(
+    "settings_module", ["blogicum.settings", "blogicum.settings_production"]
+)
+def test_cold_start_within_budget(monkeypatch, settings_module):
+    monkeypatch.setenv("DJANGO_SECRET_KEY", "test-secret")
+    budget = int(
+        os.environ.get("STARTUP_TIME_BUDGET", settings.STARTUP_TIME_BUDGET)
+    )
+    milliseconds, _ = measure_startup(settings_module)
+    assert milliseconds <= budget, (
+        f"Холодный запуск `{settings_module}` (django.setup() и загрузка"
+        f" маршрутов) занял {milliseconds:.0f} мс при бюджете {budget} мс."
+        " Посмотрите самые медленные импорты командой"
+        " `python manage.py startup_report`."
+    )
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from blogicum.static import StaticFilesMiddleware
+
+
+@pytest.fixture(scope="module")
+def static_root(tmp_path_factory):
+    root = tmp_path_factory.mktemp("static")
+    with override_settings(
+        STATIC_ROOT=root,
+        STATICFILES_STORAGE=(
+            "blogicum.static.CompressedManifestStaticFilesStorage"
+        ),
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+    return root
+
+
+@pytest.fixture
+def middleware(static_root):
+    with override_settings(STATIC_ROOT=static_root):
+        return StaticFilesMiddleware(lambda request: HttpResponse("view"))
+
+
+def hashed_name(static_root, name):
+    stem, suffix = name.rsplit(".", 1)
+    matches = [
+        path.relative_to(static_root).as_posix()
+        for path in static_root.glob(f"{stem}.*.{suffix}")
+    ]
+    assert len(matches) == 1, (
+        f"Убедитесь, что `collectstatic` создаёт копию `{name}` с хэшем"
+        " содержимого в имени файла."
+    )
+    return matches[0]
+
+
+def test_collectstatic_writes_compressed_copies(static_root):
+    favicon = hashed_name(static_root, "img/fav/favicon.ico")
+    assert Path(static_root, favicon + ".gz").is_file(), (
+        "Убедитесь, что для сжимаемых статических файлов рядом создаётся"
+        " копия `.gz`."
+    )
+    logo = hashed_name(static_root, "img/logo.png")
+    assert not Path(static_root, logo + ".gz").exists()
+
+
+def test_hashed_file_is_immutable(static_root, middleware):
+    logo = hashed_name(static_root, "img/logo.png")
+    response = middleware(RequestFactory().get(f"/static/{logo}"))
+    assert response.status_code == 200
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хэшем в имени отдаются с заголовком"
+        " `Cache-Control: immutable`."
+    )
+    response = middleware(RequestFactory().get("/static/img/logo.png"))
+    assert "immutable" not in response["Cache-Control"]
+
+
+def test_precompressed_variant_negotiated(static_root, middleware):
+    favicon = hashed_name(static_root, "img/fav/favicon.ico")
+    url = f"/static/{favicon}"
+    gzipped = middleware(
+        RequestFactory().get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    )
+    assert gzipped["Content-Encoding"] == "gzip"
+    assert "gzip" not in gzipped["Content-Type"]
+    assert "Accept-Encoding" in gzipped["Vary"]
+    plain = middleware(
+        RequestFactory().get(url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+    )
+    assert not plain.has_header("Content-Encoding")
+    assert plain["ETag"] != gzipped["ETag"]
+    not_modified = middleware(
+        RequestFactory().get(
+            url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=gzipped["ETag"],
+        )
+    )
+    assert not_modified.status_code == 304
+
+
+def test_unknown_paths_fall_through(middleware):
+    response = middleware(RequestFactory().get("/static/missing.css"))
+    assert response.content == b"view"
@@ -0,0 +1,166 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError
+
+from blog.management.commands.stream_loaddata import iter_json_array
+from blog.models import (
+    AuthorStats, Category, CategoryStats, Location, MonthStats, Post,
+    PostScore
+)
+from blog.views import filter_published
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = settings.BASE_DIR / "db.json"
+
+
+def test_iter_json_array_small_chunks():
+    with open(DB_JSON, encoding="utf-8") as file:
+        expected = json.load(file)
+    with open(DB_JSON, encoding="utf-8") as file:
+        assert list(iter_json_array(file, chunk_size=7)) == expected, (
+            "Убедитесь, что фикстура разбирается по частям так же, как"
+            " `json.load`."
+        )
+    assert list(iter_json_array(StringIO(" [ ] "))) == []
+
+
+def test_loads_db_json_in_batches():
+    with open(DB_JSON, encoding="utf-8") as file:
+        fixture = json.load(file)
+    n_posts = sum(item["model"] == "blog.post" for item in fixture)
+    out = StringIO()
+    call_command("stream_loaddata", str(DB_JSON), batch_size=10, stdout=out)
+    for model in (Category, Location, Post):
+        expected = sum(
+            item["model"] == model._meta.label_lower for item in fixture
+        )
+        assert model.objects.count() == expected
+    first_post = next(item for item in fixture if item["model"] == "blog.post")
+    post = Post.objects.get(pk=first_post["pk"])
+    assert post.created_at.isoformat().startswith(
+        first_post["fields"]["created_at"][:19]
+    ), "Убедитесь, что при загрузке сохраняются значения полей auto_now_add."
+    assert "строк/с" in out.getvalue()
+
+    call_command("stream_loaddata", str(DB_JSON), stdout=StringIO())
+    assert Post.objects.count() == n_posts, (
+        "Повторная загрузка фикстуры не должна создавать дубликаты."
+    )
+
+
+def test_stats_rebuilt_after_load(tmp_path):
+    with open(DB_JSON, encoding="utf-8") as file:
+        fixture = json.load(file)
+    first_post = next(item for item in fixture if item["model"] == "blog.post")
+    fixture.append({
+        "model": "blog.comment",
+        "pk": 1,
+        "fields": {
+            "text": "Загружен",
+            "post": first_post["pk"],
+            "created_at": "2022-12-18T23:06:18.993Z",
+            "author": first_post["fields"]["author"],
+        },
+    })
+    path = tmp_path / "with_comment.json"
+    path.write_text(json.dumps(fixture), encoding="utf-8")
+    call_command("stream_loaddata", str(path), stdout=StringIO())
+    posts = {
+        stats.user_id: stats.posts for stats in AuthorStats.objects.all()
+    }
+    assert sum(posts.values()) == Post.objects.count(), (
+        "Убедитесь, что после загрузки пересчитывается статистика авторов."
+    )
+    assert CategoryStats.objects.count() == Category.objects.count()
+    assert sum(
+        MonthStats.objects.values_list("visible_posts", flat=True)
+    ) == filter_published(Post.objects).count()
+    assert AuthorStats.objects.get(
+        user_id=first_post["fields"]["author"]
+    ).comments_written == 1
+    assert PostScore.objects.filter(post_id=first_post["pk"]).exists(), (
+        "Убедитесь, что после загрузки пересчитываются рейтинги постов."
+    )
+
+
+def test_gzip_fixture(tmp_path, user):
+    fixture = [
+        {
+            "model": "blog.category",
+            "pk": 100,
+            "fields": {
+                "created_at": "2022-12-18T23:03:52.159Z",
+                "is_published": True,
+                "title": "Сжатая",
+                "slug": "gzipped",
+                "description": "",
+            },
+        }
+    ]
+    path = tmp_path / "dump.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        json.dump(fixture, file)
+    call_command("stream_loaddata", str(path), stdout=StringIO())
+    assert Category.objects.get(pk=100).slug == "gzipped"
+
+
+def category(pk, slug):
+    return {
+        "model": "blog.category",
+        "pk": pk,
+        "fields": {
+            "created_at": "2022-12-18T23:03:52.159Z",
+            "is_published": True,
+            "title": slug,
+            "slug": slug,
+            "description": "",
+        },
+    }
+
+
+def test_rows_without_pk(tmp_path):
+    fixture = [category(None, "first"), category(None, "second"),
+               category(7, "keyed")]
+    path = tmp_path / "natural.json"
+    path.write_text(json.dumps(fixture), encoding="utf-8")
+    call_command("stream_loaddata", str(path), stdout=StringIO())
+    assert set(Category.objects.values_list("slug", flat=True)) == {
+        "first", "second", "keyed"
+    }, "Убедитесь, что загружаются и объекты без pk."
+
+
+def test_broken_foreign_key_reported(tmp_path):
+    fixture = [
+        category(100, "loaded"),
+        {
+            "model": "blog.post",
+            "pk": 1,
+            "fields": {
+                "created_at": "2022-12-18T23:06:18.993Z",
+                "is_published": True,
+                "title": "Сирота",
+                "text": "Автора нет",
+                "pub_date": "2022-12-18T23:06:18Z",
+                "author": 999999,
+                "category": None,
+                "location": None,
+                "image": "",
+            },
+        }
+    ]
+    path = tmp_path / "broken.json"
+    path.write_text(json.dumps(fixture), encoding="utf-8")
+    with pytest.raises(IntegrityError):
+        call_command(
+            "stream_loaddata", str(path), atomic=True, stdout=StringIO()
+        )
+    assert not Post.objects.filter(pk=1).exists(), (
+        "Убедитесь, что при ошибке загрузка откатывается целиком."
+    )
+    assert not Category.objects.filter(pk=100).exists()
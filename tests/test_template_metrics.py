@@ -0,0 +1,66 @@
+import copy
+
+import pytest
+
+from blogicum import metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def template_metrics(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    settings.TEMPLATE_METRICS = True
+    # A new TEMPLATES value restarts the engine, which reads the flag.
+    settings.TEMPLATES = copy.deepcopy(settings.TEMPLATES)
+    metrics._values.clear()
+    yield
+    metrics._values.clear()
+
+
+def values(name, view):
+    return {
+        labels[1]: value for (metric, labels), value in metrics._values.items()
+        if metric == name and labels[0] == view
+    }
+
+
+def test_templates_and_includes_timed(client, published_category,
+                                      post_with_published_location):
+    response = client.get("/")
+    assert "tpl;dur=" in response["Server-Timing"]
+    renders = values("blogicum_template_renders_total", "blog:index")
+    assert renders["blog/index.html"] == 1
+    assert renders["base.html"] == 1
+    assert renders["includes/post_card.html"] >= 1, (
+        "Убедитесь, что время отрисовки учитывается и для include."
+    )
+    seconds = values("blogicum_template_seconds_total", "blog:index")
+    assert set(seconds) == set(renders)
+    assert all(value >= 0 for value in seconds.values())
+    total = metrics._values[
+        ("blogicum_template_render_seconds_total", ("blog:index",))
+    ]
+    assert sum(seconds.values()) <= total * 1.01, (
+        "Убедитесь, что время шаблона не включает время вложенных шаблонов."
+    )
+
+
+def test_custom_tags_timed(user_client, post_with_published_location):
+    user_client.get(f"/posts/{post_with_published_location.id}/")
+    calls = values("blogicum_template_tag_calls_total", "blog:post_detail")
+    assert calls.get("django_bootstrap5.bootstrap_form", 0) >= 1, (
+        "Убедитесь, что учитываются пользовательские теги шаблонов."
+    )
+    text = user_client.get("/metrics").content.decode()
+    assert (
+        'blogicum_template_tag_seconds_total{view="blog:post_detail",'
+        'tag="django_bootstrap5.bootstrap_form"}'
+    ) in text
+
+
+def test_off_by_default(client, settings):
+    settings.TEMPLATE_METRICS = False
+    response = client.get("/")
+    assert "Server-Timing" not in response
+    assert not values("blogicum_template_renders_total", "blog:index")
@@ -0,0 +1,103 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.counters import post_views
+from blog.models import Comment, Post, PostScore
+from blog.trending import log_weight, rebuild_scores
+from conftest import check_keyset_cursor
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        Post,
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def comment(mixer, post, author):
+    return mixer.blend(Comment, post=post, author=author)
+
+
+def score(post, field="trending"):
+    return getattr(PostScore.objects.get(post=post), field)
+
+
+def test_comments_update_scores(mixer, posts, user):
+    first = comment(mixer, posts[0], user)
+    second = comment(mixer, posts[0], user)
+    assert score(posts[0], "discussed") == pytest.approx(
+        1 + log_weight(1, first.created_at), abs=1e-3
+    ), "Убедитесь, что комментарий увеличивает оценку поста."
+    assert not PostScore.objects.filter(post=posts[1]).exists()
+    second.delete()
+    assert score(posts[0], "discussed") == pytest.approx(
+        log_weight(1, first.created_at), abs=1e-3
+    )
+    first.delete()
+    assert score(posts[0], "discussed") is None
+
+
+def test_newer_activity_weighs_more(mixer, posts, user):
+    old = comment(mixer, posts[0], user)
+    Comment.objects.filter(pk=old.pk).update(
+        created_at=old.created_at - timedelta(days=7)
+    )
+    rebuild_scores()
+    comment(mixer, posts[1], user)
+    assert score(posts[1]) > score(posts[0]) + 6, (
+        "Убедитесь, что оценка убывает со временем."
+    )
+
+
+def test_view_flush_updates_trending(posts, monkeypatch):
+    monkeypatch.setattr(post_views, "max_pending", 3)
+    post_views.add(posts[2].id, 2)
+    post_views.add(posts[1].id)
+    assert score(posts[2]) > score(posts[1])
+    assert score(posts[2], "discussed") is None
+
+
+def test_rebuild_matches_incremental(mixer, posts, user):
+    for post, count in zip(posts, (3, 1, 2)):
+        for _ in range(count):
+            comment(mixer, post, user)
+    incremental = list(PostScore.objects.order_by("post").values_list(
+        "trending", "discussed"
+    ))
+    call_command("rebuild_scores", stdout=io.StringIO())
+    rebuilt = PostScore.objects.order_by("post").values_list(
+        "trending", "discussed"
+    )
+    for before, after in zip(incremental, rebuilt):
+        assert before == pytest.approx(after)
+
+
+@pytest.mark.parametrize("url", ["/trending/", "/trending/discussed/"])
+def test_trending_page_order_visibility_and_cursor(
+    client, mixer, posts, user, monkeypatch, url
+):
+    for post, count in zip(posts, (1, 3, 2)):
+        for _ in range(count):
+            comment(mixer, post, user)
+    hidden = mixer.blend(
+        Post, author=user, category=posts[0].category, is_published=False
+    )
+    for _ in range(5):
+        comment(mixer, hidden, user)
+    expected = [posts[1].id, posts[2].id, posts[0].id]
+    response = client.get(url)
+    assert response.status_code == 200
+    assert [post.id for post in response.context["posts"]] == expected, (
+        "Убедитесь, что посты упорядочены по оценке и скрытые не видны."
+    )
+    check_keyset_cursor(client, url, expected, monkeypatch)
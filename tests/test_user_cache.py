@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import auth
+
+pytestmark = [pytest.mark.django_db]
+
+
+def auth_user_selects(client, url="/pages/about/"):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return sum(
+        query["sql"].startswith("SELECT") and '"auth_user"' in query["sql"]
+        for query in context.captured_queries
+    )
+
+
+def test_user_lookup_cached(user_client):
+    auth_user_selects(user_client)
+    saved = auth.saved_queries()
+    assert auth_user_selects(user_client) == 0, (
+        "Убедитесь, что пользователь сессии берётся из кэша и не"
+        " запрашивается из таблицы `auth_user` на каждом запросе."
+    )
+    assert auth.saved_queries() == saved + 1
+
+
+def test_edit_profile_invalidates(user, user_client):
+    auth_user_selects(user_client)
+    response = user_client.post(
+        f"/profile/{user.username}/edit/",
+        data={
+            "first_name": "Имя",
+            "last_name": "Фамилия",
+            "username": "renamed",
+            "email": "renamed@example.com",
+        },
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    response = user_client.get("/pages/about/")
+    assert "renamed" in response.content.decode(), (
+        "Убедитесь, что после редактирования профиля в шапке показывается"
+        " новое имя пользователя."
+    )
+
+
+def test_password_change_logs_out_other_sessions(user, user_client, client):
+    client.force_login(user)
+    auth_user_selects(client)
+    auth_user_selects(user_client)
+    user.set_password("new-secret-password")
+    user.save()
+    assert auth_user_selects(user_client) == 1
+    response = user_client.get("/posts/create/")
+    assert response.status_code == HTTPStatus.FOUND, (
+        "Убедитесь, что после смены пароля закэшированный пользователь"
+        " других сессий больше не считается авторизованным."
+    )
+
+
+def test_logout_drops_cached_user(user_client):
+    auth_user_selects(user_client)
+    user_client.get("/auth/logout/")
+    response = user_client.get("/posts/create/")
+    assert response.status_code == HTTPStatus.FOUND
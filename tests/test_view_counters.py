@@ -0,0 +1,78 @@
+import io
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.counters import CounterBuffer, post_views
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_detail_views_buffered_then_flushed(
+    client, post_with_published_location, monkeypatch
+):
+    monkeypatch.setattr(post_views, "max_pending", 3)
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    client.get(url)
+    post.refresh_from_db()
+    assert post.views == 0, (
+        "Убедитесь, что просмотры не записываются в БД при каждом чтении."
+    )
+    client.get(url)
+    post.refresh_from_db()
+    assert post.views == 3
+    assert "Просмотров: 3" in client.get(url).content.decode()
+
+
+def test_one_update_per_flush(mixer):
+    posts = mixer.cycle(5).blend(Post, views=10)
+    buffer = CounterBuffer(Post, "views", 3600, 1000)
+    for number, post in enumerate(posts):
+        buffer.add(post.id, number + 1)
+    buffer.add(posts[0].id)
+    with CaptureQueriesContext(connection) as queries:
+        buffer.flush()
+    updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+    assert len(updates) == 1 and "CASE" in updates[0]["sql"]
+    assert list(Post.objects.order_by("id").values_list(
+        "views", flat=True
+    )) == [12, 12, 13, 14, 15]
+
+
+def test_adds_from_threads_are_not_lost():
+    buffer = CounterBuffer(Post, "views", 3600, 10 ** 9)
+
+    def add():
+        for number in range(1000):
+            buffer.add(number % 7)
+
+    threads = [threading.Thread(target=add) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pending = buffer.take()
+    assert sum(pending.values()) == 8000
+    assert buffer.take() == {}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_counter_benchmark(mixer):
+    mixer.cycle(5).blend(Post, views=7)
+    output = io.StringIO()
+    call_command(
+        "counter_benchmark", "--threads", "2", "--views", "20",
+        "--posts", "5", "--flush-size", "10", stdout=output,
+    )
+    text = output.getvalue()
+    assert "direct" in text and "buffered" in text
+    assert text.count("записано 40 из 40") == 2
+    assert set(Post.objects.values_list("views", flat=True)) == {7}, (
+        "Убедитесь, что бенчмарк восстанавливает прежние значения."
+    )
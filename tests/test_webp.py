@@ -0,0 +1,68 @@
+import pytest
+from django.test import RequestFactory
+
+from blog.images import accepts_webp, webp_name
+from blog.media import serve_media
+from blog.templatetags.post_images import card_url
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        ("image/avif,image/webp,*/*;q=0.8", True),
+        ("image/webp;q=0.5", True),
+        ("image/webp;q=0,image/*", False),
+        ("image/png,image/*;q=0.8,*/*;q=0.5", False),
+        ("", False),
+    ],
+)
+def test_accepts_webp(accept, expected):
+    request = RequestFactory().get("/", HTTP_ACCEPT=accept)
+    assert accepts_webp(request) is expected
+
+
+def test_webp_sibling_created(post_with_published_location):
+    image = post_with_published_location.image
+    assert image.storage.exists(webp_name(image.name)), (
+        "Убедитесь, что при сохранении поста с изображением рядом с"
+        " оригиналом создаётся его копия в формате WebP."
+    )
+
+
+@pytest.mark.parametrize(
+    "accept, content_type",
+    [("image/webp,*/*", "image/webp"), ("*/*", "image/jpeg")],
+)
+def test_media_negotiates_webp(
+        post_with_published_location, accept, content_type
+):
+    request = RequestFactory().get("/", HTTP_ACCEPT=accept)
+    response = serve_media(
+        request,
+        post_with_published_location.image.name,
+    )
+    assert response["Content-Type"] == content_type, (
+        "Убедитесь, что изображение поста отдаётся в формате WebP только"
+        " браузерам, которые указали его в заголовке `Accept`."
+    )
+    assert "Accept" in response["Vary"], (
+        "Убедитесь, что ответ с изображением содержит заголовок"
+        " `Vary: Accept`."
+    )
+
+
+def test_card_url_does_not_touch_storage(
+        post_with_published_location, monkeypatch
+):
+    image = post_with_published_location.image
+
+    def exists(name):
+        raise AssertionError(name)
+
+    monkeypatch.setattr(image.storage, "exists", exists)
+    assert card_url(image) == image.url, (
+        "Убедитесь, что карточка поста не проверяет наличие уменьшенной"
+        " копии в хранилище при каждом показе."
+    )